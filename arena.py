@@ -0,0 +1,204 @@
+# arena.py
+import json
+import math
+import numpy as np
+from raycast import ray_segment_distances, walls_array
+from spatial import UniformGrid
+from config import ARENA_CELL_SIZE, WALL_THICKNESS
+
+# Caja por defecto (la misma en todos los simuladores)
+DEFAULT_WALLS = [
+    [(50, 50), (750, 50)],   # Inferior
+    [(750, 50), (750, 550)],  # Derecha
+    [(750, 550), (50, 550)],  # Superior
+    [(50, 550), (50, 50)]     # Izquierda
+]
+
+# Con pocas paredes es más rápido probarlas todas que recorrer la rejilla
+BRUTE_FORCE_WALLS = 32
+
+
+class Arena:
+    """Geometría estática del entorno compilada en una rejilla uniforme
+
+    Cada celda guarda las paredes que pasan a menos de WALL_THICKNESS de ella,
+    así que las consultas de proximidad miran una sola celda y los rayos sólo
+    prueban las paredes de las celdas que atraviesan.
+    """
+
+    def __init__(self, walls, cell_size=ARENA_CELL_SIZE, margin=WALL_THICKNESS):
+        self.walls = [[tuple(start), tuple(end)] for start, end in walls]
+        self.segments = walls_array(self.walls)
+        self.cell_size = float(cell_size)
+        self.margin = float(margin)
+        self.last_wall_tests = 0
+        self._build_grid()
+
+    @classmethod
+    def default(cls):
+        return cls(DEFAULT_WALLS)
+
+    @classmethod
+    def load(cls, path):
+        """Carga un arena JSON: {"walls": [[[x1, y1], [x2, y2]], ...], "cell_size": opcional}"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['walls'], cell_size=data.get('cell_size', ARENA_CELL_SIZE))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'walls': self.segments.reshape(-1, 2, 2).tolist(), 'cell_size': self.cell_size}, f)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _build_grid(self):
+        """Asigna cada pared a las celdas que pasan a menos de `margin` de ella"""
+        segments = self.segments
+        pad = self.margin + 1.0
+        if len(segments):
+            lo = (segments[:, [0, 2]].min() - pad, segments[:, [1, 3]].min() - pad)
+            hi = (segments[:, [0, 2]].max() + pad, segments[:, [1, 3]].max() + pad)
+        else:
+            lo, hi = (0.0, 0.0), (1.0, 1.0)
+        self.grid = UniformGrid(lo, hi, self.cell_size)
+
+        # Celdas candidatas por caja envolvente y filtro por distancia al centro
+        grid = self.grid
+        half_diagonal = self.cell_size * math.sqrt(0.5)
+        pair_cells = []
+        pair_walls = []
+        for w, (x1, y1, x2, y2) in enumerate(segments):
+            cells = grid.cells_in_box(min(x1, x2) - self.margin, min(y1, y2) - self.margin,
+                                      max(x1, x2) + self.margin, max(y1, y2) + self.margin)
+            cx = cells % grid.shape[0]
+            cy = cells // grid.shape[0]
+            centers = np.stack((grid.origin[0] + (cx + 0.5) * self.cell_size,
+                                grid.origin[1] + (cy + 0.5) * self.cell_size), axis=1)
+            near = _point_segment_distance(centers, x1, y1, x2, y2) <= half_diagonal + self.margin
+            pair_cells.append(cells[near])
+            pair_walls.append(np.full(np.count_nonzero(near), w))
+        if pair_cells:
+            grid.build(np.concatenate(pair_cells), np.concatenate(pair_walls))
+
+        # Las consultas de un solo punto son más rápidas en Python puro
+        self.cell_segments = [[tuple(segments[w]) for w in row[row >= 0]] for row in grid.table]
+
+    def point_near_wall(self, point, threshold=WALL_THICKNESS):
+        """¿Hay alguna pared a menos de `threshold` del punto?"""
+        x, y = point
+        if threshold > self.margin:
+            candidates = map(tuple, self.segments)
+        elif self.grid.contains(x, y):
+            candidates = self.cell_segments[self.grid.cell_index(x, y)]
+        else:
+            return False
+
+        for x1, y1, x2, y2 in candidates:
+            ex = x2 - x1
+            ey = y2 - y1
+            length_sq = ex * ex + ey * ey or 1e-12
+            t = max(0.0, min(1.0, ((x - x1) * ex + (y - y1) * ey) / length_sq))
+            if math.hypot(x - (x1 + t * ex), y - (y1 + t * ey)) <= threshold:
+                return True
+        return False
+
+    def ray_distances(self, ox, oy, dx, dy):
+        """Distancia de cada rayo a la primera pared (inf si no corta ninguna)"""
+        if len(self.segments) <= BRUTE_FORCE_WALLS:
+            self.last_wall_tests = ox.size * len(self.segments)
+            return ray_segment_distances(ox, oy, dx, dy, self.segments)
+
+        shape = np.broadcast(ox, dx).shape
+        ox, oy, dx, dy = (np.broadcast_to(a, shape).ravel() for a in (ox, oy, dx, dy))
+
+        def test(rays, candidates):
+            return _ray_segments(ox[rays], oy[rays], dx[rays], dy[rays], self.segments[candidates])
+
+        distances, self.last_wall_tests = self.grid.traverse(ox, oy, dx, dy, test)
+        return distances.reshape(shape)
+
+
+def make_arena(spec=None):
+    """Arena a partir de None (caja por defecto), una ruta, una lista de paredes o un Arena"""
+    if spec is None:
+        return Arena.default()
+    if isinstance(spec, Arena):
+        return spec
+    if isinstance(spec, str):
+        return Arena.load(spec)
+    return Arena(spec)
+
+
+def _ray_segments(ox, oy, dx, dy, seg):
+    """Distancia de cada rayo (A,) a cada uno de sus segmentos candidatos (A, K, 4)"""
+    x1, y1, x2, y2 = np.moveaxis(seg, -1, 0)
+    ex = x2 - x1
+    ey = y2 - y1
+    wx = x1 - ox[:, None]
+    wy = y1 - oy[:, None]
+    dx = dx[:, None]
+    dy = dy[:, None]
+    denom = dx * ey - dy * ex
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (wx * ey - wy * ex) / denom
+        s = (wx * dy - wy * dx) / denom
+    valid = (np.abs(denom) > 1e-12) & (t >= 0) & (s >= 0) & (s <= 1)
+    return np.where(valid, t, np.inf)
+
+
+def _point_segment_distance(points, x1, y1, x2, y2):
+    """Distancia mínima de cada punto (P, 2) a los segmentos; devuelve (P,) o (P, W)"""
+    px = points[:, 0:1]
+    py = points[:, 1:2]
+    ex = np.atleast_1d(x2 - x1)
+    ey = np.atleast_1d(y2 - y1)
+    length_sq = np.maximum(ex * ex + ey * ey, 1e-12)
+    t = np.clip(((px - x1) * ex + (py - y1) * ey) / length_sq, 0.0, 1.0)
+    distance = np.hypot(px - (x1 + t * ex), py - (y1 + t * ey))
+    return distance[:, 0] if distance.shape[1] == 1 else distance
+
+
+def random_maze(cols, rows, cell=100, origin=(50, 50), seed=None):
+    """Genera las paredes de un laberinto perfecto de cols x rows celdas"""
+    rng = np.random.default_rng(seed)
+    visited = np.zeros((cols, rows), dtype=bool)
+    # Paredes interiores presentes: verticales (a la derecha de cada celda) y horizontales (encima)
+    right = np.ones((cols, rows), dtype=bool)
+    top = np.ones((cols, rows), dtype=bool)
+
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= x + dx < cols and 0 <= y + dy < rows and not visited[x + dx, y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = options[rng.integers(len(options))]
+        if nx != x:
+            right[min(x, nx), y] = False
+        else:
+            top[x, min(y, ny)] = False
+        visited[nx, ny] = True
+        stack.append((nx, ny))
+
+    x0, y0 = origin
+    width = cols * cell
+    height = rows * cell
+    walls = [
+        [(x0, y0), (x0 + width, y0)],
+        [(x0 + width, y0), (x0 + width, y0 + height)],
+        [(x0 + width, y0 + height), (x0, y0 + height)],
+        [(x0, y0 + height), (x0, y0)]
+    ]
+    for x in range(cols):
+        for y in range(rows):
+            if right[x, y] and x < cols - 1:
+                wx = x0 + (x + 1) * cell
+                walls.append([(wx, y0 + y * cell), (wx, y0 + (y + 1) * cell)])
+            if top[x, y] and y < rows - 1:
+                wy = y0 + (y + 1) * cell
+                walls.append([(x0 + x * cell, wy), (x0 + (x + 1) * cell, wy)])
+    return walls
@@ -0,0 +1,243 @@
+# benchmark.py
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import numpy as np
+import torch
+from brain import NymbotBrain, BatchedBrains
+from numpy_brain import NumpyBrain, NumpyBatchedBrains
+from bucketed import BucketedBrains
+from genome import NymbotGenome
+from headless_simulator import HeadlessSimulator
+from vectorized_simulator import VectorizedSimulator
+from kernels import HAVE_NUMBA
+
+FOV_VALUES = [10, 30, 60, 90, 180, 360]
+ARCHITECTURES = [[16], [32, 16], [64, 32], [128, 64, 32]]
+POPULATION_SIZES = [1, 16, 128, 1024]
+
+
+def time_call(fn, min_time=0.2, repeat=3):
+    """Mejor tiempo por llamada (s) de varias rondas de al menos min_time segundos"""
+    # Calibrar el número de llamadas por ronda
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or calls >= 1 << 20:
+            break
+        calls *= 2
+    calls = max(1, int(calls * (min_time / max(elapsed, 1e-9))))
+
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def make_genome(fov=60, architecture=None):
+    genome = NymbotGenome()
+    genome.fov = fov
+    if architecture is not None:
+        genome.brain_architecture = list(architecture)
+    genome.initialize_brain()
+    return genome
+
+
+def make_simulator(fov, vision_mode='analytic'):
+    simulator = HeadlessSimulator(random_seed=0)
+    simulator.set_genome(make_genome(fov))
+    simulator.nymbot.vision_mode = vision_mode
+    return simulator
+
+
+def bench_run_step(fovs, min_time):
+    results = {}
+    for fov in fovs:
+        simulator = make_simulator(fov)
+
+        # advance: el paso sin estado; run_step: el paso más el dict de estado que construye
+        def advance():
+            if simulator.advance():
+                simulator.reset_simulation()
+
+        def run_step():
+            if simulator.run_step()[1]:
+                simulator.reset_simulation()
+
+        for name, step in (('advance', advance), ('run_step', run_step)):
+            seconds = time_call(step, min_time)
+            results[f"{name}[fov={fov}]"] = {'seconds': seconds, 'steps_per_sec': 1 / seconds}
+    return results
+
+
+def bench_run_episode(fovs, min_time, max_steps=200):
+    results = {}
+    for fov in fovs:
+        simulator = make_simulator(fov)
+        seconds = time_call(lambda: simulator.run_episode(max_steps=max_steps, record='full'), min_time, repeat=1)
+        steps = simulator.current_step
+        results[f"run_episode[fov={fov}]"] = {'seconds': seconds, 'steps_per_sec': steps / seconds}
+    return results
+
+
+def bench_vision(fovs, min_time):
+    results = {}
+    for fov in fovs:
+        for mode in ('analytic', 'sdf', 'march'):
+            nymbot = make_simulator(fov, mode).nymbot
+            seconds = time_call(nymbot.update_vision, min_time)
+            results[f"update_vision[{mode},fov={fov}]"] = {'seconds': seconds, 'calls_per_sec': 1 / seconds}
+
+    nymbot = make_simulator(60).nymbot
+    seconds = time_call(lambda: nymbot.cast_ray(nymbot.eye_angle), min_time)
+    results["cast_ray"] = {'seconds': seconds, 'calls_per_sec': 1 / seconds}
+    return results
+
+
+def bench_brain(fovs, architectures, min_time):
+    results = {}
+    for fov in fovs:
+        for architecture in architectures:
+            brain = NymbotBrain(fov, architecture)
+            state = np.random.default_rng(0).random(fov)
+            seconds = time_call(lambda: brain.get_action(state), min_time)
+            name = "x".join(map(str, [fov] + architecture + [3]))
+            results[f"get_action[{name}]"] = {'seconds': seconds, 'calls_per_sec': 1 / seconds}
+            numpy_brain = NumpyBrain.from_torch(brain)
+            seconds = time_call(lambda: numpy_brain.get_action(state), min_time)
+            results[f"numpy_get_action[{name}]"] = {'seconds': seconds, 'calls_per_sec': 1 / seconds}
+    return results
+
+
+def bench_population(populations, min_time):
+    results = {}
+    for n in populations:
+        genomes = [make_genome() for _ in range(n)]
+
+        batched = BatchedBrains(g.brain for g in genomes)
+        states = np.random.default_rng(0).random((n, genomes[0].fov))
+        seconds = time_call(lambda: batched.get_actions(states), min_time)
+        results[f"batched_get_actions[n={n}]"] = {'seconds': seconds, 'agent_steps_per_sec': n / seconds}
+
+        numpy_batched = NumpyBatchedBrains(g.brain for g in genomes)
+        seconds = time_call(lambda: numpy_batched.get_actions(states), min_time)
+        results[f"numpy_batched_get_actions[n={n}]"] = {'seconds': seconds, 'agent_steps_per_sec': n / seconds}
+
+        # Población mezclada (FOV distintos): un lote por grupo frente a un cerebro cada vez
+        mixed = [make_genome(fov=int(f)) for f in np.random.default_rng(0).integers(40, 80, n)]
+        mixed_states = np.random.default_rng(0).random((n, 80))
+        bucketed = BucketedBrains(g.brain for g in mixed)
+        seconds = time_call(lambda: bucketed.get_actions(mixed_states), min_time)
+        results[f"bucketed_get_actions[n={n}]"] = {'seconds': seconds, 'agent_steps_per_sec': n / seconds}
+        seconds = time_call(lambda: [g.brain.get_action(mixed_states[i, :g.fov]) for i, g in enumerate(mixed)],
+                            min_time)
+        results[f"per_agent_get_actions[n={n}]"] = {'seconds': seconds, 'agent_steps_per_sec': n / seconds}
+
+        for backend in ('numpy', 'numba') if HAVE_NUMBA else ('numpy',):
+            simulator = VectorizedSimulator(genomes=genomes, random_seed=0, kernel_backend=backend)
+
+            def step():
+                simulator.step()
+                if not simulator.alive.any():
+                    simulator.reset()
+
+            seconds = time_call(step, min_time)
+            key = "vectorized_step" if backend == 'numpy' else "vectorized_step_numba"
+            results[f"{key}[n={n}]"] = {'seconds': seconds, 'agent_steps_per_sec': n / seconds}
+    return results
+
+
+def run_benchmarks(quick=False, only=None, min_time=0.2):
+    random.seed(0)
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+
+    fovs = [10, 60, 360] if quick else FOV_VALUES
+    architectures = ARCHITECTURES[:2] if quick else ARCHITECTURES
+    populations = POPULATION_SIZES[:3] if quick else POPULATION_SIZES
+
+    suites = {
+        'run_step': lambda: bench_run_step(fovs, min_time),
+        'run_episode': lambda: bench_run_episode(fovs, min_time),
+        'vision': lambda: bench_vision(fovs, min_time),
+        'brain': lambda: bench_brain(fovs, architectures, min_time),
+        'population': lambda: bench_population(populations, min_time),
+    }
+
+    results = {}
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        results.update(suite())
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'torch': torch.__version__,
+            'machine': platform.machine(),
+            'quick': quick,
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, tolerance=0.1):
+    """Compara con una línea base; devuelve la lista de regresiones"""
+    regressions = []
+    print(f"{'benchmark':40s} {'base (us)':>12s} {'actual (us)':>12s} {'ratio':>8s}")
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        base = baseline['results'][name]['seconds']
+        ratio = result['seconds'] / base
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  <-- regresión"
+        print(f"{name:40s} {base * 1e6:12.2f} {result['seconds'] * 1e6:12.2f} {ratio:8.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de la simulación")
+    parser.add_argument('--output', '-o', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--baseline', '-b', help="JSON de referencia con el que comparar")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Ralentización tolerada (0.1 = 10%%)")
+    parser.add_argument('--quick', action='store_true', help="Barrido reducido")
+    parser.add_argument('--only', nargs='*', help="Suites a ejecutar (run_step, run_episode, vision, brain, population)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Segundos mínimos por medición")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(quick=args.quick, only=args.only, min_time=args.min_time)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regresiones por encima del {args.tolerance:.0%}")
+            return 1
+    else:
+        for name, result in current['results'].items():
+            print(f"{name:40s} {result['seconds'] * 1e6:12.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,21 @@
 # brain.py
+import numpy as np
 import torch
 import torch.nn as nn
 
 class NymbotBrain(nn.Module):
-    def __init__(self, input_size, hidden_layers):  # Solo 2 argumentos ahora
+    """MLP del nymbot con todos los parámetros en un único buffer contiguo
+
+    `flat` es un tensor float32 1D y cada peso/sesgo es una vista sobre él,
+    así que mutar, cruzar o serializar el cerebro es una operación sobre
+    un solo array. Si se pasa `flat` (p. ej. al deserializar) se adopta sin
+    copiar en lugar de usar la inicialización aleatoria.
+    """
+
+    def __init__(self, input_size, hidden_layers, flat=None):  # flat es opcional
         super().__init__()
+        self.input_size = input_size
+        self.hidden_layers = list(hidden_layers)
         layers = []
         prev_size = input_size
         
@@ -18,6 +29,43 @@ class NymbotBrain(nn.Module):
         layers.append(nn.Tanh())  # Para salida en [-1, 1]
         
         self.net = nn.Sequential(*layers)
+        self._flatten_parameters(flat)
+
+    def _flatten_parameters(self, flat=None):
+        """Mueve los parámetros a un buffer contiguo y los deja como vistas"""
+        params = list(self.net.parameters())
+        n_params = sum(p.numel() for p in params)
+        if flat is None:
+            self.flat = torch.empty(n_params)
+            copy_values = True
+        else:
+            if not isinstance(flat, torch.Tensor):
+                flat = torch.from_numpy(np.require(flat, np.float32, ['C', 'W']))
+            if flat.numel() != n_params:
+                raise ValueError(f"Se esperaban {n_params} parámetros, no {flat.numel()}")
+            self.flat = flat
+            copy_values = False
+
+        offset = 0
+        with torch.no_grad():
+            for p in params:
+                view = self.flat[offset:offset + p.numel()].view_as(p)
+                if copy_values:
+                    view.copy_(p)
+                p.data = view
+                offset += p.numel()
+
+    @property
+    def n_params(self):
+        return self.flat.numel()
+
+    def weights(self):
+        """Vista NumPy (sin copia) del buffer de parámetros"""
+        return self.flat.numpy()
+
+    def __reduce__(self):
+        # Se serializa sólo el buffer; con pickle 5 viaja fuera de banda sin copias
+        return (self.__class__, (self.input_size, self.hidden_layers, self.weights()))
     
     def forward(self, x):
         return self.net(x)
@@ -26,4 +74,59 @@ class NymbotBrain(nn.Module):
         with torch.no_grad():
             state_tensor = torch.FloatTensor(state)
             # Devuelve un array de 3 valores en [-1, 1]
-            return self.forward(state_tensor).numpy()
\ No newline at end of file
+            return self.forward(state_tensor).numpy()
+
+class BatchedBrains:
+    """Evalúa una población de cerebros con la misma arquitectura en lote
+
+    Los pesos de cada capa se apilan en tensores (N, entrada, salida), así que
+    cada capa es un único matmul por lotes para toda la población. Con
+    input_size, la primera capa de cada cerebro se rellena con ceros hasta ese
+    tamaño (pueden mezclarse entradas distintas).
+    """
+
+    def __init__(self, brains, input_size=None):
+        brains = list(brains)
+        self.input_size = input_size or brains[0].net[0].in_features
+
+        # La entrada puede variar (se rellena con ceros); el resto debe coincidir
+        reference = [tuple(p.shape) for p in brains[0].parameters()][1:]
+        for brain in brains:
+            if ([tuple(p.shape) for p in brain.parameters()][1:] != reference
+                    or brain.net[0].in_features > self.input_size):
+                raise ValueError("Todos los cerebros deben compartir arquitectura")
+
+        self.brains = brains
+        self.n_brains = len(brains)
+
+        # Buffer de entrada preasignado (comparte memoria con su vista NumPy)
+        self._input = torch.zeros(self.n_brains, 1, self.input_size)
+        self._input_np = self._input.numpy()[:, 0, :]
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a apilar los pesos (p. ej. tras una mutación)"""
+        modules = list(self.brains[0].net)
+        self.layers = []
+        with torch.no_grad():
+            for i, module in enumerate(modules):
+                if isinstance(module, nn.Linear):
+                    weights = [b.net[i].weight for b in self.brains]
+                    if i == 0:
+                        weights = [nn.functional.pad(w, (0, self.input_size - w.shape[1])) for w in weights]
+                    weight = torch.stack(weights).transpose(1, 2).contiguous()
+                    bias = torch.stack([b.net[i].bias for b in self.brains]).unsqueeze(1)
+                    self.layers.append([weight, bias, None])
+                else:
+                    self.layers[-1][2] = module
+
+    def get_actions(self, states):
+        """Devuelve un array (N, 3) de acciones en [-1, 1]"""
+        np.copyto(self._input_np, states[:, :self.input_size])
+        with torch.no_grad():
+            x = self._input
+            for weight, bias, activation in self.layers:
+                x = torch.baddbmm(bias, x, weight)
+                if activation is not None:
+                    x = activation(x)
+            return x[:, 0, :].numpy()
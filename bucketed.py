@@ -0,0 +1,58 @@
+# bucketed.py
+import numpy as np
+from brain import BatchedBrains
+from numpy_brain import NumpyBatchedBrains
+from config import BRAIN_BACKEND, BRAIN_INPUT_BUCKET
+
+
+def brain_shape(brain):
+    """(entradas, capas ocultas) de un NymbotBrain o de un CompactGenome"""
+    hidden = getattr(brain, 'hidden_layers', None)
+    if hidden is None:
+        hidden = brain.brain_architecture
+    return int(brain.input_size), tuple(hidden)
+
+
+def bucket_input_size(input_size, bucket=BRAIN_INPUT_BUCKET):
+    """Entrada redondeada hacia arriba al múltiplo de bucket"""
+    return -(-input_size // bucket) * bucket
+
+
+class BucketedBrains:
+    """Inferencia en lote para una población con cerebros de formas distintas
+
+    Los cerebros se agrupan por (capas ocultas, entrada redondeada a múltiplos
+    de `bucket`); cada grupo apila sus pesos con la primera capa rellenada con
+    ceros hasta la entrada del grupo, así que los rayos de relleno no cambian
+    la salida. get_actions hace un forward en lote por grupo y devuelve las
+    acciones en el orden original.
+    """
+
+    def __init__(self, brains, brain_backend=BRAIN_BACKEND, bucket=BRAIN_INPUT_BUCKET):
+        brains = list(brains)
+        groups = {}
+        for i, brain in enumerate(brains):
+            input_size, hidden = brain_shape(brain)
+            groups.setdefault((hidden, bucket_input_size(input_size, bucket)), []).append(i)
+
+        batched = NumpyBatchedBrains if brain_backend == 'numpy' else BatchedBrains
+        self.n_brains = len(brains)
+        self.buckets = []
+        for (_, input_size), indices in groups.items():
+            members = batched((brains[i] for i in indices), input_size=input_size)
+            states = np.zeros((len(indices), input_size), dtype=np.float32)
+            self.buckets.append((np.array(indices), members, states))
+        self._actions = np.zeros((self.n_brains, 3))
+
+    def refresh(self):
+        for _, members, _ in self.buckets:
+            members.refresh()
+
+    def get_actions(self, states):
+        """Devuelve un array (N, 3) de acciones (buffer interno reutilizado)"""
+        width = states.shape[1]
+        for indices, members, bucket_states in self.buckets:
+            n = min(width, bucket_states.shape[1])
+            bucket_states[:, :n] = states[indices, :n]
+            self._actions[indices] = members.get_actions(bucket_states)
+        return self._actions
@@ -0,0 +1,135 @@
+# checkpoint.py
+import hashlib
+import os
+import pickle
+import struct
+import numpy as np
+from genome import NymbotGenome
+
+# Cabecera del archivo y de cada registro: marca, tipo, clave (huella del genoma), longitud y checksum
+_FILE_MAGIC = b'NYMBCKP1'
+_HEADER = struct.Struct('<4sB32sQ16s')
+_MAGIC = b'NYMB'
+GENOME = ord('G')
+STATE = ord('S')
+
+
+def _checksum(payload):
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class Checkpoint:
+    """Puntos de control de una evolución en un archivo de sólo anexado
+
+    El archivo es una secuencia de registros:
+        G  un genoma (rasgos, arquitectura, entrada y pesos), direccionado por
+           su content_hash; cada contenido se escribe una sola vez
+        S  el estado del runner: huellas de la población, aptitud, historial,
+           contadores y estados de los generadores aleatorios
+
+    Guardar sólo añade los genomas nuevos (las élites y copias ya están) y un
+    registro S, y termina con fsync. El archivo empieza con una marca propia:
+    abrir un archivo que no la tiene es un error y no se toca. Al abrir se
+    recorren los registros comprobando longitud y checksum y se corta desde el
+    primero incompleto o corrupto (caída durante la escritura); el último S
+    intacto es el punto de reanudación.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}  # huella -> (offset del contenido, longitud)
+        self.last_state = None  # (offset, longitud) del último registro S
+        self.file = open(path, 'a+b')
+        self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scan(self):
+        """Reconstruye el índice y recorta la cola incompleta o corrupta"""
+        f = self.file
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        head = f.read(len(_FILE_MAGIC))
+        if size == 0 or (size < len(_FILE_MAGIC) and _FILE_MAGIC.startswith(head)):
+            # Archivo nuevo (o creado a medias)
+            f.truncate(0)
+            f.write(_FILE_MAGIC)
+            f.flush()
+            return
+        if head != _FILE_MAGIC:
+            raise ValueError(f"{self.path} no es un archivo de checkpoint")
+
+        offset = len(_FILE_MAGIC)
+        while offset + _HEADER.size <= size:
+            magic, kind, key, length, checksum = _HEADER.unpack(f.read(_HEADER.size))
+            start = offset + _HEADER.size
+            if magic != _MAGIC or start + length > size or _checksum(f.read(length)) != checksum:
+                break
+            if kind == GENOME:
+                self.index[key.decode()] = (start, length)
+            elif kind == STATE:
+                self.last_state = (start, length)
+            offset = start + length
+        if offset < size:
+            f.truncate(offset)
+
+    def _append(self, kind, key, payload):
+        f = self.file
+        offset = f.seek(0, os.SEEK_END)
+        f.write(_HEADER.pack(_MAGIC, kind, key.encode().ljust(32, b'\0'), len(payload), _checksum(payload)))
+        f.write(payload)
+        return offset + _HEADER.size, len(payload)
+
+    def _read(self, offset, length):
+        f = self.file
+        f.seek(offset - _HEADER.size)
+        checksum = _HEADER.unpack(f.read(_HEADER.size))[4]
+        payload = f.read(length)
+        if _checksum(payload) != checksum:
+            raise ValueError(f"Registro corrupto en {self.path} (offset {offset})")
+        return payload
+
+    def write_genome(self, genome):
+        """Añade el genoma si su contenido no está ya; devuelve su huella"""
+        key = genome.content_hash()
+        if key not in self.index:
+            blob = (genome.traits(), list(genome.brain_architecture), genome.brain.input_size,
+                    np.array(genome.weights))
+            self.index[key] = self._append(GENOME, key, pickle.dumps(blob, protocol=5))
+        return key
+
+    def read_genome(self, key):
+        traits, architecture, input_size, weights = pickle.loads(self._read(*self.index[key]))
+        return NymbotGenome.from_weights(traits, weights, architecture, input_size)
+
+    def save(self, runner):
+        """Punto de control incremental del runner"""
+        state = runner.get_state()
+        state['population'] = [self.write_genome(genome) for genome in runner.population]
+        self.last_state = self._append(STATE, '', pickle.dumps(state, protocol=5))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return len(self.index)
+
+    def load_state(self):
+        """Último estado guardado (o None si el archivo no tiene ninguno)"""
+        if self.last_state is None:
+            return None
+        return pickle.loads(self._read(*self.last_state))
+
+    def restore(self, runner):
+        """Deja el runner exactamente como en el último punto de control; False si no hay"""
+        state = self.load_state()
+        if state is None:
+            return False
+        population = [self.read_genome(key) for key in state['population']]
+        runner.set_state(state, population)
+        return True
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
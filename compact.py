@@ -0,0 +1,163 @@
+# compact.py
+import hashlib
+import math
+import random
+import numpy as np
+import torch
+from brain import NymbotBrain
+from genome import NymbotGenome
+from config import INITIAL_FOV, INITIAL_MAX_STEP, INITIAL_MAX_BODY_ROT, INITIAL_MAX_EYE_ROT
+
+# Disposición de parámetros por (entradas, arquitectura), calculada una vez
+_PROTOTYPES = {}
+
+
+def prototype(input_size, brain_architecture):
+    """(n_params, cota de inicialización por parámetro, capas (offset, entrada, salida))
+
+    El buffer sigue el orden de NymbotBrain: por capa, pesos (salida, entrada)
+    y luego sesgos. La cota 1/sqrt(entrada) es la de la inicialización por
+    defecto de nn.Linear, para pesos y sesgos.
+    """
+    key = (int(input_size), tuple(brain_architecture))
+    proto = _PROTOTYPES.get(key)
+    if proto is None:
+        sizes = [key[0]] + list(key[1]) + [3]
+        bounds = []
+        layers = []
+        offset = 0
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            layers.append((offset, fan_in, fan_out))
+            bounds.append(np.full(fan_in * fan_out + fan_out, 1 / math.sqrt(fan_in), dtype=np.float32))
+            offset += fan_in * fan_out + fan_out
+        proto = _PROTOTYPES[key] = (offset, np.concatenate(bounds), layers)
+    return proto
+
+
+def random_weights(input_size, brain_architecture, count=None):
+    """Pesos iniciales con la distribución de nn.Linear (uno o `count` genomas)"""
+    n_params, bounds, _ = prototype(input_size, brain_architecture)
+    shape = (n_params,) if count is None else (count, n_params)
+    weights = torch.rand(shape).numpy()
+    weights *= 2
+    weights -= 1
+    weights *= bounds
+    return weights
+
+
+class CompactGenome:
+    """Genoma ligero: rasgos en slots y cerebro como un buffer float32 plano
+
+    Los pesos se generan al primer acceso (con la disposición cacheada del
+    prototipo de su arquitectura) y el nn.Module sólo se construye si alguien
+    pide .brain, compartiendo el mismo buffer. Para inferencia NumPy basta con
+    numpy_layers(), que no toca torch. to_genome()/from_genome() convierten
+    desde y hacia NymbotGenome, y content_hash() coincide con el suyo.
+    """
+
+    __slots__ = ('fov', 'max_step_size', 'max_body_rotation', 'max_eye_rotation',
+                 'brain_architecture', 'input_size', '_weights', '_brain')
+
+    def __init__(self, traits=None, weights=None, brain_architecture=(32, 16), input_size=None):
+        if traits is None:
+            traits = (INITIAL_FOV, INITIAL_MAX_STEP, INITIAL_MAX_BODY_ROT, INITIAL_MAX_EYE_ROT)
+        fov, self.max_step_size, self.max_body_rotation, self.max_eye_rotation = map(float, traits)
+        self.fov = int(fov)
+        self.brain_architecture = tuple(brain_architecture)
+        self.input_size = int(input_size or self.fov)
+        self._weights = weights
+        self._brain = None
+
+    @classmethod
+    def population(cls, size, brain_architecture=(32, 16), traits=None):
+        """`size` genomas cuyos pesos son filas de un único bloque (N, P)"""
+        input_size = int(traits[0]) if traits is not None else INITIAL_FOV
+        block = random_weights(input_size, brain_architecture, count=size)
+        return [cls(traits, row, brain_architecture, input_size) for row in block]
+
+    @classmethod
+    def from_genome(cls, genome):
+        return cls(genome.traits(), genome.weights.copy(), genome.brain_architecture, genome.brain.input_size)
+
+    def to_genome(self):
+        """NymbotGenome que comparte el buffer de pesos"""
+        return NymbotGenome.from_weights(self.traits(), self.weights, self.brain_architecture, self.input_size)
+
+    def __reduce__(self):
+        return (self.__class__, (self.traits(), self.weights, self.brain_architecture, self.input_size))
+
+    @property
+    def weights(self):
+        if self._weights is None:
+            self._weights = random_weights(self.input_size, self.brain_architecture)
+        return self._weights
+
+    @property
+    def brain(self):
+        """NymbotBrain sobre el mismo buffer (se construye la primera vez)"""
+        if self._brain is None:
+            self._brain = NymbotBrain(self.input_size, list(self.brain_architecture), flat=self.weights)
+        return self._brain
+
+    def numpy_layers(self):
+        """Capas [(peso (entrada, salida), sesgo, activación)] para numpy_brain, sin torch"""
+        weights = self.weights
+        _, _, layers = prototype(self.input_size, self.brain_architecture)
+        result = []
+        for offset, fan_in, fan_out in layers:
+            weight = weights[offset:offset + fan_in * fan_out].reshape(fan_out, fan_in).T.copy()
+            bias = weights[offset + fan_in * fan_out:offset + fan_in * fan_out + fan_out].copy()
+            result.append([weight, bias, 'relu'])
+        result[-1][2] = 'tanh'
+        return result
+
+    def traits(self):
+        return (self.fov, self.max_step_size, self.max_body_rotation, self.max_eye_rotation)
+
+    complexity_cost = NymbotGenome.complexity_cost
+
+    def copy(self):
+        weights = None if self._weights is None else self._weights.copy()
+        return CompactGenome(self.traits(), weights, self.brain_architecture, self.input_size)
+
+    def mutate(self, mutation_rate=0.1):
+        """Mismas reglas que NymbotGenome.mutate, sobre el buffer plano"""
+        for param in ('fov', 'max_step_size', 'max_body_rotation', 'max_eye_rotation'):
+            if random.random() < mutation_rate:
+                current = getattr(self, param)
+                setattr(self, param, type(current)(current * random.uniform(0.8, 1.2)))
+
+        if random.random() < mutation_rate:
+            weights = self.weights
+            weights += 0.1 * torch.randn(len(weights)).numpy()
+
+        if random.random() < mutation_rate:
+            self.fov = self.fov * random.uniform(0.9, 1.1)
+        self.fov = int(np.clip(round(self.fov), 10, 360))
+
+        if self.fov != self.input_size:
+            self.resize_input()
+
+    def resize_input(self):
+        """Ajusta la primera capa al FOV actual conservando las columnas comunes"""
+        old_layers = prototype(self.input_size, self.brain_architecture)[2]
+        old = self.weights
+        new = random_weights(self.fov, self.brain_architecture)
+        new_layers = prototype(self.fov, self.brain_architecture)[2]
+
+        (_, old_in, out), (_, new_in, _) = old_layers[0], new_layers[0]
+        n = min(old_in, new_in)
+        new[:out * new_in].reshape(out, new_in)[:, :n] = old[:out * old_in].reshape(out, old_in)[:, :n]
+        # El resto de capas (y el sesgo de la primera) no dependen de la entrada
+        new[out * new_in:] = old[out * old_in:]
+
+        self.input_size = self.fov
+        self._weights = new
+        self._brain = None
+
+    def content_hash(self):
+        """Igual que NymbotGenome.content_hash para el mismo contenido"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((self.traits(), list(self.brain_architecture), self.input_size)).encode())
+        digest.update(np.ascontiguousarray(self.weights, dtype=np.float32))
+        return digest.hexdigest()
@@ -20,5 +20,56 @@ FOOD_ENERGY = 15.0
 BASE_ENERGY_COST = 0.01
 MAX_RAY_DISTANCE = 1000  # Suficiente para alcanzar cualquier pared
 FOV_ENERGY_COST_PER_DEGREE = 0.001  # Costo por grado de FOV
+FOOD_RADIUS = 8
 
-# Parámetros de visión
\ No newline at end of file
+# Parámetros de visión
+VISION_MODE = "analytic"  # "analytic" (intersección exacta), "sdf" (campo de distancias) o "march" (referencia por pasos)
+SDF_RESOLUTION = 2.0  # Separación (px) entre nodos del campo de distancias
+SDF_EPSILON = 0.5  # Distancia (px) a la que un rayo trazado por esferas se considera impacto
+SDF_MAX_STEPS = 24  # Saltos máximos; los rayos restantes usan la intersección exacta
+SDF_CACHE_DIR = None  # Carpeta de campos precalculados (None = carpeta temporal del sistema)
+
+# Inferencia del cerebro
+BRAIN_BACKEND = "torch"  # "torch" o "numpy" (pesos exportados, sin overhead de dispatch)
+BRAIN_INPUT_BUCKET = 16  # Redondeo de la entrada al agrupar en lote cerebros de FOV distinto
+
+# Parámetros del arena
+WALL_THICKNESS = 5  # Distancia a la que un punto "toca" una pared
+ARENA_CELL_SIZE = 50  # Tamaño de celda de la rejilla espacial de paredes
+
+# Parámetros de la comida
+NYMBOT_RADIUS = 10
+FOOD_COUNT = 1  # 1 = comida única original
+FOOD_RESPAWN = "random"  # "random", "delayed" o "none"
+FOOD_RESPAWN_DELAY = 50  # Pasos hasta reaparecer con "delayed"
+FOOD_CELL_SIZE = 64  # Tamaño de celda de la rejilla de comida
+
+# Avance rápido del simulador visual
+FAST_FORWARD_SPEEDS = [1, 2, 5, 10, 25, 50, 100, 250, 1000]  # Pasos por frame seleccionables con +/-
+FAST_FORWARD_BUDGET = 0.012  # Segundos de simulación por frame en modo adaptativo (deja margen a 60 FPS)
+
+# Servidor local de evaluación
+EVAL_SOCKET = None  # Socket Unix de eval_server.py (None = directorio privado del usuario)
+EVAL_BATCH_WINDOW = 0.005  # Segundos que se esperan para juntar peticiones en un lote
+EVAL_MAX_BATCH = 1024  # Genomas máximos por lote
+
+# Kernels de física y visión por lotes (VectorizedSimulator)
+KERNEL_BACKEND = "auto"  # "auto" (Numba si está instalado), "numba" o "numpy"
+
+# Evaluación por carreras (racing.py) y terminación de agentes estancados
+STAGNATION_STEPS = None  # Pasos sin comer ni desplazarse antes de terminar (None = desactivado)
+STAGNATION_RADIUS = 10.0  # Desplazamiento mínimo que cuenta como movimiento
+RACING_RUNGS = (125, 250, 500)  # Horizontes intermedios; tras el último se corre hasta MAX_STEPS
+RACING_KEEP = 0.5  # Fracción de supervivientes que sigue en cada horizonte
+RACING_STAGNATION_STEPS = 100  # Terminación por estancamiento durante las carreras
+
+# Estrategias evolutivas (es.py)
+ES_NOISE_SIZE = 2**22  # Valores float32 de la tabla de ruido compartida (16 MB)
+ES_NOISE_SEED = 123  # Semilla fija: todos los procesos ven la misma tabla
+ES_POPULATION = 32  # Evaluaciones por generación (pares antitéticos x 2)
+ES_SIGMA = 0.05  # Desviación de las perturbaciones
+ES_LEARNING_RATE = 0.02
+ES_WEIGHT_DECAY = 0.005
+
+# Puntos de control de la evolución (checkpoint.py)
+CHECKPOINT_EVERY = 1  # Generaciones entre puntos de control
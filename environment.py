@@ -1,20 +1,17 @@
 import arcade
 import numpy as np
 import math
+from arena import make_arena
 from config import SCREEN_HEIGHT, SCREEN_WIDTH, BACKGROUND_COLOR
 
 class Environment(arcade.Window):
-    def __init__(self):
+    def __init__(self, arena=None):
         super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, "Nymbot Evolution")
         arcade.set_background_color(BACKGROUND_COLOR)
         
-        # Paredes (caja)
-        self.walls = [
-            [(50, 50), (750, 50)],   # Inferior
-            [(750, 50), (750, 550)], # Derecha
-            [(750, 550), (50, 550)], # Superior
-            [(50, 550), (50, 50)]    # Izquierda
-        ]
+        # Paredes (caja por defecto o arena cargado de archivo)
+        self.arena = make_arena(arena)
+        self.walls = self.arena.walls
         
         # Comida
         self.food_pos = self._random_position()
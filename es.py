@@ -0,0 +1,229 @@
+# es.py
+import math
+import multiprocessing
+import os
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from genome import NymbotGenome
+from shared_population import SharedPopulation
+import evolution
+from config import (BRAIN_BACKEND, MAX_STEPS, ES_NOISE_SIZE, ES_NOISE_SEED, ES_POPULATION, ES_SIGMA,
+                    ES_LEARNING_RATE, ES_WEIGHT_DECAY)
+
+# Tabla de ruido, genoma central y sigma de cada proceso trabajador
+_worker_noise = None
+_worker_center = None
+_worker_sigma = ES_SIGMA
+
+
+def centered_ranks(values):
+    """Rangos centrados en [-0.5, 0.5] (fitness shaping: sólo importa el orden)"""
+    values = np.asarray(values, dtype=np.float64)
+    ranks = np.empty(values.size)
+    ranks[values.ravel().argsort(kind='stable')] = np.arange(values.size)
+    if values.size > 1:
+        ranks = ranks / (values.size - 1) - 0.5
+    else:
+        ranks[:] = 0.0
+    return ranks.reshape(values.shape)
+
+
+class NoiseTable:
+    """Tabla grande de ruido gaussiano en memoria compartida (sólo lectura)
+
+    Se genera una vez con una semilla fija; una perturbación es un desplazamiento
+    en la tabla, así que los trabajadores reciben enteros en lugar de tensores.
+    Al deserializarla en otro proceso se conecta al mismo segmento.
+    """
+
+    def __init__(self, size=ES_NOISE_SIZE, seed=ES_NOISE_SEED, name=None):
+        self.size = size
+        self.seed = seed
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size * 4)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self.name = self.shm.name
+
+        self.noise = np.ndarray((size,), dtype=np.float32, buffer=self.shm.buf)
+        if self.owner:
+            np.random.default_rng(seed).standard_normal(size, dtype=np.float32, out=self.noise)
+        self.noise.flags.writeable = False
+
+    @classmethod
+    def attach(cls, name, size, seed):
+        return cls(size, seed, name=name)
+
+    def __reduce__(self):
+        return (self.attach, (self.name, self.size, self.seed))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    def get(self, offset, dim):
+        """Vector de ruido de longitud dim que empieza en offset (vista, sin copia)"""
+        return self.noise[offset:offset + dim]
+
+    def sample_offsets(self, rng, n, dim):
+        return rng.integers(0, self.size - dim + 1, size=n)
+
+    def close(self):
+        self.__dict__.pop('noise', None)
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _init_es_worker(noise, center, sigma, max_steps, brain_backend=BRAIN_BACKEND):
+    """Prepara el proceso: simulador de evolution más la tabla y el centro compartidos"""
+    global _worker_noise, _worker_center, _worker_sigma
+    evolution._init_worker(max_steps, brain_backend)
+    _worker_noise = noise
+    _worker_center = center
+    _worker_sigma = sigma
+
+
+def _evaluate_pair(task):
+    """Aptitud de theta + sigma*eps y theta - sigma*eps (muestreo antitético)"""
+    offset, seed = task
+    center = _worker_center.read(0)
+    theta = center.weights
+    perturbation = _worker_sigma * _worker_noise.get(offset, len(theta))
+    fitness = []
+    for weights in (theta + perturbation, theta - perturbation):
+        genome = NymbotGenome.from_weights(center.traits(), weights, center.brain_architecture,
+                                           center.brain.input_size)
+        fitness.append(evolution._evaluate((genome, seed)))
+    return fitness
+
+
+def _release_center(center):
+    """Suelta la referencia del proceso local al centro antes de cerrarlo"""
+    global _worker_center
+    if _worker_center is center:
+        _worker_center = None
+
+
+class ESOptimizer:
+    """Estrategias evolutivas sobre los pesos del cerebro de un genoma central
+
+    Cada generación evalúa population_size // 2 pares antitéticos con la misma
+    semilla de episodio, transforma las aptitudes en rangos centrados y mueve
+    el centro en la dirección estimada del gradiente. El centro vive en una
+    SharedPopulation de un solo genoma y el ruido en una NoiseTable, así que
+    a los trabajadores sólo viajan (desplazamiento, semilla) y vuelven dos
+    escalares. Los rasgos del genoma (FOV, velocidades) no cambian.
+    """
+
+    def __init__(self, genome=None, population_size=ES_POPULATION, sigma=ES_SIGMA,
+                 learning_rate=ES_LEARNING_RATE, weight_decay=ES_WEIGHT_DECAY, noise=None,
+                 max_steps=MAX_STEPS, processes=None, brain_backend=BRAIN_BACKEND, random_seed=None):
+        self.genome = genome if genome is not None else NymbotGenome()
+        self.n_pairs = max(1, population_size // 2)
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.max_steps = max_steps
+        self.processes = processes or os.cpu_count() or 1
+        self.brain_backend = brain_backend
+        self.rng = np.random.default_rng(random_seed)
+
+        self.owns_noise = noise is None
+        self.noise = NoiseTable() if noise is None else noise
+        self.center = SharedPopulation(1, self.genome.brain_architecture)
+        self.generation = 0
+        self.history = []
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def theta(self):
+        """Pesos del centro (vista del buffer plano del genoma)"""
+        return self.genome.weights
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.processes, initializer=_init_es_worker,
+                initargs=(self.noise, self.center, self.sigma, self.max_steps, self.brain_backend)
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self.center is not None:
+            _release_center(self.center)
+            self.center.close()
+            self.center.unlink()
+            self.center = None
+        if self.owns_noise and self.noise is not None:
+            self.noise.close()
+            self.noise.unlink()
+            self.noise = None
+
+    def evaluate_pairs(self, offsets, seed):
+        """Aptitudes (n_pairs, 2) de las perturbaciones +/- de cada desplazamiento"""
+        self.center.write(0, self.genome)
+        tasks = [(int(offset), seed) for offset in offsets]
+        if self.processes == 1:
+            if _worker_center is not self.center:
+                _init_es_worker(self.noise, self.center, self.sigma, self.max_steps, self.brain_backend)
+            results = [_evaluate_pair(task) for task in tasks]
+        else:
+            chunksize = max(1, math.ceil(len(tasks) / (self.processes * 4)))
+            results = list(self._get_pool().imap(_evaluate_pair, tasks, chunksize=chunksize))
+        return np.array(results, dtype=np.float64)
+
+    def step(self):
+        """Una generación: evalúa los pares, estima el gradiente y actualiza el centro"""
+        theta = self.theta
+        seed = int(self.rng.integers(2**31))
+        offsets = self.noise.sample_offsets(self.rng, self.n_pairs, len(theta))
+        fitness = self.evaluate_pairs(offsets, seed)
+
+        ranks = centered_ranks(fitness)
+        weights = ranks[:, 0] - ranks[:, 1]
+        noise = self.noise.noise[offsets[:, None] + np.arange(len(theta))]
+        gradient = weights @ noise / (2 * self.n_pairs * self.sigma)
+        theta += (self.learning_rate * (gradient - self.weight_decay * theta)).astype(theta.dtype)
+
+        stats = {
+            'generation': self.generation,
+            'best': float(fitness.max()),
+            'mean': float(fitness.mean()),
+            'gradient_norm': float(np.linalg.norm(gradient))
+        }
+        self.history.append(stats)
+        self.generation += 1
+        return stats
+
+    def run(self, generations, callback=None):
+        """Ejecuta varias generaciones; devuelve el genoma central"""
+        for _ in range(generations):
+            stats = self.step()
+            if callback is not None:
+                callback(stats)
+        return self.genome
+
+
+if __name__ == "__main__":
+    with ESOptimizer(population_size=32, random_seed=69) as optimizer:
+        optimizer.run(5, callback=lambda s: print(
+            f"Generación {s['generation']}: mejor {s['best']:.3f} | media {s['mean']:.3f}"
+        ))
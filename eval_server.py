@@ -0,0 +1,330 @@
+# eval_server.py
+import argparse
+import asyncio
+import math
+import os
+import pickle
+import socket
+import stat
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from vectorized_simulator import VectorizedSimulator
+import evolution
+from evolution import episode_fitness
+from config import MAX_STEPS, EVAL_SOCKET, EVAL_BATCH_WINDOW, EVAL_MAX_BATCH
+
+ENGINES = ('vectorized', 'headless')
+
+# Cabecera de cada mensaje: longitud del pickle (uint32 big-endian)
+_HEADER = struct.Struct('!I')
+
+
+def default_socket_path():
+    """Socket dentro de un directorio privado del usuario (XDG_RUNTIME_DIR o /tmp)"""
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f"nymbot-{os.getuid()}", "eval.sock")
+
+
+def _private_dir(path):
+    """Crea el directorio del socket con 0700 y comprueba que nadie más puede entrar"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"El directorio del socket {directory} debe ser privado (0700) y propio")
+
+
+def _claim_socket(path):
+    """Borra un socket abandonado; se niega si es otro archivo o hay un servidor vivo"""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise FileExistsError(f"{path} existe y no es un socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Ya hay un servidor escuchando en {path}")
+
+
+def _summary(total_steps, final_energy, food_collected):
+    summary = {
+        'total_steps': int(total_steps),
+        'final_energy': float(final_energy),
+        'food_collected': int(food_collected)
+    }
+    summary['fitness'] = episode_fitness(summary)
+    return summary
+
+
+def _run_headless(genomes, seed, max_steps):
+    """Un episodio de HeadlessSimulator por genoma, con el simulador del trabajador de evolution"""
+    if evolution._worker_simulator is None:
+        evolution._init_worker(max_steps)
+    summaries = []
+    for genome in genomes:
+        results = evolution._episode(genome, seed, max_steps)
+        summaries.append(_summary(results['total_steps'], results['final_energy'], results['food_collected']))
+    return summaries
+
+
+def _run_vectorized(genomes, seed, max_steps):
+    """Todos los genomas en un único VectorizedSimulator (cada uno con su flujo aleatorio)"""
+    results = VectorizedSimulator(genomes=genomes, random_seed=seed, max_steps=max_steps).run()
+    return [_summary(*values) for values in zip(results['total_steps'], results['final_energy'],
+                                                results['food_collected'])]
+
+
+_RUNNERS = {'vectorized': _run_vectorized, 'headless': _run_headless}
+
+
+async def read_message(reader):
+    size = _HEADER.unpack(await reader.readexactly(_HEADER.size))[0]
+    return pickle.loads(await reader.readexactly(size))
+
+
+async def write_message(writer, message):
+    payload = pickle.dumps(message, protocol=5)
+    writer.write(_HEADER.pack(len(payload)) + payload)
+    await writer.drain()
+
+
+class EvalServer:
+    """Servicio local de evaluación sobre un socket Unix
+
+    Cada petición es {'genomes': [...], 'config': {...}} con config opcional
+    (engine, seed, max_steps); la respuesta es {'results': [resumen, ...]}
+    con un resumen al estilo de run_episode por genoma, o {'error': ...}.
+    Las peticiones que llegan dentro de `batch_window` segundos con la misma
+    configuración se juntan en una sola evaluación repartida entre un pool de
+    procesos que se mantiene caliente.
+
+    El motor por defecto es 'vectorized': cada trozo del lote corre en un
+    VectorizedSimulator y cada agente usa su propio flujo aleatorio derivado
+    de la semilla, así que el resumen de un genoma sólo depende de (genoma,
+    semilla, max_steps), no de con quién coincidió en el lote. 'headless'
+    ejecuta los genomas uno a uno con HeadlessSimulator (otro simulador, otro
+    resultado para la misma semilla).
+
+    Los mensajes son pickles y deserializarlos ejecuta código: todo cliente
+    que llega al socket debe ser de confianza. Por eso el socket se crea con
+    permisos 0600 (y, por defecto, en un directorio privado 0700) y start()
+    se niega a arrancar si ya hay un servidor vivo en la misma ruta.
+    """
+
+    def __init__(self, path=EVAL_SOCKET, processes=None, batch_window=EVAL_BATCH_WINDOW,
+                 max_batch=EVAL_MAX_BATCH):
+        self.path = path or default_socket_path()
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.pool = None
+        self.server = None
+        self.queue = None
+        self._batcher = None
+        self._dispatches = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def start(self):
+        """Arranca el pool (caliente) y empieza a aceptar conexiones"""
+        if self.path == default_socket_path():
+            _private_dir(self.path)
+        _claim_socket(self.path)
+        self.pool = ProcessPoolExecutor(self.processes, initializer=evolution._init_worker, initargs=(MAX_STEPS,))
+        # Calentar los trabajadores antes de la primera petición
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _run_headless, [], 0, 0)
+                               for _ in range(self.processes)))
+
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        # Sólo el propietario puede conectarse (umask cubre el hueco entre bind y chmod)
+        umask = os.umask(0o177)
+        try:
+            self.server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        if self.queue is not None:
+            # Peticiones que no llegaron a ningún lote
+            while not self.queue.empty():
+                _, _, future = self.queue.get_nowait()
+                future.cancel()
+            self.queue = None
+        # Los lotes en curso terminan y responden antes de apagar el pool
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    async def evaluate(self, genomes, config=None):
+        """Encola genomas y espera sus resúmenes (también usable dentro del proceso)"""
+        config = dict(config or {})
+        engine = config.get('engine', 'vectorized')
+        if engine not in ENGINES:
+            raise ValueError(f"Motor de evaluación desconocido: {engine}")
+        key = (engine, config.get('seed', 0), config.get('max_steps', MAX_STEPS))
+        future = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        await self.queue.put((key, list(genomes), future))
+        return await future
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    results = await self.evaluate(request['genomes'], request.get('config'))
+                    response = {'results': results}
+                except Exception as error:
+                    response = {'error': f"{type(error).__name__}: {error}"}
+                await write_message(writer, response)
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        """Junta las peticiones de una ventana de tiempo y las lanza por configuración"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][1])
+            deadline = loop.time() + self.batch_window
+            try:
+                while size < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(item)
+                    size += len(item[1])
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+
+            groups = {}
+            for key, genomes, future in batch:
+                groups.setdefault(key, []).append((genomes, future))
+            for key, requests in groups.items():
+                # Guardar la referencia: una tarea sin referencias puede recogerse a medias
+                task = asyncio.create_task(self._dispatch(key, requests))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, key, requests):
+        """Evalúa un grupo repartido entre los trabajadores y devuelve a cada petición lo suyo"""
+        engine, seed, max_steps = key
+        genomes = [genome for request_genomes, _ in requests for genome in request_genomes]
+        self.batches += 1
+        try:
+            # Un trozo por trabajador: cada uno ejecuta una evaluación vectorizada (o en serie)
+            chunk = max(1, math.ceil(len(genomes) / self.processes))
+            loop = asyncio.get_running_loop()
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(self.pool, _RUNNERS[engine], genomes[i:i + chunk], seed, max_steps)
+                for i in range(0, len(genomes), chunk)
+            ))
+            results = [summary for part in parts for summary in part]
+        except Exception as error:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        start = 0
+        for request_genomes, future in requests:
+            if not future.done():
+                future.set_result(results[start:start + len(request_genomes)])
+            start += len(request_genomes)
+
+
+class EvalClient:
+    """Cliente síncrono de EvalServer (una conexión persistente)"""
+
+    def __init__(self, path=EVAL_SOCKET, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _recv_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("El servidor cerró la conexión")
+            data += chunk
+        return bytes(data)
+
+    def evaluate(self, genomes, **config):
+        """Resúmenes de episodio (total_steps, final_energy, food_collected, fitness) por genoma"""
+        payload = pickle.dumps({'genomes': list(genomes), 'config': config}, protocol=5)
+        self.sock.sendall(_HEADER.pack(len(payload)) + payload)
+        size = _HEADER.unpack(self._recv_exactly(_HEADER.size))[0]
+        response = pickle.loads(self._recv_exactly(size))
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['results']
+
+    def close(self):
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de evaluación de genomas")
+    parser.add_argument('--socket', default=EVAL_SOCKET,
+                        help="Ruta del socket Unix (por defecto, en un directorio privado del usuario)")
+    parser.add_argument('--processes', type=int, default=None, help="Procesos del pool")
+    parser.add_argument('--batch-window', type=float, default=EVAL_BATCH_WINDOW,
+                        help="Segundos que se esperan para juntar peticiones")
+    args = parser.parse_args(argv)
+
+    server = EvalServer(args.socket, args.processes, args.batch_window)
+    print(f"Evaluando en {server.path} con {server.processes} procesos")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# evolution.py
+import math
+import multiprocessing
+import os
+import random
+import numpy as np
+import torch
+from genome import NymbotGenome
+from headless_simulator import HeadlessSimulator
+from shared_population import SharedPopulation
+from fitness_cache import episode_key
+from checkpoint import Checkpoint
+from config import BRAIN_BACKEND, CHECKPOINT_EVERY, MAX_STEPS, VISION_MODE
+
+# Simulador persistente de cada proceso trabajador
+_worker_simulator = None
+_worker_max_steps = MAX_STEPS
+_worker_store = None
+
+
+def episode_fitness(results):
+    """Aptitud de un episodio: comida recolectada, desempatando por supervivencia"""
+    return results['food_collected'] + results['total_steps'] / MAX_STEPS
+
+
+def _init_worker(max_steps, brain_backend=BRAIN_BACKEND, store=None):
+    """Prepara el proceso: un hilo de torch y un simulador reutilizable"""
+    global _worker_simulator, _worker_max_steps, _worker_store
+    torch.set_num_threads(1)
+    # Con processes=1 esto corre en el proceso del runner: crear el simulador (y su
+    # genoma inicial) no debe consumir los generadores aleatorios de la evolución
+    state = random.getstate()
+    with torch.random.fork_rng(devices=[]):
+        _worker_simulator = HeadlessSimulator(brain_backend=brain_backend)
+    random.setstate(state)
+    _worker_max_steps = max_steps
+    _worker_store = store
+
+
+def _episode(genome, seed, max_steps=None):
+    """Resumen de un episodio del genoma con la semilla dada en el simulador del trabajador"""
+    random.seed(seed)
+    _worker_simulator.set_genome(genome)
+    return _worker_simulator.run_episode(max_steps=max_steps or _worker_max_steps, record='summary')
+
+
+def _evaluate(task):
+    """Evalúa un genoma con la semilla dada en el simulador del trabajador"""
+    genome, seed = task
+    return episode_fitness(_episode(genome, seed))
+
+
+def _evaluate_shared(task):
+    """Igual que _evaluate, pero lee el genoma de la memoria compartida y escribe ahí la aptitud"""
+    i, seed = task
+    _worker_store.fitness[i] = episode_fitness(_episode(_worker_store.read(i), seed))
+
+
+def _release_store(store):
+    """Suelta las vistas del simulador local sobre el almacén antes de cerrarlo"""
+    global _worker_store
+    if _worker_store is store:
+        _worker_store = None
+        _worker_simulator.set_genome(None)
+
+
+class EvolutionRunner:
+    """Bucle generacional: evaluación en paralelo, selección, elitismo y mutación"""
+
+    def __init__(self, population_size=50, elite_fraction=0.1, tournament_size=3,
+                 mutation_rate=0.1, max_steps=MAX_STEPS, processes=None,
+                 chunksize=None, random_seed=None, brain_backend=BRAIN_BACKEND,
+                 shared_memory=False, fitness_cache=None, evaluation_seed=None, racing=None,
+                 checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
+        if racing is not None and fitness_cache is not None:
+            # La aptitud de una carrera depende de toda la población, no sólo del genoma
+            raise ValueError("racing y fitness_cache no se pueden combinar")
+        self.population_size = population_size
+        self.n_elites = max(1, int(population_size * elite_fraction))
+        self.tournament_size = tournament_size
+        self.mutation_rate = mutation_rate
+        self.max_steps = max_steps
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.brain_backend = brain_backend
+        self.shared_memory = shared_memory
+        self.fitness_cache = fitness_cache
+        self.evaluation_seed = evaluation_seed  # Semilla fija: las élites se reutilizan de la caché
+        self.racing = racing  # RacingEvaluator opcional: evalúa por carreras en lugar de episodios completos
+        # Puntos de control: un Checkpoint o la ruta de su archivo
+        self.owns_checkpoint = isinstance(checkpoint, str)
+        self.checkpoint = Checkpoint(checkpoint) if self.owns_checkpoint else checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.rng = random.Random(random_seed)
+
+        if random_seed is not None:
+            random.seed(random_seed)
+            torch.manual_seed(random_seed)
+
+        self.population = [NymbotGenome() for _ in range(population_size)]
+        self.fitness = None
+        self.generation = 0
+        self.history = []
+        self._pool = None
+
+        # Con shared_memory los trabajadores reciben índices en lugar de genomas
+        self.store = None
+        if shared_memory:
+            self.store = SharedPopulation(population_size, self.population[0].brain_architecture)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.processes, initializer=_init_worker,
+                initargs=(self.max_steps, self.brain_backend, self.store)
+            )
+        return self._pool
+
+    def close(self):
+        """Cierra el pool de trabajadores"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self.store is not None:
+            _release_store(self.store)
+            self.store.close()
+            self.store.unlink()
+            self.store = None
+        if self.owns_checkpoint and self.checkpoint is not None:
+            self.checkpoint.close()
+            self.checkpoint = None
+
+    def episode_config(self):
+        """Parámetros que, junto al genoma y la semilla, determinan un episodio"""
+        return (self.max_steps, self.brain_backend, VISION_MODE)
+
+    def evaluate(self, population, seed):
+        """Calcula la aptitud de cada genoma (todos con la misma semilla)"""
+        if self.fitness_cache is None:
+            return self._evaluate_population(population, seed)
+
+        # Sólo se simulan los genomas (distintos) que no están en la caché
+        config = self.episode_config()
+        keys = [episode_key(genome, seed, config) for genome in population]
+        fitness = [self.fitness_cache.get(key) for key in keys]
+        pending = {}
+        for i, key in enumerate(keys):
+            if fitness[i] is None:
+                pending.setdefault(key, i)
+
+        if pending:
+            indices = list(pending.values())
+            computed = dict(zip(pending, self._evaluate_population([population[i] for i in indices], seed)))
+            for key, value in computed.items():
+                self.fitness_cache.put(key, value)
+            self.fitness_cache.flush()
+            fitness = [computed[key] if value is None else value for key, value in zip(keys, fitness)]
+        return fitness
+
+    def _evaluate_population(self, population, seed):
+        if self.racing is not None:
+            return self.racing.evaluate(population, seed)
+
+        if self.store is not None:
+            self.store.write_population(population)
+            tasks = [(i, seed) for i in range(len(population))]
+            evaluate = _evaluate_shared
+        else:
+            tasks = [(genome, seed) for genome in population]
+            evaluate = _evaluate
+
+        if self.processes == 1:
+            if (_worker_simulator is None or _worker_simulator.brain_backend != self.brain_backend
+                    or _worker_store is not self.store):
+                _init_worker(self.max_steps, self.brain_backend, self.store)
+            # En el mismo proceso: random.seed(seed) de cada episodio no debe alterar
+            # el generador global que usan las mutaciones (igual que con un pool)
+            state = random.getstate()
+            with torch.random.fork_rng(devices=[]):
+                fitness = [evaluate(task) for task in tasks]
+            random.setstate(state)
+        else:
+            # Pocos envíos grandes: unas cuatro tandas por trabajador
+            chunksize = self.chunksize or max(1, math.ceil(len(tasks) / (self.processes * 4)))
+            fitness = list(self._get_pool().imap(evaluate, tasks, chunksize=chunksize))
+
+        if self.store is not None:
+            return self.store.fitness[:len(population)].tolist()
+        return fitness
+
+    def select_parent(self):
+        """Selección por torneo"""
+        contenders = self.rng.sample(range(len(self.population)), self.tournament_size)
+        return self.population[max(contenders, key=lambda i: self.fitness[i])]
+
+    def next_generation(self):
+        """Construye la siguiente generación a partir de la aptitud actual"""
+        ranking = sorted(range(len(self.population)), key=lambda i: self.fitness[i], reverse=True)
+
+        # Elitismo: los mejores pasan sin cambios
+        offspring = [self.population[i] for i in ranking[:self.n_elites]]
+
+        while len(offspring) < self.population_size:
+            child = self.select_parent().copy()
+            child.mutate(self.mutation_rate)
+            offspring.append(child)
+
+        self.population = offspring
+        self.generation += 1
+
+    def step(self):
+        """Evalúa la generación actual y produce la siguiente"""
+        seed = self.rng.randrange(2**31)
+        if self.evaluation_seed is not None:
+            seed = self.evaluation_seed
+        self.fitness = self.evaluate(self.population, seed)
+
+        stats = {
+            'generation': self.generation,
+            'best': max(self.fitness),
+            'mean': sum(self.fitness) / len(self.fitness)
+        }
+        self.history.append(stats)
+        best = self.population[max(range(len(self.fitness)), key=self.fitness.__getitem__)]
+
+        self.next_generation()
+        return stats, best
+
+    def get_state(self):
+        """Contadores, historial y estados de los generadores (sin la población)"""
+        return {
+            'population_size': self.population_size,
+            'generation': self.generation,
+            'fitness': self.fitness,
+            'history': self.history,
+            'rng': self.rng.getstate(),
+            'random': random.getstate(),
+            'torch': torch.get_rng_state().numpy(),
+            'numpy': np.random.get_state()
+        }
+
+    def set_state(self, state, population):
+        """Restaura un estado de get_state con su población"""
+        if state['population_size'] != self.population_size:
+            raise ValueError(f"El punto de control es de una población de {state['population_size']}")
+        self.population = population
+        self.generation = state['generation']
+        self.fitness = state['fitness']
+        self.history = state['history']
+        # Al final: construir los genomas consume números aleatorios de torch
+        self.rng.setstate(state['rng'])
+        random.setstate(state['random'])
+        torch.set_rng_state(torch.from_numpy(state['torch']))
+        np.random.set_state(state['numpy'])
+
+    def resume(self):
+        """Continúa desde el último punto de control; False si no hay ninguno"""
+        return self.checkpoint is not None and self.checkpoint.restore(self)
+
+    def run(self, generations, callback=None):
+        """Ejecuta varias generaciones; devuelve el mejor genoma de la última"""
+        best = None
+        for _ in range(generations):
+            stats, best = self.step()
+            if self.checkpoint is not None and self.generation % self.checkpoint_every == 0:
+                self.checkpoint.save(self)
+            if callback is not None:
+                callback(stats)
+        return best
+
+
+if __name__ == "__main__":
+    with EvolutionRunner(population_size=32, random_seed=69) as runner:
+        runner.run(5, callback=lambda s: print(
+            f"Generación {s['generation']}: mejor {s['best']:.3f} | media {s['mean']:.3f}"
+        ))
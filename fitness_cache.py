@@ -0,0 +1,84 @@
+# fitness_cache.py
+import hashlib
+import sqlite3
+from collections import OrderedDict
+
+
+def episode_key(genome, seed, config=()):
+    """Clave de una evaluación: huella del genoma, semilla y configuración del episodio"""
+    config_hash = hashlib.blake2b(repr(config).encode(), digest_size=8).hexdigest()
+    return f"{genome.content_hash()}:{seed}:{config_hash}"
+
+
+class FitnessCache:
+    """Memoria de aptitudes con expulsión LRU y un nivel opcional en disco (sqlite)
+
+    Un episodio es determinista para un genoma, una semilla y una
+    configuración dadas, así que su aptitud puede reutilizarse. El nivel en
+    memoria guarda `capacity` entradas; con `path` todas las entradas se
+    guardan además en una base sqlite que sobrevive a reinicios.
+    """
+
+    def __init__(self, capacity=10000, path=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, value REAL)")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key, count=True):
+        """Aptitud guardada para la clave, o None"""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        elif self.db is not None:
+            row = self.db.execute("SELECT value FROM fitness WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = row[0]
+                self._remember(key, value)
+                if count:
+                    self.disk_hits += 1
+
+        if count:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._remember(key, float(value))
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO fitness VALUES (?, ?)", (key, float(value)))
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def flush(self):
+        """Confirma en disco las entradas pendientes"""
+        if self.db is not None:
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits,
+                'misses': self.misses, 'disk_hits': self.disk_hits}
@@ -0,0 +1,165 @@
+# food.py
+import math
+import random
+import numpy as np
+from raycast import ray_circle_distances
+from spatial import UniformGrid
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FOOD_RADIUS, FOOD_COUNT, FOOD_RESPAWN,
+    FOOD_RESPAWN_DELAY, FOOD_CELL_SIZE
+)
+
+RESPAWN_POLICIES = ('random', 'delayed', 'none')
+
+# Con pocas comidas es más rápido probarlas todas que recorrer la rejilla
+BRUTE_FORCE_FOOD = 16
+
+
+def random_food_position():
+    """Posición aleatoria dentro del área válida (como HeadlessSimulator)"""
+    return [random.randint(100, SCREEN_WIDTH - 100), random.randint(100, SCREEN_HEIGHT - 100)]
+
+
+class FoodField:
+    """Conjunto de comidas indexado en una rejilla espacial
+
+    Políticas de reaparición:
+        random  -> la comida reaparece al instante en otra posición
+        delayed -> reaparece tras `respawn_delay` llamadas a tick() posteriores
+                   (comida en el paso k, vuelve a estar activa en el paso k + delay)
+        none    -> desaparece
+    Con count=1 y 'random' se comporta como la comida única original.
+    """
+
+    def __init__(self, count=FOOD_COUNT, respawn=FOOD_RESPAWN, respawn_delay=FOOD_RESPAWN_DELAY,
+                 random_position=random_food_position, cell_size=FOOD_CELL_SIZE):
+        if respawn not in RESPAWN_POLICIES:
+            raise ValueError(f"Política de reaparición desconocida: {respawn}")
+        self.count = count
+        self.respawn_policy = respawn
+        self.respawn_delay = respawn_delay
+        self.random_position = random_position
+        self.grid = UniformGrid((0, 0), (SCREEN_WIDTH, SCREEN_HEIGHT), cell_size)
+        self.last_food_tests = 0
+        self.reset()
+
+    def reset(self):
+        """Coloca todas las comidas en posiciones nuevas"""
+        self.positions = np.array([self.random_position() for _ in range(self.count)],
+                                  dtype=np.float64).reshape(-1, 2)
+        self.active = np.ones(self.count, dtype=bool)
+        self.timers = np.zeros(self.count, dtype=np.int64)
+        self._dirty = True
+
+    def __len__(self):
+        return self.count
+
+    def position(self, i=0):
+        return self.positions[i].tolist()
+
+    def set_position(self, i, position):
+        self.positions[i] = position
+        self.active[i] = True
+        self._dirty = True
+
+    def active_positions(self):
+        return self.positions[self.active]
+
+    def _rebuild(self):
+        """Reconstruye la rejilla: cada comida se registra en las celdas que toca su círculo"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        items = np.flatnonzero(self.active)
+        if self.count <= BRUTE_FORCE_FOOD:
+            return
+
+        x, y = self.positions[items].T
+        cx0, cy0 = self.grid.cell_coords(x - FOOD_RADIUS, y - FOOD_RADIUS)
+        cx1, cy1 = self.grid.cell_coords(x + FOOD_RADIUS, y + FOOD_RADIUS)
+        nx = self.grid.shape[0]
+        # Un círculo menor que una celda toca como mucho 2x2 celdas
+        cells = np.stack((cy0 * nx + cx0, cy0 * nx + cx1, cy1 * nx + cx0, cy1 * nx + cx1), axis=1)
+        owners = np.repeat(items[:, None], 4, axis=1)
+        unique = np.ones_like(cells, dtype=bool)
+        unique[:, 1] = cx1 != cx0
+        unique[:, 2] = cy1 != cy0
+        unique[:, 3] = (cx1 != cx0) & (cy1 != cy0)
+        self.grid.build(cells[unique], owners[unique])
+
+    def within(self, point, radius):
+        """Índices de las comidas activas cuyo centro está a menos de `radius` del punto"""
+        self._rebuild()
+        x, y = point
+        if self.count <= BRUTE_FORCE_FOOD:
+            candidates = np.flatnonzero(self.active)
+        else:
+            row = self.grid.table[self.grid.cells_in_box(x - radius, y - radius, x + radius, y + radius)]
+            candidates = np.unique(row[row >= 0])
+        self.last_food_tests = len(candidates)
+        if not len(candidates):
+            return candidates
+        delta = self.positions[candidates] - (x, y)
+        return candidates[np.hypot(delta[:, 0], delta[:, 1]) < radius]
+
+    def any_within(self, point, radius):
+        """¿Hay alguna comida activa a menos de `radius`? (ruta rápida para el marcher)"""
+        if self.count == 1:
+            return bool(self.active[0]) and math.dist(point, self.positions[0]) < radius
+        return len(self.within(point, radius)) > 0
+
+    def eat(self, point, radius):
+        """Come todas las comidas que tocan un cuerpo de radio `radius`; devuelve cuántas"""
+        eaten = self.within(point, radius + FOOD_RADIUS)
+        for i in eaten:
+            self.respawn(i)
+        return len(eaten)
+
+    def respawn(self, i):
+        """Aplica la política de reaparición a la comida i"""
+        if self.respawn_policy == 'random':
+            self.positions[i] = self.random_position()
+        else:
+            self.active[i] = False
+            self.timers[i] = self.respawn_delay
+        self._dirty = True
+
+    def tick(self):
+        """Avanza los temporizadores de la reaparición diferida"""
+        if self.respawn_policy != 'delayed':
+            return
+        waiting = ~self.active
+        if not waiting.any():
+            return
+        self.timers[waiting] -= 1
+        for i in np.flatnonzero(waiting & (self.timers <= 0)):
+            self.positions[i] = self.random_position()
+            self.active[i] = True
+        self._dirty = True
+
+    def ray_distances(self, ox, oy, dx, dy, max_distance=np.inf):
+        """Distancia de cada rayo a la primera comida (inf si no alcanza ninguna)
+
+        max_distance (escalar o por rayo) corta el recorrido, p. ej. en la primera pared.
+        """
+        self._rebuild()
+        if self.count <= BRUTE_FORCE_FOOD:
+            centers = self.positions[self.active]
+            self.last_food_tests = ox.size * len(centers)
+            if not len(centers):
+                return np.full(np.broadcast(ox, dx).shape, np.inf)
+            t = ray_circle_distances(ox[..., None], oy[..., None], dx[..., None], dy[..., None],
+                                     centers[:, 0], centers[:, 1])
+            return t.min(axis=-1)
+
+        shape = np.broadcast(ox, dx).shape
+        ox, oy, dx, dy = (np.broadcast_to(a, shape).ravel() for a in (ox, oy, dx, dy))
+        max_distance = np.broadcast_to(max_distance, shape).ravel()
+
+        def test(rays, candidates):
+            centers = self.positions[candidates]
+            return ray_circle_distances(ox[rays, None], oy[rays, None], dx[rays, None], dy[rays, None],
+                                        centers[..., 0], centers[..., 1])
+
+        distances, self.last_food_tests = self.grid.traverse(ox, oy, dx, dy, test, max_distance)
+        return distances.reshape(shape)
@@ -1,4 +1,6 @@
 # genome.py
+import copy
+import hashlib
 import random
 import numpy as np
 import torch
@@ -25,6 +27,16 @@ class NymbotGenome:
         # Inicializar cerebro
         self.initialize_brain()  # Esto llama al método de abajo
     
+    @classmethod
+    def from_weights(cls, traits, weights, brain_architecture=(32, 16), input_size=None):
+        """Construye un genoma sobre un buffer de pesos existente (sin copiarlo)"""
+        genome = cls.__new__(cls)
+        fov, genome.max_step_size, genome.max_body_rotation, genome.max_eye_rotation = map(float, traits)
+        genome.fov = int(fov)
+        genome.brain_architecture = list(brain_architecture)
+        genome.brain = NymbotBrain(input_size or genome.fov, genome.brain_architecture, flat=weights)
+        return genome
+
     def initialize_brain(self):
         input_size = self.fov
         # Ahora solo pasamos input_size y brain_architecture
@@ -33,7 +45,7 @@ class NymbotGenome:
     def mutate(self, mutation_rate=0.1):
         # Mutar parámetros sensoriales/motores
         params = [
-            'vision_resolution', 'fov', 
+            'fov',
             'max_step_size', 'max_body_rotation', 'max_eye_rotation'
         ]
         
@@ -43,17 +55,78 @@ class NymbotGenome:
                 mutated = current * random.uniform(0.8, 1.2)
                 setattr(self, param, type(current)(mutated))
         
-        # Mutar pesos de la red neuronal
+        # Mutar pesos de la red neuronal (una sola operación sobre el buffer plano)
         if random.random() < mutation_rate:
-            state_dict = self.brain.state_dict()
-            for key in state_dict:
-                noise = torch.randn_like(state_dict[key]) * 0.1
-                state_dict[key] += noise
-            self.brain.load_state_dict(state_dict)
+            with torch.no_grad():
+                self.brain.flat.add_(torch.randn_like(self.brain.flat), alpha=0.1)
 
         # Mutar FOV
         if random.random() < mutation_rate:
-            self.fov = np.clip(self.fov * random.uniform(0.9, 1.1), 10, 360)
+            self.fov = self.fov * random.uniform(0.9, 1.1)
+        self.fov = int(np.clip(round(self.fov), 10, 360))
+
+        # La entrada del cerebro depende del FOV
+        if self.fov != self.brain.net[0].in_features:
+            self.resize_brain_input()
+
+    def resize_brain_input(self):
+        """Reconstruye el cerebro para el FOV actual conservando los pesos compartidos"""
+        old_state = self.brain.state_dict()
+        self.initialize_brain()
+        new_state = self.brain.state_dict()
+        for key, value in old_state.items():
+            target = new_state[key]
+            if target.shape == value.shape:
+                target.copy_(value)
+            else:
+                # Primera capa: copiar las columnas de los rayos comunes
+                n = min(target.shape[1], value.shape[1])
+                target[:, :n] = value[:, :n]
+        self.brain.load_state_dict(new_state)
+
+    @property
+    def weights(self):
+        """Vista NumPy de todos los parámetros del cerebro"""
+        return self.brain.weights()
+
+    def traits(self):
+        """Parámetros sensoriales/motores como tupla"""
+        return (self.fov, self.max_step_size, self.max_body_rotation, self.max_eye_rotation)
+
+    def compatible(self, other):
+        """¿Tienen ambos cerebros la misma forma?"""
+        return (self.brain_architecture == other.brain_architecture
+                and self.brain.input_size == other.brain.input_size)
+
+    def crossover(self, other):
+        """Hijo con cruce uniforme de rasgos y pesos (requiere cerebros compatibles)"""
+        if not self.compatible(other):
+            raise ValueError("Los genomas deben compartir arquitectura para cruzarse")
+        child = self.copy()
+        for param in ('max_step_size', 'max_body_rotation', 'max_eye_rotation'):
+            if random.random() < 0.5:
+                setattr(child, param, getattr(other, param))
+        with torch.no_grad():
+            mask = torch.rand(child.brain.n_params) < 0.5
+            child.brain.flat[mask] = other.brain.flat[mask]
+        return child
+
+    def distance(self, other):
+        """Distancia euclídea entre los pesos (inf si las formas no coinciden)"""
+        if not self.compatible(other):
+            return float('inf')
+        return float(np.linalg.norm(self.weights - other.weights))
+
+    def content_hash(self):
+        """Huella estable del genoma: rasgos, arquitectura y bytes de los pesos"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((self.traits(), self.brain_architecture, self.brain.input_size)).encode())
+        digest.update(self.weights)
+        return digest.hexdigest()
+
+    def copy(self):
+        """Copia independiente del genoma (incluido el cerebro)"""
+        return copy.deepcopy(self)
     
     def complexity_cost(self):  # XXX Cambiar para que el costo de la energia sea correspondiente a su uso y no sus rangos
         """Calcula el costo energético de la complejidad"""
@@ -1,24 +1,33 @@
 # headless_simulator.py
 import math
 import random
+from time import perf_counter
 from nymbot import Nymbot
-from config import MAX_STEPS, FOOD_ENERGY, INITIAL_FOV, INITIAL_MAX_STEP, INITIAL_MAX_BODY_ROT, INITIAL_MAX_EYE_ROT
+from arena import make_arena
+from food import FoodField
+from recorder import EpisodeRecorder, EpisodeHistory
+from profiling import PROFILER
+from numpy_brain import NumpyBrain
+from config import BRAIN_BACKEND, MAX_STEPS, FOOD_ENERGY, FOOD_RADIUS, NYMBOT_RADIUS, FOOD_COUNT, FOOD_RESPAWN, FOOD_RESPAWN_DELAY, INITIAL_FOV, INITIAL_MAX_STEP, INITIAL_MAX_BODY_ROT, INITIAL_MAX_EYE_ROT
+
+BRAIN_BACKENDS = ('torch', 'numpy')
 
 class HeadlessSimulator:
-    def __init__(self, initial_conditions=None, random_seed=None):
+    def __init__(self, initial_conditions=None, random_seed=None, brain_backend=BRAIN_BACKEND):
+        if brain_backend not in BRAIN_BACKENDS:
+            raise ValueError(f"Backend de inferencia desconocido: {brain_backend}")
         if random_seed is not None:
             random.seed(random_seed)
         
-        # Configurar paredes fijas (como en visual_simulator)
-        self.walls = [
-            [(50, 50), (750, 50)],   # Inferior
-            [(750, 50), (750, 550)],  # Derecha
-            [(750, 550), (50, 550)],  # Superior
-            [(50, 550), (50, 50)]     # Izquierda
-        ]
-        
         # Inicializar condiciones
         self.initial_conditions = initial_conditions or {}
+        
+        # Arena compilado (por defecto la caja; 'arena' puede ser una ruta o una lista de paredes)
+        self.arena = make_arena(self.initial_conditions.get('arena'))
+        self.walls = self.arena.walls
+        self.genome = None  # Si es None, cada reinicio crea un genoma nuevo
+        self.brain_backend = brain_backend
+        self.profiler = PROFILER
         self.reset_simulation()
         
         # Estado de simulación
@@ -28,24 +37,45 @@ class HeadlessSimulator:
 
     def reset_simulation(self):
         """Inicializa o reinicia la simulación"""
-        # Posición aleatoria de comida
-        self.food_pos = self._random_position()
+        # Comida: por defecto una única comida que reaparece al azar
+        food_config = self.initial_conditions.get('food', {})
+        self.food = FoodField(
+            count=food_config.get('count', FOOD_COUNT),
+            respawn=food_config.get('respawn', FOOD_RESPAWN),
+            respawn_delay=food_config.get('respawn_delay', FOOD_RESPAWN_DELAY),
+            random_position=self._random_position
+        )
         
         # Crear nymbot con posición aleatoria
-        self.nymbot = Nymbot(self.walls, self.food_pos)
+        self.nymbot = Nymbot(self.arena, self.food, genome=self.genome)
         
-        # Aplicar parámetros personalizados si existen
-        if 'genome_params' in self.initial_conditions:
+        # Aplicar parámetros personalizados si existen (sólo a genomas nuevos)
+        if self.genome is None and 'genome_params' in self.initial_conditions:
             genome_params = self.initial_conditions['genome_params']
             self.nymbot.genome.fov = genome_params.get('fov', INITIAL_FOV)
             self.nymbot.genome.max_step_size = genome_params.get('max_step_size', INITIAL_MAX_STEP)
             self.nymbot.genome.max_body_rotation = genome_params.get('max_body_rotation', INITIAL_MAX_BODY_ROT)
             self.nymbot.genome.max_eye_rotation = genome_params.get('max_eye_rotation', INITIAL_MAX_EYE_ROT)
         
+        # Política: el módulo de torch o una copia de sus pesos en NumPy
+        self.policy = self._make_policy()
+        
         # Resetear contadores
         self.current_step = 0
         self.total_food_collected = 0
 
+    def _make_policy(self):
+        """Función estado -> acción según el backend (se rehace en cada reinicio)"""
+        brain = self.nymbot.genome.brain
+        if self.brain_backend == 'numpy':
+            return NumpyBrain.from_torch(brain).get_action
+        return brain.get_action
+
+    def set_genome(self, genome):
+        """Fija el genoma a evaluar en los siguientes episodios"""
+        self.genome = genome
+        self.reset_simulation()
+
     def _random_position(self):
         """Genera posición aleatoria dentro del área válida"""
         return [
@@ -53,31 +83,55 @@ class HeadlessSimulator:
             random.randint(100, 500)   # SCREEN_HEIGHT = 600
         ]
 
-    def run_step(self):
-        """Ejecuta un único paso de simulación"""
+    def advance(self):
+        """Avanza un paso de simulación sin construir el estado; devuelve done"""
+        prof = self.profiler
+        on = prof.enabled
+        if on:
+            t = perf_counter()
+        
         # Actualizar visión
         self.nymbot.update_vision()
+        if on:
+            t = prof.lap('vision', t)
         
         # Obtener acción del cerebro
-        action = self.nymbot.genome.brain.get_action(self.nymbot.vision_data)
+        action = self.policy(self.nymbot.vision_data)
+        if on:
+            t = prof.lap('brain', t)
         
         # Mover nymbot
         self.nymbot.move(action)
+        if on:
+            t = prof.lap('move', t)
         
         # Actualizar energía
         is_alive = self.nymbot.update_energy()
-        
-        # Verificar colisión con comida
-        if self.check_food_collision():
-            self.nymbot.energy += FOOD_ENERGY
-            self.total_food_collected += 1
-            self.food_pos = self._random_position()
+        if on:
+            t = prof.lap('energy', t)
+        
+        # Verificar colisión con comida (las comidas tocadas reaparecen según su política).
+        # tick() va antes: una comida comida en este paso no cuenta este paso como espera
+        self.food.tick()
+        eaten = self.food.eat(self.nymbot.position, NYMBOT_RADIUS)
+        if eaten:
+            self.nymbot.energy += FOOD_ENERGY * eaten
+            self.total_food_collected += eaten
+            if on:
+                prof.count('food_hits', eaten)
+        if on:
+            prof.lap('food', t)
+            prof.count('steps')
         
         # Avanzar contador
         self.current_step += 1
         
         # Determinar si el episodio ha terminado
-        done = not is_alive or self.current_step >= MAX_STEPS
+        return not is_alive or self.current_step >= MAX_STEPS
+
+    def run_step(self):
+        """Ejecuta un único paso de simulación"""
+        done = self.advance()
         
         # Guardar estado actual
         state = {
@@ -92,27 +146,54 @@ class HeadlessSimulator:
         
         return state, done
 
-    def run_episode(self, max_steps=MAX_STEPS):
-        """Ejecuta un episodio completo"""
+    def run_episode(self, max_steps=MAX_STEPS, record='full', record_every=1, ring_size=None, writer=None):
+        """Ejecuta un episodio completo
+
+        record elige qué se graba: 'full', 'every' (cada record_every pasos),
+        'ring' (últimos ring_size pasos) o 'summary' (sólo el estado final).
+        Si se pasa un TrajectoryWriter, cada paso se vuelca también a disco.
+        """
         self.reset_simulation()
         
-        history = []
+        recorder = EpisodeRecorder(record, capacity=ring_size or max_steps, every=record_every)
+        sinks = [recorder.record]
+        if writer is not None:
+            writer.begin_episode()
+            sinks.append(writer.record)
+        nymbot = self.nymbot
         done = False
         
         while not done and self.current_step < max_steps:
-            state, done = self.run_step()
-            history.append(state)
+            # advance() sólo conoce MAX_STEPS; el último paso de este episodio también es done
+            done = self.advance() or self.current_step >= max_steps
+            for sink in sinks:
+                sink(self.current_step, nymbot.position, nymbot.body_angle,
+                     nymbot.eye_angle, nymbot.energy, self.food.positions[0], done)
+        
+        if writer is not None:
+            writer.flush()
         
+        trajectory = recorder.trajectory()
         return {
             'total_steps': self.current_step,
             'final_energy': self.nymbot.energy,
             'food_collected': self.total_food_collected,
-            'history': history
+            'trajectory': trajectory,
+            'history': EpisodeHistory(trajectory)
         }
 
+    @property
+    def food_pos(self):
+        """Posición de la primera comida (compatibilidad con la comida única)"""
+        return self.food.position(0)
+
+    @food_pos.setter
+    def food_pos(self, position):
+        self.food.set_position(0, position)
+
     def check_food_collision(self):
         """Versión simplificada de detección de comida"""
-        return math.dist(self.nymbot.position, self.food_pos) < 18  # Radio 10 + 8
+        return self.food.any_within(self.nymbot.position, NYMBOT_RADIUS + FOOD_RADIUS)
 
     def reset_episode(self):
         """Reinicia el episodio manteniendo configuración"""
@@ -120,11 +201,15 @@ class HeadlessSimulator:
         self.nymbot.body_angle = random.uniform(0, 2 * math.pi)
         self.nymbot.eye_angle = random.uniform(0, 2 * math.pi)
         self.nymbot.energy = 100.0
-        self.food_pos = self._random_position()
+        self.food.reset()
         self.current_step = 0
         self.total_food_collected = 0
         self.current_episode += 1
 
+    def profile_snapshot(self):
+        """Tiempos por fase y contadores acumulados"""
+        return self.profiler.snapshot()
+
     def get_current_state(self):
         """Devuelve el estado actual del simulador"""
         return {
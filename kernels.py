@@ -0,0 +1,249 @@
+# kernels.py
+import math
+import numpy as np
+from raycast import cast_rays, HIT_FOOD
+from arena import BRUTE_FORCE_WALLS
+from config import MAX_RAY_DISTANCE, FOOD_RADIUS, FOOD_ENERGY, NYMBOT_RADIUS
+
+try:
+    import numba
+except ImportError:  # Numba es opcional: sin él se usan los kernels NumPy
+    numba = None
+
+HAVE_NUMBA = numba is not None
+KERNEL_BACKENDS = ('auto', 'numba', 'numpy')
+
+TWO_PI = 2 * math.pi
+EAT_DISTANCE = FOOD_RADIUS + NYMBOT_RADIUS
+
+
+def resolve_backend(backend):
+    """'auto' elige Numba si está instalado; si no, NumPy"""
+    if backend not in KERNEL_BACKENDS:
+        raise ValueError(f"Backend de kernels desconocido: {backend}")
+    if backend == 'auto':
+        return 'numba' if HAVE_NUMBA else 'numpy'
+    if backend == 'numba' and not HAVE_NUMBA:
+        raise ValueError("El backend 'numba' requiere tener Numba instalado")
+    return backend
+
+
+def make_kernels(backend='auto'):
+    return NumbaKernels() if resolve_backend(backend) == 'numba' else NumpyKernels()
+
+
+class NumpyKernels:
+    """Física y visión de una población (N agentes) con operaciones NumPy
+
+    Es la implementación de referencia: NumbaKernels da exactamente los
+    mismos resultados. Los senos/cosenos se calculan siempre con NumPy y los
+    kernels compilados reciben las direcciones ya hechas, para que ambas
+    versiones hagan las mismas operaciones en coma flotante.
+    """
+
+    name = 'numpy'
+
+    def food_vision(self, position, angles, ray_mask, arena, food_pos, out, max_distance=MAX_RAY_DISTANCE):
+        """1.0 en los rayos (dentro del FOV) cuyo primer impacto es la comida"""
+        _, hits, _ = cast_rays(position, angles, arena, food_pos, max_distance)
+        np.logical_and(hits == HIT_FOOD, ray_mask, out=out, casting='unsafe')
+        return out
+
+    def physics(self, state, params, actions, max_steps):
+        """Mueve, gasta energía y detecta comida; devuelve (terminados, comidos)"""
+        position, body_angle, eye_angle, energy, alive, steps, food_collected, food_pos = state
+        max_step_size, max_body_rotation, max_eye_rotation, energy_cost = params
+        active = alive
+        actions = np.where(active[:, None], actions, 0.0)
+
+        # Mover (los agentes muertos reciben acción nula)
+        step = actions[:, 0] * max_step_size
+        position[:, 0] += step * np.cos(body_angle)
+        position[:, 1] += step * np.sin(body_angle)
+        body_angle += actions[:, 1] * max_body_rotation
+        eye_angle += actions[:, 2] * max_eye_rotation
+        body_angle %= TWO_PI
+        eye_angle %= TWO_PI
+
+        # Actualizar energía
+        energy -= energy_cost * active
+        is_alive = energy > 0
+
+        # Verificar colisión con comida
+        delta = position - food_pos
+        eaten = active & (np.hypot(delta[:, 0], delta[:, 1]) < EAT_DISTANCE)
+        energy += FOOD_ENERGY * eaten
+        food_collected += eaten
+
+        # Avanzar contadores y marcar los que terminaron
+        steps += active
+        done = active & (~is_alive | (steps >= max_steps))
+        alive &= ~done
+        return done, eaten
+
+
+class NumbaKernels(NumpyKernels):
+    """Los mismos kernels compilados con Numba: un bucle por agente, sin temporales"""
+
+    name = 'numba'
+
+    def food_vision(self, position, angles, ray_mask, arena, food_pos, out, max_distance=MAX_RAY_DISTANCE):
+        grid = arena.grid
+        use_grid = len(arena.segments) > BRUTE_FORCE_WALLS
+        _food_vision_kernel(position, np.cos(angles), np.sin(angles), ray_mask, arena.segments,
+                            use_grid, grid.table, grid.shape[0], grid.shape[1], grid.origin[0], grid.origin[1],
+                            grid.bounds_max[0], grid.bounds_max[1], grid.cell_size,
+                            food_pos, float(FOOD_RADIUS), float(max_distance), out)
+        return out
+
+    def physics(self, state, params, actions, max_steps):
+        position, body_angle, eye_angle, energy, alive, steps, food_collected, food_pos = state
+        done = np.zeros(len(alive), dtype=bool)
+        eaten = np.zeros(len(alive), dtype=bool)
+        _physics_kernel(position, body_angle, eye_angle, energy, alive, steps, food_collected, food_pos,
+                        np.cos(body_angle), np.sin(body_angle), *params, np.asarray(actions, dtype=np.float64),
+                        max_steps, float(EAT_DISTANCE), float(FOOD_ENERGY), done, eaten)
+        return done, eaten
+
+
+# --- Kernels por agente (se compilan con Numba si está disponible) ---
+
+def _segment_t(ox, oy, dx, dy, x1, y1, x2, y2):
+    """Distancia del rayo al segmento (inf si no corta); mismas operaciones que raycast"""
+    ex = x2 - x1
+    ey = y2 - y1
+    wx = x1 - ox
+    wy = y1 - oy
+    denom = dx * ey - dy * ex
+    if not abs(denom) > 1e-12:
+        return np.inf
+    t = (wx * ey - wy * ex) / denom
+    s = (wx * dy - wy * dx) / denom
+    if t >= 0 and s >= 0 and s <= 1:
+        return t
+    return np.inf
+
+
+def _walls_brute(ox, oy, dx, dy, segments):
+    best = np.inf
+    for w in range(segments.shape[0]):
+        t = _segment_t(ox, oy, dx, dy, segments[w, 0], segments[w, 1], segments[w, 2], segments[w, 3])
+        if t < best:
+            best = t
+    return best
+
+
+def _walls_grid(ox, oy, dx, dy, segments, table, nx, ny, x0, y0, x1, y1, cell_size):
+    """Recorrido DDA de un rayo por la rejilla del arena (como UniformGrid.traverse)"""
+    tx1 = -np.inf if dx == 0 else (x0 - ox) / dx
+    tx2 = np.inf if dx == 0 else (x1 - ox) / dx
+    ty1 = -np.inf if dy == 0 else (y0 - oy) / dy
+    ty2 = np.inf if dy == 0 else (y1 - oy) / dy
+    if dx == 0 and not (ox >= x0 and ox < x1):
+        return np.inf
+    if dy == 0 and not (oy >= y0 and oy < y1):
+        return np.inf
+    t_enter = max(max(min(tx1, tx2), min(ty1, ty2)), 0.0)
+    t_exit = min(max(tx1, tx2), max(ty1, ty2))
+    if not t_enter <= t_exit:
+        return np.inf
+
+    cx = int(min(max((ox + dx * t_enter - x0) // cell_size, 0), nx - 1))
+    cy = int(min(max((oy + dy * t_enter - y0) // cell_size, 0), ny - 1))
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    t_max_x = (x0 + (cx + (1 if dx > 0 else 0)) * cell_size - ox) / dx if dx != 0 else np.inf
+    t_max_y = (y0 + (cy + (1 if dy > 0 else 0)) * cell_size - oy) / dy if dy != 0 else np.inf
+    t_delta_x = cell_size / abs(dx) if dx != 0 else np.inf
+    t_delta_y = cell_size / abs(dy) if dy != 0 else np.inf
+
+    found = np.inf
+    while True:
+        row = cy * nx + cx
+        for k in range(table.shape[1]):
+            w = table[row, k]
+            if w < 0:
+                continue
+            t = _segment_t(ox, oy, dx, dy, segments[w, 0], segments[w, 1], segments[w, 2], segments[w, 3])
+            if t < found:
+                found = t
+
+        cell_exit = min(t_max_x, t_max_y)
+        if t_max_x < t_max_y:
+            cx += step_x
+            t_max_x += t_delta_x
+        else:
+            cy += step_y
+            t_max_y += t_delta_y
+        if not (found > cell_exit and cell_exit <= t_exit and 0 <= cx < nx and 0 <= cy < ny):
+            return found
+
+
+def _food_vision_kernel(position, cos_a, sin_a, ray_mask, segments, use_grid, table, nx, ny,
+                        x0, y0, x1, y1, cell_size, food_pos, radius, max_distance, out):
+    for i in range(cos_a.shape[0]):
+        ox = position[i, 0]
+        oy = position[i, 1]
+        fx = ox - food_pos[i, 0]
+        fy = oy - food_pos[i, 1]
+        c = fx * fx + fy * fy - radius * radius
+        for r in range(cos_a.shape[1]):
+            out[i, r] = 0.0
+            if not ray_mask[i, r]:
+                continue
+            dx = cos_a[i, r]
+            dy = sin_a[i, r]
+
+            # Comida (ray_circle_distances)
+            b = fx * dx + fy * dy
+            disc = b * b - c
+            if c <= 0:
+                food_t = 0.0
+            elif disc >= 0 and -b - math.sqrt(disc) >= 0:
+                food_t = -b - math.sqrt(disc)
+            else:
+                continue
+            if not food_t <= max_distance:
+                continue
+
+            # Sólo hace falta la pared si la comida está a tiro
+            if use_grid:
+                wall_t = _walls_grid(ox, oy, dx, dy, segments, table, nx, ny, x0, y0, x1, y1, cell_size)
+            else:
+                wall_t = _walls_brute(ox, oy, dx, dy, segments)
+            if food_t <= wall_t:
+                out[i, r] = 1.0
+
+
+def _physics_kernel(position, body_angle, eye_angle, energy, alive, steps, food_collected, food_pos,
+                    cos_body, sin_body, max_step_size, max_body_rotation, max_eye_rotation, energy_cost,
+                    actions, max_steps, eat_distance, food_energy, done, eaten):
+    for i in range(alive.shape[0]):
+        if not alive[i]:
+            continue
+        step = actions[i, 0] * max_step_size[i]
+        position[i, 0] += step * cos_body[i]
+        position[i, 1] += step * sin_body[i]
+        body_angle[i] = (body_angle[i] + actions[i, 1] * max_body_rotation[i]) % TWO_PI
+        eye_angle[i] = (eye_angle[i] + actions[i, 2] * max_eye_rotation[i]) % TWO_PI
+
+        energy[i] -= energy_cost[i]
+        is_alive = energy[i] > 0
+        if math.hypot(position[i, 0] - food_pos[i, 0], position[i, 1] - food_pos[i, 1]) < eat_distance:
+            eaten[i] = True
+            energy[i] += food_energy
+            food_collected[i] += 1
+
+        steps[i] += 1
+        if not is_alive or steps[i] >= max_steps:
+            done[i] = True
+            alive[i] = False
+
+
+if HAVE_NUMBA:
+    _jit = numba.njit(cache=True)
+    _segment_t = _jit(_segment_t)
+    _walls_brute = _jit(_walls_brute)
+    _walls_grid = _jit(_walls_grid)
+    _food_vision_kernel = _jit(_food_vision_kernel)
+    _physics_kernel = _jit(_physics_kernel)
@@ -0,0 +1,120 @@
+# numpy_brain.py
+import numpy as np
+
+# Este módulo no importa torch: sólo recibe sus módulos ya construidos
+ACTIVATIONS = {'ReLU': 'relu', 'Tanh': 'tanh'}
+
+
+def export_layers(brain):
+    """Extrae [(peso (entrada, salida), sesgo, activación)] de un NymbotBrain
+
+    También acepta objetos con numpy_layers() (p. ej. CompactGenome), que
+    dan las capas directamente sin construir el módulo de torch.
+    """
+    if hasattr(brain, 'numpy_layers'):
+        return brain.numpy_layers()
+    layers = []
+    for module in brain.net:
+        name = type(module).__name__
+        if name == 'Linear':
+            weight = module.weight.detach().numpy().T.astype(np.float32)
+            bias = module.bias.detach().numpy().astype(np.float32)
+            layers.append([weight, bias, None])
+        elif name in ACTIVATIONS:
+            layers[-1][2] = ACTIVATIONS[name]
+        else:
+            raise ValueError(f"Capa no soportada por el backend NumPy: {name}")
+    return layers
+
+
+def _activate(out, activation):
+    if activation == 'relu':
+        np.maximum(out, 0.0, out=out)
+    elif activation == 'tanh':
+        np.tanh(out, out=out)
+
+
+class NumpyBrain:
+    """Inferencia de un NymbotBrain en NumPy sin reservar memoria por paso
+
+    El módulo de torch sigue siendo la representación para entrenar y mutar;
+    tras modificarlo hay que llamar a load_torch() para sincronizar.
+    """
+
+    def __init__(self, layers):
+        self.layers = [(np.ascontiguousarray(w), np.ascontiguousarray(b), act) for w, b, act in layers]
+        self._input = np.zeros(self.layers[0][0].shape[0], dtype=np.float32)
+        self._outputs = [np.zeros(w.shape[1], dtype=np.float32) for w, _, _ in self.layers]
+
+    @classmethod
+    def from_torch(cls, brain):
+        return cls(export_layers(brain))
+
+    def load_torch(self, brain):
+        """Copia los pesos actuales del módulo de torch en los arrays existentes"""
+        for (weight, bias, _), (new_weight, new_bias, _) in zip(self.layers, export_layers(brain)):
+            weight[...] = new_weight
+            bias[...] = new_bias
+
+    def get_action(self, state):
+        """Devuelve 3 valores en [-1, 1] (el array es un buffer interno reutilizado)"""
+        np.copyto(self._input, state, casting='unsafe')
+        x = self._input
+        for (weight, bias, activation), out in zip(self.layers, self._outputs):
+            np.dot(x, weight, out=out)
+            out += bias
+            _activate(out, activation)
+            x = out
+        return x
+
+
+class NumpyBatchedBrains:
+    """Versión en lote: pesos apilados (N, entrada, salida) y un matmul por capa
+
+    Con input_size, la primera capa de cada cerebro se rellena con filas de
+    ceros hasta ese tamaño (pueden mezclarse entradas distintas): las entradas
+    sobrantes no influyen.
+    """
+
+    def __init__(self, brains, input_size=None):
+        brains = list(brains)
+        per_brain = [export_layers(b) for b in brains]
+        if input_size is not None:
+            for layers in per_brain:
+                weight = layers[0][0]
+                if input_size > len(weight):
+                    layers[0][0] = np.pad(weight, ((0, input_size - len(weight)), (0, 0)))
+        reference = [(w.shape, act) for w, _, act in per_brain[0]]
+        for layers in per_brain[1:]:
+            if [(w.shape, act) for w, _, act in layers] != reference:
+                raise ValueError("Todos los cerebros deben compartir arquitectura")
+
+        self.brains = brains
+        self.n_brains = len(brains)
+        self.layers = []
+        for i, (_, _, activation) in enumerate(per_brain[0]):
+            weight = np.stack([layers[i][0] for layers in per_brain])
+            bias = np.stack([layers[i][1] for layers in per_brain])[:, None, :]
+            self.layers.append((weight, bias, activation))
+
+        self.input_size = self.layers[0][0].shape[1]
+        self._input = np.zeros((self.n_brains, 1, self.input_size), dtype=np.float32)
+        self._outputs = [np.zeros((self.n_brains, 1, w.shape[2]), dtype=np.float32) for w, _, _ in self.layers]
+
+    def refresh(self):
+        """Vuelve a copiar los pesos (p. ej. tras una mutación)"""
+        for n, brain in enumerate(self.brains):
+            for (weight, bias, _), (new_weight, new_bias, _) in zip(self.layers, export_layers(brain)):
+                weight[n, :len(new_weight)] = new_weight
+                bias[n, 0] = new_bias
+
+    def get_actions(self, states):
+        """Devuelve un array (N, 3) de acciones en [-1, 1] (buffer interno reutilizado)"""
+        np.copyto(self._input[:, 0, :], states[:, :self.input_size], casting='unsafe')
+        x = self._input
+        for (weight, bias, activation), out in zip(self.layers, self._outputs):
+            np.matmul(x, weight, out=out)
+            out += bias
+            _activate(out, activation)
+            x = out
+        return x[:, 0, :]
@@ -3,26 +3,68 @@ import numpy as np
 import random
 import math
 from genome import NymbotGenome
-from config import MAX_RAY_DISTANCE, SCREEN_HEIGHT, SCREEN_WIDTH
+from raycast import cast_rays, ray_angles, HIT_FOOD
+from arena import Arena
+from food import FoodField
+from profiling import PROFILER
+from sdf import get_distance_field
+from config import MAX_RAY_DISTANCE, SCREEN_HEIGHT, SCREEN_WIDTH, VISION_MODE, WALL_THICKNESS, FOOD_RADIUS
 
 class Nymbot:
-    def __init__(self, walls, food_pos):
+    def __init__(self, walls, food_pos, genome=None):
         self.position = self._random_position()
         self.body_angle = 0.0
         self.eye_angle = 0.0
         self.energy = 1000.0
-        self.genome = NymbotGenome()
+        self.genome = genome if genome is not None else NymbotGenome()
         
-        # Entorno (ahora pasado como parámetro)
-        self.walls = walls
-        self.food_pos = food_pos
+        # Entorno (ahora pasado como parámetro: un Arena o una lista de paredes)
+        self.arena = walls if isinstance(walls, Arena) else Arena(walls)
+        self.walls = self.arena.walls
+        if isinstance(food_pos, FoodField):
+            self.food = food_pos
+        else:
+            self.food = FoodField(count=1, random_position=lambda: food_pos)
         
         # Visión
         self.fov = self.genome.fov
+        self.vision_mode = VISION_MODE
+        self.profiler = PROFILER
         self.vision_data = np.zeros(self.fov)
-        self.ray_endpoints = [(0, 0)] * self.fov
+        self.ray_endpoints = np.zeros((self.fov, 2))
+        self.ray_distances = np.zeros(self.fov)  # Distancia al impacto de cada rayo
+        self.distance_field = None  # Se carga (uno por geometría, compartido) al usar el modo "sdf"
+        self._field_arena = None  # Arena para el que se pidió distance_field
 
     def update_vision(self):
+        if self.vision_mode == "march":
+            return self.update_vision_march()
+        if self.vision_mode == "sdf":
+            return self.update_vision_sdf()
+        return self.update_vision_analytic()
+
+    def update_vision_sdf(self):
+        """Como la analítica, pero las paredes se trazan por esferas sobre el campo de distancias"""
+        if self._field_arena is not self.arena:
+            self.distance_field = get_distance_field(self.arena)
+            self._field_arena = self.arena
+        return self.update_vision_analytic(self.distance_field)
+
+    def update_vision_analytic(self, walls=None):
+        """Calcula todos los rayos a la vez con intersecciones exactas"""
+        walls = self.arena if walls is None else walls
+        angles = ray_angles(self.eye_angle, self.fov)
+        endpoints, hits, self.ray_distances = cast_rays(self.position, angles, walls, self.food)
+        self.ray_endpoints = endpoints
+        if self.profiler.enabled:
+            self.profiler.count('rays', len(angles))
+            self.profiler.count('wall_tests', walls.last_wall_tests)
+            self.profiler.count('food_tests', self.food.last_food_tests)
+        np.equal(hits, HIT_FOOD, out=self.vision_data, casting='unsafe')
+        return self.vision_data
+
+    def update_vision_march(self):
+        """Versión de referencia: avanza cada rayo en pasos fijos"""
         # Limpiar datos previos
         self.vision_data.fill(0.0)
         
@@ -44,6 +86,7 @@ class Nymbot:
                 #self.vision_data[i] = max(0, 1.0 - dist/300)
                 self.vision_data[i] = 0.0
         
+        self.ray_distances = np.hypot(*(np.asarray(self.ray_endpoints, dtype=float) - self.position).T)
         return self.vision_data
 
     def move(self, action):
@@ -76,17 +119,29 @@ class Nymbot:
         step_size = 5  # Tamaño del paso para el ray casting
         
         # Avanzar el rayo hasta MAX_RAY_DISTANCE
-        for _ in range(0, MAX_RAY_DISTANCE, step_size):
+        hit = None
+        iterations = 0
+        for iterations, _ in enumerate(range(0, MAX_RAY_DISTANCE, step_size), 1):
             current_pos[0] += direction[0] * step_size
             current_pos[1] += direction[1] * step_size
             
             # Detección de comida (versión matemática)
-            if math.dist(current_pos, self.food_pos) < 8:
-                return (current_pos[0], current_pos[1]), "food"
+            if self.food.any_within(current_pos, FOOD_RADIUS):
+                hit = "food"
+                break
             
             # Detección de paredes (versión matemática)
             if self.check_wall_collision(current_pos):
-                return (current_pos[0], current_pos[1]), "wall"
+                hit = "wall"
+                break
+        
+        if self.profiler.enabled:
+            self.profiler.count('rays')
+            self.profiler.count('ray_march_iterations', iterations)
+            self.profiler.count('wall_tests', iterations - 1 if hit == "food" else iterations)
+        
+        if hit is not None:
+            return (current_pos[0], current_pos[1]), hit
         
         # Si no chocó con nada
         end_pos = (
@@ -97,12 +152,8 @@ class Nymbot:
 
     def check_wall_collision(self, point):
         """Comprueba si un punto colisiona con alguna pared"""
-        # Implementación matemática de detección de colisión con paredes
-        for wall in self.walls:
-            line_start, line_end = wall
-            if self.point_near_line(point, line_start, line_end, 5):
-                return True
-        return False
+        # Sólo se prueban las paredes de la celda del punto
+        return self.arena.point_near_wall(point, WALL_THICKNESS)
 
     def point_near_line(self, point, line_start, line_end, threshold):
         """Comprueba si un punto está cerca de una línea"""
@@ -126,9 +177,18 @@ class Nymbot:
         dist = math.dist(point, projection)
         return dist <= threshold
 
+    @property
+    def food_pos(self):
+        """Posición de la primera comida (compatibilidad con la comida única)"""
+        return self.food.position(0)
+
+    @food_pos.setter
+    def food_pos(self, position):
+        self.food.set_position(0, position)
+
     def check_food_collision(self, radius=10):
         # Versión matemática de detección de comida
-        return math.dist(self.position, self.food_pos) < 8 + radius
+        return self.food.any_within(self.position, FOOD_RADIUS + radius)
     
     def _random_position(self):
         return [
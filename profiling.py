@@ -0,0 +1,62 @@
+# profiling.py
+from collections import defaultdict
+from time import perf_counter
+
+
+class Profiler:
+    """Tiempos acumulados por fase del paso y contadores de eventos
+
+    Desactivado cuesta una comprobación de `enabled` por fase:
+        on = prof.enabled
+        if on: t = perf_counter()
+        ...fase...
+        if on: t = prof.lap('vision', t)
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def reset(self):
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def lap(self, phase, start):
+        """Acumula el tiempo desde `start` en la fase y devuelve el instante actual"""
+        now = perf_counter()
+        self.times[phase] += now - start
+        self.calls[phase] += 1
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] += int(n)  # los contadores de NumPy (np.int64) no son JSON
+
+    def snapshot(self):
+        """Copia serializable (JSON) del estado actual"""
+        return {
+            'enabled': self.enabled,
+            'phases': {
+                phase: {
+                    'calls': self.calls[phase],
+                    'total_s': total,
+                    'mean_us': total / self.calls[phase] * 1e6 if self.calls[phase] else 0.0
+                }
+                for phase, total in self.times.items()
+            },
+            'counters': dict(self.counters)
+        }
+
+
+# Perfilador compartido por simuladores y nymbots
+PROFILER = Profiler()
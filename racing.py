@@ -0,0 +1,73 @@
+# racing.py
+import math
+import numpy as np
+from vectorized_simulator import VectorizedSimulator
+from evolution import episode_fitness
+from config import (MAX_STEPS, BRAIN_BACKEND, RACING_RUNGS, RACING_KEEP, RACING_STAGNATION_STEPS,
+                    STAGNATION_RADIUS)
+
+
+class RacingEvaluator:
+    """Evaluación por carreras (successive halving) de una población
+
+    Todos los genomas corren el mismo episodio en un VectorizedSimulator hasta
+    el primer horizonte; allí se detiene la peor fracción de los que siguen
+    vivos y sólo los supervivientes continúan hasta el siguiente, y así hasta
+    max_steps. La aptitud es la de evolution.episode_fitness sobre lo recorrido,
+    así que un descartado nunca supera a quien siguió (la comida no disminuye).
+    Los agentes estancados terminan antes con stagnation_steps.
+
+    La aptitud de un genoma depende de toda la población con la que corre
+    (el corte de cada horizonte y las posiciones que reparte el simulador),
+    así que no es una función de (genoma, semilla) y no se puede cachear.
+    """
+
+    def __init__(self, rungs=RACING_RUNGS, keep=RACING_KEEP, max_steps=MAX_STEPS,
+                 stagnation_steps=RACING_STAGNATION_STEPS, stagnation_radius=STAGNATION_RADIUS,
+                 brain_backend=BRAIN_BACKEND, min_survivors=1):
+        self.rungs = sorted(r for r in rungs if r < max_steps)
+        self.keep = keep
+        self.max_steps = max_steps
+        self.stagnation_steps = stagnation_steps
+        self.stagnation_radius = stagnation_radius
+        self.brain_backend = brain_backend
+        self.min_survivors = min_survivors
+        self.last_stats = None
+
+    def scores(self, simulator):
+        """Aptitud parcial de cada agente (comida y, para desempatar, pasos sobrevividos)"""
+        return episode_fitness({'food_collected': simulator.food_collected, 'total_steps': simulator.steps})
+
+    def evaluate(self, population, seed):
+        """Aptitud de cada genoma; deja en last_stats los pasos simulados y quién sobrevivió"""
+        simulator = VectorizedSimulator(genomes=population, random_seed=seed, max_steps=self.max_steps,
+                                        brain_backend=self.brain_backend,
+                                        stagnation_steps=self.stagnation_steps,
+                                        stagnation_radius=self.stagnation_radius)
+        culled = np.zeros(len(population), dtype=bool)
+
+        for rung in self.rungs:
+            simulator.run(rung)
+            alive = np.flatnonzero(simulator.alive)
+            survivors = max(self.min_survivors, math.ceil(len(alive) * self.keep))
+            if len(alive) <= survivors:
+                continue
+            # Desempate por energía entre los que llevan la misma comida
+            order = np.lexsort((simulator.energy[alive], simulator.food_collected[alive]))
+            dropped = alive[order[:len(alive) - survivors]]
+            simulator.alive[dropped] = False
+            culled[dropped] = True
+
+        simulator.run(self.max_steps)
+        total = int(simulator.steps.sum())
+        self.last_stats = {
+            'simulated_steps': total,
+            'full_steps': len(population) * self.max_steps,
+            'speedup': len(population) * self.max_steps / max(total, 1),
+            'culled': int(culled.sum()),
+            'stagnant': int(simulator.stagnant.sum()),
+            # Índices de los descartados y de los que corrieron el episodio completo
+            'dropped': np.flatnonzero(culled).tolist(),
+            'survivors': np.flatnonzero(~culled & (simulator.steps >= self.max_steps)).tolist()
+        }
+        return self.scores(simulator).tolist()
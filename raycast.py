@@ -0,0 +1,116 @@
+# raycast.py
+import numpy as np
+from config import MAX_RAY_DISTANCE, FOOD_RADIUS
+
+# Tipos de impacto de un rayo
+HIT_NONE = 0
+HIT_WALL = 1
+HIT_FOOD = 2
+
+_EPS = 1e-12
+
+
+def walls_array(walls):
+    """Convierte la lista de paredes [(x1, y1), (x2, y2)] en un array (W, 4)"""
+    return np.asarray(walls, dtype=np.float64).reshape(-1, 4)
+
+
+def ray_angles(eye_angle, fov):
+    """Ángulos de los rayos del campo de visión (un rayo por grado)"""
+    start_angle = eye_angle - np.radians(fov / 2)
+    angle_step = np.radians(fov) / fov
+    return start_angle + np.arange(int(fov)) * angle_step
+
+
+def ray_segment_distances(ox, oy, dx, dy, walls):
+    """Distancia a la pared más cercana de cada rayo (inf si no hay corte)
+
+    ox, oy, dx, dy tienen la misma forma; walls es un array (W, 4).
+    """
+    x1, y1, x2, y2 = walls.T
+    ex = x2 - x1
+    ey = y2 - y1
+
+    # Vector del origen del rayo al inicio de cada pared
+    wx = x1 - ox[..., None]
+    wy = y1 - oy[..., None]
+    dx = dx[..., None]
+    dy = dy[..., None]
+
+    # Resolver o + t*d = p + s*e mediante productos cruzados
+    denom = dx * ey - dy * ex
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (wx * ey - wy * ex) / denom
+        s = (wx * dy - wy * dx) / denom
+
+    valid = (np.abs(denom) > _EPS) & (t >= 0) & (s >= 0) & (s <= 1)
+    return np.where(valid, t, np.inf).min(axis=-1, initial=np.inf)
+
+
+def ray_circle_distances(ox, oy, dx, dy, cx, cy, radius=FOOD_RADIUS):
+    """Distancia de cada rayo a un círculo (0 si el origen está dentro, inf si no corta)"""
+    fx = ox - cx
+    fy = oy - cy
+    b = fx * dx + fy * dy
+    c = fx * fx + fy * fy - radius * radius
+    disc = b * b - c
+
+    with np.errstate(invalid='ignore'):
+        t = -b - np.sqrt(disc)
+
+    inside = c <= 0
+    t = np.where(inside, 0.0, t)
+    valid = inside | ((disc >= 0) & (t >= 0))
+    return np.where(valid, t, np.inf)
+
+
+def cast_rays(origin, angles, walls, food_pos, max_distance=MAX_RAY_DISTANCE):
+    """Intersección analítica de todos los rayos a la vez
+
+    origin es (2,) o (N, 2), angles (R,) o (N, R) y walls un Arena o un array
+    (W, 4). Devuelve los puntos finales (..., 2), el tipo de impacto (HIT_*) y
+    la distancia recorrida por cada rayo.
+    """
+    origin = np.asarray(origin, dtype=np.float64)
+    angles = np.asarray(angles, dtype=np.float64)
+    if origin.ndim == 2:
+        ox = origin[:, 0:1]
+        oy = origin[:, 1:2]
+    else:
+        ox = origin[0]
+        oy = origin[1]
+    ox, oy = np.broadcast_arrays(ox, oy)
+    ox = np.broadcast_to(ox, angles.shape)
+    oy = np.broadcast_to(oy, angles.shape)
+
+    dx = np.cos(angles)
+    dy = np.sin(angles)
+
+    # walls puede ser un Arena (rejilla espacial) o un array (W, 4)
+    if hasattr(walls, 'ray_distances'):
+        wall_t = walls.ray_distances(ox, oy, dx, dy)
+    else:
+        wall_t = ray_segment_distances(ox, oy, dx, dy, walls)
+
+    # food_pos puede ser un FoodField (rejilla espacial) o posiciones (2,) / (N, 2)
+    if hasattr(food_pos, 'ray_distances'):
+        food_t = food_pos.ray_distances(ox, oy, dx, dy, np.minimum(wall_t, max_distance))
+    else:
+        food_pos = np.asarray(food_pos, dtype=np.float64)
+        if food_pos.ndim == 2:
+            cx = food_pos[:, 0:1]
+            cy = food_pos[:, 1:2]
+        else:
+            cx = food_pos[0]
+            cy = food_pos[1]
+        food_t = ray_circle_distances(ox, oy, dx, dy, cx, cy)
+
+    # El primer objeto alcanzado determina el impacto
+    hit = np.full(angles.shape, HIT_NONE, dtype=np.int8)
+    hit[wall_t <= max_distance] = HIT_WALL
+    food_first = (food_t <= wall_t) & (food_t <= max_distance)
+    hit[food_first] = HIT_FOOD
+
+    distance = np.minimum(np.minimum(wall_t, food_t), max_distance)
+    endpoints = np.stack((ox + dx * distance, oy + dy * distance), axis=-1)
+    return endpoints, hit, distance
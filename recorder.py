@@ -0,0 +1,121 @@
+# recorder.py
+from collections.abc import Sequence
+import numpy as np
+from config import MAX_STEPS
+
+# Registro de tamaño fijo de un paso de simulación (float64 como el historial de dicts)
+STEP_DTYPE = np.dtype([
+    ('step', '<i4'),
+    ('position', '<f8', (2,)),
+    ('body_angle', '<f8'),
+    ('eye_angle', '<f8'),
+    ('energy', '<f8'),
+    ('food_pos', '<f8', (2,)),
+    ('done', '?')
+])
+
+RECORD_MODES = ('full', 'every', 'ring', 'summary')
+
+
+class EpisodeHistory(Sequence):
+    """Vista perezosa con el formato antiguo (lista de dicts) sobre un array de pasos"""
+
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EpisodeHistory(self.records[index])
+        record = self.records[index]
+        return {
+            'step': int(record['step']),
+            'position': tuple(record['position'].tolist()),
+            'body_angle': float(record['body_angle']),
+            'eye_angle': float(record['eye_angle']),
+            'energy': float(record['energy']),
+            'food_pos': record['food_pos'].tolist(),
+            'done': bool(record['done'])
+        }
+
+
+class EpisodeRecorder:
+    """Graba un episodio en columnas NumPy preasignadas
+
+    Modos:
+        full    -> todos los pasos
+        every   -> un paso de cada `every` (y siempre el último)
+        ring    -> sólo los últimos `capacity` pasos (buffer circular)
+        summary -> sólo el estado final
+    """
+
+    def __init__(self, mode='full', capacity=MAX_STEPS, every=1):
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Modo de grabación desconocido: {mode}")
+        self.mode = mode
+        self.every = max(1, int(every))
+        if mode == 'summary':
+            capacity = 1
+        elif mode == 'every':
+            capacity = capacity // self.every + 1
+        self._allocate(max(1, capacity))
+        self.reset()
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.columns = {
+            name: np.zeros((capacity,) + field.shape, dtype=field.base)
+            for name, (field, _) in STEP_DTYPE.fields.items()
+        }
+
+    def reset(self):
+        """Vacía la grabación sin liberar memoria"""
+        self.count = 0
+        self._next = 0
+
+    def record(self, step, position, body_angle, eye_angle, energy, food_pos, done):
+        """Añade un paso (según el modo puede descartarse)"""
+        if self.mode == 'every' and step % self.every and not done:
+            return
+
+        if self._next == self.capacity:
+            if self.mode == 'full' or self.mode == 'every':
+                # Crecer si el episodio supera la capacidad prevista
+                old = self.columns
+                self._allocate(self.capacity * 2)
+                for name, column in old.items():
+                    self.columns[name][:len(column)] = column
+            else:
+                self._next = 0
+
+        i = self._next
+        columns = self.columns
+        columns['step'][i] = step
+        columns['position'][i] = position
+        columns['body_angle'][i] = body_angle
+        columns['eye_angle'][i] = eye_angle
+        columns['energy'][i] = energy
+        columns['food_pos'][i] = food_pos
+        columns['done'][i] = done
+
+        self._next += 1
+        self.count = min(self.count + 1, self.capacity)
+
+    def trajectory(self):
+        """Pasos grabados en orden cronológico (array estructurado STEP_DTYPE)"""
+        if self.count < self.capacity or self._next == self.capacity:
+            order = slice(0, self.count)
+        else:
+            # Buffer circular lleno: desenrollar a partir del más antiguo
+            order = np.roll(np.arange(self.capacity), -self._next)
+
+        records = np.empty(self.count, dtype=STEP_DTYPE)
+        for name, column in self.columns.items():
+            records[name] = column[order]
+        return records
+
+    def history(self):
+        """Vista compatible con la antigua lista de dicts"""
+        return EpisodeHistory(self.trajectory())
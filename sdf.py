@@ -0,0 +1,207 @@
+# sdf.py
+import hashlib
+import math
+import os
+import tempfile
+import numpy as np
+from arena import _point_segment_distance, _ray_segments
+from config import SDF_RESOLUTION, SDF_EPSILON, SDF_MAX_STEPS, SDF_CACHE_DIR, WALL_THICKNESS
+
+# Campos ya construidos en este proceso, por huella del arena
+_FIELDS = {}
+
+# Puntos por bloque al calcular distancias (acota la memoria de P x W)
+_CHUNK = 4096
+
+
+def arena_fingerprint(arena, resolution=SDF_RESOLUTION):
+    """Huella de la geometría del arena y la resolución del campo"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(arena.segments, dtype=np.float64))
+    digest.update(repr(float(resolution)).encode())
+    return digest.hexdigest()
+
+
+def compute_distances(segments, lo, shape, resolution):
+    """Distancia a la pared más cercana en cada nodo de la rejilla (ny, nx)"""
+    nx, ny = shape
+    xs = lo[0] + np.arange(nx) * resolution
+    ys = lo[1] + np.arange(ny) * resolution
+    gx, gy = np.meshgrid(xs, ys)
+    points = np.column_stack((gx.ravel(), gy.ravel()))
+
+    distances = np.full(len(points), np.inf)
+    if len(segments):
+        x1, y1, x2, y2 = segments.T
+        for start in range(0, len(points), _CHUNK):
+            chunk = points[start:start + _CHUNK]
+            d = _point_segment_distance(chunk, x1, y1, x2, y2)
+            distances[start:start + _CHUNK] = d.reshape(len(chunk), -1).min(axis=1)
+    return distances.reshape(ny, nx).astype(np.float32)
+
+
+def bound_table(distances, resolution):
+    """Distancias menos media diagonal de celda, con un borde de -inf (float32)
+
+    El redondeo a float32 se corrige hacia abajo para que siga siendo una
+    cota inferior.
+    """
+    slack = resolution * math.sqrt(2) / 2
+    bound = np.pad(distances.astype(np.float64) - slack, 1, constant_values=-np.inf)
+    table = bound.astype(np.float32)
+    rounded_up = table > bound
+    table[rounded_up] = np.nextafter(table[rounded_up], np.float32(-np.inf))
+    return table
+
+
+class DistanceField:
+    """Distancia a las paredes muestreada en una rejilla, para trazar rayos por esferas
+
+    Los muros son segmentos sin interior, así que el campo es la distancia sin
+    signo. Se usa el nodo más cercano menos media diagonal de celda, que es
+    una cota inferior de la distancia real (la distancia es 1-Lipschitz), así
+    que ningún salto atraviesa una pared. Al llegar junto a una pared el impacto
+    se calcula exacto contra las paredes de esa celda del arena. Tiene la misma
+    interfaz de rayos que Arena y puede pasarse a cast_rays en su lugar.
+    """
+
+    def __init__(self, arena, bound, lo, resolution):
+        self.arena = arena
+        # Tabla de consulta: cota inferior (distancia - slack) con un borde "fuera".
+        # Es la que se guarda en disco; se muestrea directamente sobre el mmap
+        # (vista ndarray normal: indexar un np.memmap es bastante más lento)
+        self.bound = np.asarray(bound)
+        self.resolution = float(resolution)
+        self.origin = (float(lo[0]), float(lo[1]))
+        self.shape = (self.bound.shape[1] - 2, self.bound.shape[0] - 2)
+        self.slack = self.resolution * math.sqrt(2) / 2
+        self.last_wall_tests = 0
+        self.last_steps = 0
+
+        self._inv_resolution = 1.0 / self.resolution
+        # Nodo más cercano = floor(x / h + 0.5); el borde desplaza un nodo más
+        self._lo = (self.origin[0] - 1.5 * self.resolution, self.origin[1] - 1.5 * self.resolution)
+
+    @classmethod
+    def build(cls, arena, resolution=SDF_RESOLUTION):
+        lo, shape = cls.bounds(arena, resolution)
+        return cls(arena, bound_table(compute_distances(arena.segments, lo, shape, resolution), resolution),
+                   lo, resolution)
+
+    @staticmethod
+    def bounds(arena, resolution):
+        """Esquina inferior y número de nodos (nx, ny) que cubren las paredes con margen"""
+        segments = arena.segments
+        pad = WALL_THICKNESS + 2 * resolution
+        if len(segments):
+            lo = (segments[:, [0, 2]].min() - pad, segments[:, [1, 3]].min() - pad)
+            hi = (segments[:, [0, 2]].max() + pad, segments[:, [1, 3]].max() + pad)
+        else:
+            lo, hi = (0.0, 0.0), (resolution, resolution)
+        shape = (int(math.ceil((hi[0] - lo[0]) / resolution)) + 1,
+                 int(math.ceil((hi[1] - lo[1]) / resolution)) + 1)
+        return lo, shape
+
+    def sample(self, x, y):
+        """Cota inferior de la distancia a la pared (-inf fuera de la rejilla)"""
+        # Las tablas llevan un borde de -inf: los índices se recortan en lugar de enmascararse
+        ix = np.clip((x - self._lo[0]) * self._inv_resolution, 0, self.shape[0] + 1).astype(np.int64)
+        iy = np.clip((y - self._lo[1]) * self._inv_resolution, 0, self.shape[1] + 1).astype(np.int64)
+        flat = iy * (self.shape[0] + 2) + ix
+        return self.bound.take(flat)
+
+    def trace(self, ox, oy, dx, dy, max_distance=np.inf, max_steps=SDF_MAX_STEPS):
+        """Traza por esferas; devuelve la distancia a la pared por rayo (inf si no hay)
+
+        Los rayos que agotan max_steps o que rozan una pared sin cortarla se
+        resuelven con la intersección exacta del arena.
+        """
+        shape = np.broadcast(ox, dx).shape
+        ox, oy, dx, dy = (np.broadcast_to(a, shape).ravel() for a in (ox, oy, dx, dy))
+        t = np.zeros(len(ox))
+        result = np.full(len(ox), np.inf)
+        active = np.arange(len(ox))
+        near_rays, near_t = [], []
+        samples = 0
+        steps = 0
+
+        while len(active) and steps < max_steps:
+            steps += 1
+            d = self.sample(ox[active] + dx[active] * t[active], oy[active] + dy[active] * t[active])
+            samples += len(active)
+
+            # Rayos que llegan junto a una pared: se resuelven todos juntos al final
+            near = (d < SDF_EPSILON) & np.isfinite(d)
+            if near.any():
+                near_rays.append(active[near])
+                near_t.append(t[active[near]])
+
+            t[active] += d
+            keep = ~near & np.isfinite(d) & (t[active] <= max_distance)
+            active = active[keep]
+
+        # Intersección exacta con las paredes de la celda del arena donde se paró el
+        # rayo. La celda incluye toda pared a menos de `margin`, así que un corte a
+        # menos de `margin` del punto es el primero; si no (rayo rasante) queda sin
+        # resolver, igual que los que agotan los saltos
+        unresolved = [active]
+        if near_rays:
+            rays = np.concatenate(near_rays)
+            t_near = np.concatenate(near_t)
+            grid = self.arena.grid
+            cx, cy = grid.cell_coords(ox[rays] + dx[rays] * t_near, oy[rays] + dy[rays] * t_near)
+            candidates = grid.table[cy * grid.shape[0] + cx]
+            valid = candidates >= 0
+            exact = _ray_segments(ox[rays], oy[rays], dx[rays], dy[rays],
+                                  self.arena.segments[np.where(valid, candidates, 0)])
+            exact = np.where(valid, exact, np.inf).min(axis=1)
+            samples += np.count_nonzero(valid)
+            local = exact <= t_near + self.arena.margin
+            result[rays[local]] = exact[local]
+            unresolved.append(rays[~local])
+
+        # Rayos sin resolver por saltos: intersección exacta del arena
+        unresolved = np.concatenate(unresolved).astype(np.int64)
+        if len(unresolved):
+            result[unresolved] = self.arena.ray_distances(ox[unresolved], oy[unresolved],
+                                                          dx[unresolved], dy[unresolved])
+            samples += self.arena.last_wall_tests
+        self.last_wall_tests = samples
+        self.last_steps = steps
+        return result.reshape(shape)
+
+    def ray_distances(self, ox, oy, dx, dy):
+        return self.trace(ox, oy, dx, dy)
+
+
+def _cache_path(fingerprint):
+    directory = SDF_CACHE_DIR or os.path.join(tempfile.gettempdir(), 'nymbot_sdf')
+    return os.path.join(directory, f"{fingerprint}.bound.npy")
+
+
+def get_distance_field(arena, resolution=SDF_RESOLUTION):
+    """Campo de distancias del arena, construido una vez y compartido
+
+    Hay un solo DistanceField por huella en cada proceso, aunque lo pidan
+    arenas distintos con la misma geometría. Su tabla de cotas se guarda en
+    disco (SDF_CACHE_DIR) y se carga como mmap de sólo lectura, así que
+    simuladores y trabajadores comparten las mismas páginas.
+    """
+    fingerprint = arena_fingerprint(arena, resolution)
+    field = _FIELDS.get(fingerprint)
+    if field is not None:
+        return field
+
+    path = _cache_path(fingerprint)
+    lo, shape = DistanceField.bounds(arena, resolution)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escritura atómica: otro proceso nunca ve un archivo a medias
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npy')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, bound_table(compute_distances(arena.segments, lo, shape, resolution), resolution))
+        os.replace(tmp, path)
+
+    field = DistanceField(arena, np.load(path, mmap_mode='r'), lo, resolution)
+    _FIELDS[fingerprint] = field
+    return field
@@ -0,0 +1,111 @@
+# shared_population.py
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from genome import NymbotGenome
+
+# FOV máximo que permite NymbotGenome.mutate (define el ancho de la fila de pesos)
+MAX_INPUT_SIZE = 360
+
+
+def brain_param_count(input_size, brain_architecture):
+    """Número de parámetros de un NymbotBrain (pesos + sesgos de cada capa)"""
+    sizes = [input_size] + list(brain_architecture) + [3]
+    return sum(a * b + b for a, b in zip(sizes[:-1], sizes[1:]))
+
+
+class SharedPopulation:
+    """Población en un segmento de memoria compartida
+
+    Arrays (una fila por genoma):
+        traits     (N, 4) float64: fov, max_step_size, max_body_rotation, max_eye_rotation
+        input_size (N,)   int64:   entradas de la primera capa del cerebro
+        weights    (N, P) float32: buffer plano del cerebro (relleno con ceros)
+        fitness    (N,)   float64: aptitud escrita por los trabajadores
+
+    El proceso principal la crea y escribe los genomas; los trabajadores se
+    conectan por nombre (al deserializarla se conecta sola), leen genomas por
+    índice sin copiar los pesos y escriben la aptitud en su sitio.
+    """
+
+    def __init__(self, size, brain_architecture=(32, 16), name=None):
+        self.size = size
+        self.brain_architecture = tuple(brain_architecture)
+        self.row_params = brain_param_count(MAX_INPUT_SIZE, self.brain_architecture)
+
+        layout = [
+            ('traits', np.float64, (size, 4)),
+            ('input_size', np.int64, (size,)),
+            ('fitness', np.float64, (size,)),
+            ('weights', np.float32, (size, self.row_params)),
+        ]
+        nbytes = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Sólo el creador debe liberar el segmento al terminar
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self.name = self.shm.name
+
+        offset = 0
+        for field, dtype, shape in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+        if self.owner:
+            self.fitness[:] = np.nan
+
+    @classmethod
+    def attach(cls, name, size, brain_architecture):
+        return cls(size, brain_architecture, name=name)
+
+    def __reduce__(self):
+        return (self.attach, (self.name, self.size, self.brain_architecture))
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    def write(self, i, genome):
+        """Copia los rasgos y los pesos de un genoma en la fila i"""
+        if tuple(genome.brain_architecture) != self.brain_architecture:
+            raise ValueError("La arquitectura del genoma no coincide con la del almacén")
+        weights = genome.weights
+        self.traits[i] = genome.traits()
+        self.input_size[i] = genome.brain.input_size
+        self.weights[i, :len(weights)] = weights
+        self.weights[i, len(weights):] = 0.0
+
+    def write_population(self, genomes):
+        if len(genomes) > self.size:
+            raise ValueError(f"El almacén sólo admite {self.size} genomas")
+        for i, genome in enumerate(genomes):
+            self.write(i, genome)
+        self.fitness[:] = np.nan
+
+    def read(self, i, copy=False):
+        """Genoma de la fila i; sin copy sus pesos son una vista de la memoria compartida"""
+        input_size = int(self.input_size[i])
+        weights = self.weights[i, :brain_param_count(input_size, self.brain_architecture)]
+        if copy:
+            weights = weights.copy()
+        return NymbotGenome.from_weights(self.traits[i], weights, self.brain_architecture, input_size)
+
+    def close(self):
+        """Suelta las vistas y desconecta el segmento de este proceso"""
+        for field in ('traits', 'input_size', 'fitness', 'weights'):
+            self.__dict__.pop(field, None)
+        self.shm.close()
+
+    def unlink(self):
+        """Libera el segmento (sólo el creador)"""
+        self.shm.unlink()
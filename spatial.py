@@ -0,0 +1,130 @@
+# spatial.py
+import numpy as np
+
+
+class UniformGrid:
+    """Rejilla uniforme de celdas cuadradas con una tabla celda -> elementos
+
+    La tabla tiene relleno -1 para poder consultar muchas celdas a la vez con
+    indexado NumPy. La usan el arena (paredes) y el campo de comida.
+    """
+
+    def __init__(self, lo, hi, cell_size):
+        self.cell_size = float(cell_size)
+        self.origin = [float(lo[0]), float(lo[1])]
+        self.shape = (
+            max(1, int(np.ceil((hi[0] - lo[0]) / self.cell_size))),
+            max(1, int(np.ceil((hi[1] - lo[1]) / self.cell_size)))
+        )
+        self.bounds_max = [
+            self.origin[0] + self.shape[0] * self.cell_size,
+            self.origin[1] + self.shape[1] * self.cell_size
+        ]
+        self.n_cells = self.shape[0] * self.shape[1]
+        self.table = np.full((self.n_cells, 1), -1, dtype=np.int64)
+
+    def contains(self, x, y):
+        return self.origin[0] <= x < self.bounds_max[0] and self.origin[1] <= y < self.bounds_max[1]
+
+    def cell_coords(self, x, y):
+        """Coordenadas de celda (recortadas a la rejilla) de puntos sueltos o arrays"""
+        cx = np.clip((np.asarray(x) - self.origin[0]) // self.cell_size, 0, self.shape[0] - 1).astype(np.int64)
+        cy = np.clip((np.asarray(y) - self.origin[1]) // self.cell_size, 0, self.shape[1] - 1).astype(np.int64)
+        return cx, cy
+
+    def cell_index(self, x, y):
+        """Índice de la celda de un punto que está dentro de la rejilla"""
+        cx = int((x - self.origin[0]) // self.cell_size)
+        cy = int((y - self.origin[1]) // self.cell_size)
+        return cy * self.shape[0] + cx
+
+    def cells_in_box(self, x0, y0, x1, y1):
+        """Índices de las celdas que solapan la caja [x0, x1] x [y0, y1]"""
+        (cx0, cx1), (cy0, cy1) = self.cell_coords([x0, x1], [y0, y1])
+        gx, gy = np.meshgrid(np.arange(cx0, cx1 + 1), np.arange(cy0, cy1 + 1), indexing='ij')
+        return (gy * self.shape[0] + gx).ravel()
+
+    def build(self, cells, items):
+        """Rellena la tabla a partir de pares (celda, elemento)"""
+        cells = np.asarray(cells, dtype=np.int64)
+        items = np.asarray(items, dtype=np.int64)
+        counts = np.bincount(cells, minlength=self.n_cells)
+        width = max(1, int(counts.max()) if len(counts) else 1)
+        self.table = np.full((self.n_cells, width), -1, dtype=np.int64)
+        if len(cells):
+            order = np.argsort(cells, kind='stable')
+            cells = cells[order]
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            rank = np.arange(len(cells)) - starts[cells]
+            self.table[cells, rank] = items[order]
+
+    def traverse(self, ox, oy, dx, dy, test, max_distance=np.inf):
+        """Recorrido DDA vectorizado de todos los rayos a la vez
+
+        test(rays, candidates) recibe los índices de los rayos activos (A,) y
+        los elementos de su celda actual (A, K) sin relleno, y devuelve la
+        distancia de cada par (inf si no hay impacto). Devuelve la distancia
+        mínima por rayo y el número de pares probados.
+        """
+        n = len(ox)
+        best = np.full(n, np.inf)
+        cell_size = self.cell_size
+        nx, ny = self.shape
+        x0, y0 = self.origin
+        x1, y1 = self.bounds_max
+
+        # Entrada y salida de la caja de la rejilla (método de slabs)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tx1 = np.where(dx == 0, -np.inf, (x0 - ox) / dx)
+            tx2 = np.where(dx == 0, np.inf, (x1 - ox) / dx)
+            ty1 = np.where(dy == 0, -np.inf, (y0 - oy) / dy)
+            ty2 = np.where(dy == 0, np.inf, (y1 - oy) / dy)
+        inside_x = (dx != 0) | ((ox >= x0) & (ox < x1))
+        inside_y = (dy != 0) | ((oy >= y0) & (oy < y1))
+        t_enter = np.maximum(np.maximum(np.minimum(tx1, tx2), np.minimum(ty1, ty2)), 0.0)
+        t_exit = np.minimum(np.minimum(np.maximum(tx1, tx2), np.maximum(ty1, ty2)), max_distance)
+
+        idx = np.flatnonzero(inside_x & inside_y & (t_enter <= t_exit))
+        rox, roy, rdx, rdy = ox[idx], oy[idx], dx[idx], dy[idx]
+        t_exit = t_exit[idx]
+
+        # Celda inicial
+        cx, cy = self.cell_coords(rox + rdx * t_enter[idx], roy + rdy * t_enter[idx])
+        step_x = np.where(rdx > 0, 1, -1)
+        step_y = np.where(rdy > 0, 1, -1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_max_x = np.where(rdx != 0, (x0 + (cx + (rdx > 0)) * cell_size - rox) / rdx, np.inf)
+            t_max_y = np.where(rdy != 0, (y0 + (cy + (rdy > 0)) * cell_size - roy) / rdy, np.inf)
+            t_delta_x = np.where(rdx != 0, cell_size / np.abs(rdx), np.inf)
+            t_delta_y = np.where(rdy != 0, cell_size / np.abs(rdy), np.inf)
+
+        found = np.full(len(idx), np.inf)
+        active = np.arange(len(idx))
+        tests = 0
+        while len(active):
+            # Probar los elementos de la celda actual de cada rayo activo
+            candidates = self.table[cy[active] * nx + cx[active]]
+            valid = candidates >= 0
+            n_valid = np.count_nonzero(valid)
+            tests += n_valid
+            if n_valid:
+                t = test(idx[active], np.where(valid, candidates, 0))
+                t = np.where(valid, t, np.inf).min(axis=1)
+                found[active] = np.minimum(found[active], t)
+
+            # Avanzar a la celda siguiente
+            cell_exit = np.minimum(t_max_x[active], t_max_y[active])
+            move_x = t_max_x[active] < t_max_y[active]
+            ax = active[move_x]
+            ay = active[~move_x]
+            cx[ax] += step_x[ax]
+            t_max_x[ax] += t_delta_x[ax]
+            cy[ay] += step_y[ay]
+            t_max_y[ay] += t_delta_y[ay]
+
+            keep = ((found[active] > cell_exit) & (cell_exit <= t_exit[active])
+                    & (cx[active] >= 0) & (cx[active] < nx) & (cy[active] >= 0) & (cy[active] < ny))
+            active = active[keep]
+
+        best[idx] = found
+        return best, tests
@@ -0,0 +1,39 @@
+# test_arena.py
+import numpy as np
+from arena import Arena, random_maze, _point_segment_distance
+from raycast import ray_segment_distances
+
+def test_grid_rays_match_brute_force():
+    arena = Arena(random_maze(14, 10, cell=50, seed=3))
+    assert len(arena) > 100
+
+    rng = np.random.default_rng(0)
+    ox = rng.uniform(0, 800, 5000)
+    oy = rng.uniform(0, 600, 5000)
+    angles = rng.uniform(0, 2 * np.pi, 5000)
+    dx, dy = np.cos(angles), np.sin(angles)
+
+    grid = arena.ray_distances(ox, oy, dx, dy)
+    brute = ray_segment_distances(ox, oy, dx, dy, arena.segments)
+    assert np.allclose(grid[np.isfinite(brute)], brute[np.isfinite(brute)])
+    assert np.isinf(grid[np.isinf(brute)]).all()
+    assert arena.last_wall_tests < 5000 * len(arena) / 10
+
+def test_point_near_wall_matches_brute_force():
+    arena = Arena(random_maze(14, 10, cell=50, seed=4))
+    points = np.random.default_rng(1).uniform(0, 800, (2000, 2))
+    x1, y1, x2, y2 = arena.segments.T
+    expected = (_point_segment_distance(points, x1, y1, x2, y2) <= 5).any(axis=1)
+    assert [arena.point_near_wall(p) for p in points.tolist()] == expected.tolist()
+
+def test_save_and_load(tmp_path):
+    arena = Arena(random_maze(4, 3, seed=5))
+    path = str(tmp_path / "maze.json")
+    arena.save(path)
+    loaded = Arena.load(path)
+    assert np.array_equal(loaded.segments, arena.segments)
+
+if __name__ == "__main__":
+    test_grid_rays_match_brute_force()
+    test_point_near_wall_matches_brute_force()
+    print("¡Pruebas del arena exitosas!")
@@ -0,0 +1,90 @@
+# test_brain.py
+import pickle
+import random
+import numpy as np
+from brain import BatchedBrains
+from genome import NymbotGenome
+from numpy_brain import NumpyBrain, NumpyBatchedBrains
+from headless_simulator import HeadlessSimulator
+from bucketed import BucketedBrains
+
+def test_batched_matches_single():
+    genomes = [NymbotGenome() for _ in range(8)]
+    batched = BatchedBrains(g.brain for g in genomes)
+    states = np.random.default_rng(0).random((8, genomes[0].fov))
+
+    actions = batched.get_actions(states)
+    expected = np.stack([g.brain.get_action(states[i]) for i, g in enumerate(genomes)])
+
+    assert actions.shape == (8, 3)
+    assert np.allclose(actions, expected, atol=1e-6)
+
+def test_numpy_backend_matches_torch():
+    genomes = [NymbotGenome() for _ in range(4)]
+    states = np.random.default_rng(1).random((4, genomes[0].fov))
+    expected = np.stack([g.brain.get_action(states[i]) for i, g in enumerate(genomes)])
+
+    single = NumpyBrain.from_torch(genomes[0].brain)
+    out = single.get_action(states[0])
+    assert np.allclose(out, expected[0], atol=1e-6)
+    assert single.get_action(states[1]) is out  # buffer reutilizado
+
+    batched = NumpyBatchedBrains(g.brain for g in genomes)
+    assert np.allclose(batched.get_actions(states), expected, atol=1e-6)
+
+    # Tras mutar el módulo de torch hay que sincronizar los pesos
+    genomes[0].mutate(mutation_rate=1.0)
+    state = np.random.default_rng(2).random(genomes[0].fov)
+    single = NumpyBrain.from_torch(genomes[0].brain)
+    assert np.allclose(single.get_action(state), genomes[0].brain.get_action(state), atol=1e-6)
+
+def test_headless_backends_agree():
+    genome = NymbotGenome()
+    results = []
+    for backend in ('torch', 'numpy'):
+        simulator = HeadlessSimulator(random_seed=5, brain_backend=backend)
+        simulator.set_genome(genome)
+        results.append(simulator.run_episode(max_steps=50)['trajectory'])
+    assert np.allclose(results[0]['position'], results[1]['position'], atol=1e-3)
+
+def test_bucketed_mixed_population():
+    genomes = []
+    for fov, architecture in [(60, [32, 16]), (50, [32, 16]), (64, [32, 16]), (90, [16]), (60, [16]), (10, [32, 16])]:
+        genome = NymbotGenome()
+        genome.fov = fov
+        genome.brain_architecture = architecture
+        genome.initialize_brain()
+        genomes.append(genome)
+
+    # Visión enmascarada como en VectorizedSimulator: ceros fuera del FOV de cada uno
+    states = np.random.default_rng(3).random((len(genomes), 90))
+    for i, genome in enumerate(genomes):
+        states[i, genome.fov:] = 0.0
+    expected = np.stack([g.brain.get_action(states[i, :g.fov]) for i, g in enumerate(genomes)])
+
+    for backend in ('torch', 'numpy'):
+        bucketed = BucketedBrains((g.brain for g in genomes), backend, bucket=16)
+        assert len(bucketed.buckets) == 4  # (32,16) x {64, 16}, (16,) x {96, 64}
+        assert np.allclose(bucketed.get_actions(states), expected, atol=1e-5)
+
+def test_flat_weights_are_views():
+    random.seed(4)
+    genome = NymbotGenome()
+    genome.mutate(mutation_rate=1.0)
+    genome.weights[0] = 42.0
+    assert genome.brain.net[0].weight[0, 0].item() == 42.0
+
+    clone = pickle.loads(pickle.dumps(genome, protocol=5))
+    assert clone.content_hash() == genome.content_hash()
+    assert clone.distance(genome) == 0.0
+    clone.weights[0] = 0.0
+    assert clone.brain.net[0].weight[0, 0].item() == 0.0
+    assert genome.weights[0] == 42.0
+
+if __name__ == "__main__":
+    test_batched_matches_single()
+    test_numpy_backend_matches_torch()
+    test_headless_backends_agree()
+    test_bucketed_mixed_population()
+    test_flat_weights_are_views()
+    print("¡Pruebas del cerebro exitosas!")
@@ -0,0 +1,107 @@
+# test_eval_server.py
+import os
+import stat
+import socket
+import tempfile
+import threading
+import asyncio
+from genome import NymbotGenome
+from eval_server import EvalServer, EvalClient, _run_headless, _run_vectorized
+
+def _serve(server):
+    """Arranca el servidor en un hilo con su propio bucle; devuelve (loop, hilo)"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait(60)
+    return loop, thread
+
+def _stop(server, loop, thread):
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(60)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(60)
+
+def test_eval_server_batches_concurrent_requests():
+    genomes = [NymbotGenome() for _ in range(4)]
+    expected = _run_vectorized(genomes, 5, 60)
+    # Cada genoma tiene su flujo aleatorio: el resultado no depende del lote
+    assert [_run_vectorized([g], 5, 60)[0] for g in genomes] == expected
+    assert _run_vectorized(genomes[::-1], 5, 60) == expected[::-1]
+
+    path = os.path.join(tempfile.mkdtemp(), 'eval.sock')
+    server = EvalServer(path, processes=1, batch_window=0.2)
+    loop, thread = _serve(server)
+    try:
+        results = [None, None]
+
+        def request(i):
+            with EvalClient(path) as client:
+                results[i] = client.evaluate(genomes[2 * i:2 * i + 2], seed=5, max_steps=60)
+
+        clients = [threading.Thread(target=request, args=(i,)) for i in range(2)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join(60)
+
+        assert results[0] + results[1] == expected
+        assert server.requests == 2 and server.batches == 1  # juntas en un solo lote
+
+        # El motor por defecto no depende de con quién coincide en el lote
+        with EvalClient(path) as client:
+            assert client.evaluate(genomes[1:2], seed=5, max_steps=60) == expected[1:2]
+            summaries = client.evaluate(genomes, engine='headless', seed=5, max_steps=60)
+        assert summaries == _run_headless(genomes, 5, 60)
+    finally:
+        _stop(server, loop, thread)
+    assert not os.path.exists(path) and not server._dispatches
+
+def test_eval_server_socket_is_private():
+    path = os.path.join(tempfile.mkdtemp(), 'eval.sock')
+    server = EvalServer(path, processes=1)
+    loop, thread = _serve(server)
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        # Con un servidor vivo en la ruta, otro no la pisa
+        other = EvalServer(path, processes=1)
+        try:
+            asyncio.run(other.start())
+            assert False, "Arrancó sobre un servidor vivo"
+        except RuntimeError:
+            pass
+        with EvalClient(path) as client:
+            assert len(client.evaluate([NymbotGenome()], max_steps=10)) == 1
+    finally:
+        _stop(server, loop, thread)
+
+    # Un socket abandonado sí se reemplaza; un archivo cualquiera no
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = EvalServer(path, processes=1)
+    loop, thread = _serve(server)
+    _stop(server, loop, thread)
+
+    with open(path, 'wb') as f:
+        f.write(b'datos')
+    try:
+        asyncio.run(EvalServer(path, processes=1).start())
+        assert False, "Borró un archivo que no era un socket"
+    except FileExistsError:
+        pass
+    with open(path, 'rb') as f:
+        assert f.read() == b'datos'
+
+if __name__ == "__main__":
+    test_eval_server_batches_concurrent_requests()
+    test_eval_server_socket_is_private()
+    print("¡Pruebas del servidor de evaluación exitosas!")
@@ -0,0 +1,244 @@
+# test_evolution.py
+import os
+import pickle
+import random
+import tempfile
+import numpy as np
+import torch
+from evolution import EvolutionRunner, _init_worker
+from genome import NymbotGenome
+from shared_population import SharedPopulation
+from fitness_cache import FitnessCache
+from racing import RacingEvaluator
+from es import ESOptimizer, NoiseTable, centered_ranks
+from compact import CompactGenome
+from checkpoint import Checkpoint, STATE, _HEADER
+from numpy_brain import NumpyBrain
+from vectorized_simulator import VectorizedSimulator
+
+def test_mutate_keeps_brain_consistent():
+    random.seed(3)
+    genome = NymbotGenome()
+    for _ in range(20):
+        genome.mutate(mutation_rate=1.0)
+        assert isinstance(genome.fov, int)
+        assert 10 <= genome.fov <= 360
+        assert genome.brain.net[0].in_features == genome.fov
+
+def test_crossover_mixes_parent_weights():
+    random.seed(6)
+    a, b = NymbotGenome(), NymbotGenome()
+    child = a.crossover(b)
+    from_a = child.weights == a.weights
+    from_b = child.weights == b.weights
+    assert np.all(from_a | from_b)
+    assert from_a.any() and from_b.any()
+    assert 0 < child.distance(a) < a.distance(b)
+
+def test_generations_keep_population_and_elites():
+    with EvolutionRunner(population_size=6, max_steps=20, processes=2, random_seed=5) as runner:
+        stats, best = runner.step()
+        assert len(runner.population) == 6
+        assert runner.population[0] is best
+        assert stats['generation'] == 0
+
+        runner.run(1)
+        assert runner.generation == 2
+        assert len(runner.history) == 2
+
+def test_local_worker_keeps_random_state():
+    # Con processes=1 el simulador se crea en el mismo proceso que el runner
+    random.seed(8)
+    torch.manual_seed(8)
+    state, torch_state = random.getstate(), torch.get_rng_state()
+    _init_worker(40)
+    assert random.getstate() == state and torch.equal(torch.get_rng_state(), torch_state)
+
+def test_population_does_not_depend_on_processes():
+    # Evaluar en el propio proceso no consume el generador global de las mutaciones
+    # (ni saltárselo por un acierto de la caché de aptitud)
+    populations = []
+    for processes, cache in ((1, None), (2, None), (1, FitnessCache())):
+        with EvolutionRunner(population_size=6, max_steps=40, processes=processes, random_seed=12,
+                             fitness_cache=cache, evaluation_seed=5) as runner:
+            runner.run(3)
+            populations.append([g.content_hash() for g in runner.population])
+    assert populations[0] == populations[1] == populations[2]
+
+def test_shared_population_round_trip():
+    random.seed(7)
+    genomes = [NymbotGenome() for _ in range(3)]
+    genomes[1].mutate(mutation_rate=1.0)
+    with SharedPopulation(3) as store:
+        store.write_population(genomes)
+        for i, genome in enumerate(genomes):
+            clone = store.read(i, copy=True)
+            assert clone.content_hash() == genome.content_hash()
+
+        # Deserializar el almacén conecta al mismo segmento
+        attached = pickle.loads(pickle.dumps(store))
+        attached.fitness[2] = 1.5
+        assert store.fitness[2] == 1.5
+        attached.close()
+
+def test_shared_memory_evaluation_matches():
+    fitness = []
+    for shared in (False, True):
+        with EvolutionRunner(population_size=4, max_steps=200, processes=2, random_seed=8,
+                             shared_memory=shared) as runner:
+            fitness.append(runner.evaluate(runner.population, seed=3))
+    assert fitness[0] == fitness[1]
+
+def test_fitness_cache_lru_and_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fitness.sqlite')
+        cache = FitnessCache(capacity=2, path=path)
+        for i in range(3):
+            cache.put(f"k{i}", i)
+        assert len(cache) == 2 and 'k0' not in cache.entries
+        assert cache.get('k0') == 0.0  # recuperada del disco
+        cache.close()
+
+        cache = FitnessCache(path=path)
+        assert cache.get('k2') == 2.0
+        assert cache.get('otra') is None
+        cache.close()
+
+def test_runner_reuses_cached_fitness():
+    cache = FitnessCache()
+    with EvolutionRunner(population_size=4, max_steps=50, processes=1, random_seed=9,
+                         fitness_cache=cache, evaluation_seed=11) as runner:
+        first = runner.evaluate(runner.population, seed=11)
+        misses = cache.misses
+        assert runner.evaluate(runner.population, seed=11) == first
+        assert cache.misses == misses
+
+        # Las élites pasan sin cambios y no se vuelven a simular
+        runner.run(2)
+        assert cache.hits >= 4 + runner.n_elites
+
+def test_racing_culls_and_keeps_ranking():
+    population = [NymbotGenome() for _ in range(16)]
+    racing = RacingEvaluator(rungs=(50, 100), keep=0.5, max_steps=200, stagnation_steps=None)
+    fitness = racing.evaluate(population, seed=4)
+
+    stats = racing.last_stats
+    assert len(fitness) == 16 and stats['culled'] > 0
+    assert stats['simulated_steps'] <= 16 * 50 + 8 * 50 + 4 * 100
+    # Sólo los 4 supervivientes llegan al final y ningún descartado los supera
+    survivors, dropped = stats['survivors'], stats['dropped']
+    assert 0 < len(survivors) <= 4 and len(dropped) == stats['culled']
+    assert not set(survivors) & set(dropped)
+    assert min(fitness[i] for i in survivors) >= max(fitness[i] for i in dropped)
+
+    # La aptitud de una carrera depende de la población: no se cachea
+    try:
+        EvolutionRunner(population_size=4, processes=1, racing=racing, fitness_cache=FitnessCache())
+        assert False, "Aceptó racing con caché de aptitud"
+    except ValueError:
+        pass
+
+def test_es_noise_table_and_update():
+    assert np.allclose(centered_ranks([[3.0, 1.0], [2.0, 5.0]]), [[1 / 6, -0.5], [-1 / 6, 0.5]])
+
+    with NoiseTable(size=1 << 16, seed=1) as noise:
+        attached = pickle.loads(pickle.dumps(noise))  # se conecta al mismo segmento
+        assert np.array_equal(attached.get(100, 50), noise.get(100, 50))
+        assert not attached.noise.flags.writeable
+        attached.close()
+
+        with ESOptimizer(population_size=4, noise=noise, max_steps=30, processes=1, random_seed=2) as optimizer:
+            before = optimizer.theta.copy()
+            stats = optimizer.step()
+            assert optimizer.generation == 1 and np.isfinite(stats['mean'])
+            assert not np.array_equal(before, optimizer.theta)
+            # Mismo desplazamiento y semilla: misma aptitud (sólo viajan enteros)
+            offsets = np.array([7, 7])
+            pairs = optimizer.evaluate_pairs(offsets, seed=3)
+            assert pairs.shape == (2, 2) and np.array_equal(pairs[0], pairs[1])
+
+def test_compact_genome_is_lazy_and_converts():
+    population = CompactGenome.population(8)
+    genome = population[0]
+    assert genome._brain is None and genome.weights.base is population[1].weights.base
+
+    # Conversión sin copia y misma huella que el NymbotGenome equivalente
+    full = genome.to_genome()
+    assert np.shares_memory(full.weights, genome.weights)
+    assert full.content_hash() == genome.content_hash()
+    assert CompactGenome.from_genome(full).content_hash() == genome.content_hash()
+
+    state = np.random.default_rng(0).random(genome.fov)
+    assert np.allclose(NumpyBrain(genome.numpy_layers()).get_action(state), full.brain.get_action(state), atol=1e-6)
+
+    # El simulador con backend NumPy no construye módulos de torch
+    VectorizedSimulator(genomes=population, random_seed=0, brain_backend='numpy').run(5)
+    assert all(g._brain is None for g in population)
+
+    child = pickle.loads(pickle.dumps(genome.copy()))
+    child.fov = 90
+    child.mutate(0.0)
+    assert child.input_size == 90 and len(child.weights) == len(NymbotGenome.from_weights(
+        child.traits(), child.weights, child.brain_architecture).weights)
+
+def test_checkpoint_resume_is_exact():
+    def fingerprint(runner):
+        return [g.content_hash() for g in runner.population], runner.history
+
+    with EvolutionRunner(population_size=6, max_steps=40, processes=1, random_seed=12) as runner:
+        runner.run(3)
+        expected = fingerprint(runner)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'run.ckpt')
+        with EvolutionRunner(population_size=6, max_steps=40, processes=1, random_seed=12,
+                             checkpoint=path) as runner:
+            runner.run(1)
+            blobs = len(runner.checkpoint.index)
+            runner.run(1)
+            # Incremental: las élites no se vuelven a escribir
+            assert len(runner.checkpoint.index) - blobs <= 6 - runner.n_elites
+
+        # Un estado completo pero corrupto y una escritura cortada a medias se descartan al abrir
+        size = os.path.getsize(path)
+        payload = pickle.dumps({'generation': 7})
+        with open(path, 'ab') as f:
+            f.write(_HEADER.pack(b'NYMB', STATE, b'\0' * 32, len(payload), b'\0' * 16) + payload)
+            f.write(b'NYMB' + b'\0' * 20)
+
+        with EvolutionRunner(population_size=6, max_steps=40, processes=1, random_seed=99,
+                             checkpoint=path) as runner:
+            assert os.path.getsize(path) == size
+            assert runner.resume() and runner.generation == 2
+            runner.run(1)
+            assert fingerprint(runner) == expected
+
+        with Checkpoint(path) as checkpoint:
+            assert checkpoint.load_state()['generation'] == 3
+
+        # Un archivo ajeno no se trunca
+        other = os.path.join(tmp, 'notas.txt')
+        with open(other, 'wb') as f:
+            f.write(b'x' * 200)
+        try:
+            Checkpoint(other)
+            assert False, "Abrió un archivo que no es un checkpoint"
+        except ValueError:
+            pass
+        assert os.path.getsize(other) == 200
+
+if __name__ == "__main__":
+    test_mutate_keeps_brain_consistent()
+    test_crossover_mixes_parent_weights()
+    test_generations_keep_population_and_elites()
+    test_local_worker_keeps_random_state()
+    test_population_does_not_depend_on_processes()
+    test_shared_population_round_trip()
+    test_shared_memory_evaluation_matches()
+    test_fitness_cache_lru_and_disk()
+    test_runner_reuses_cached_fitness()
+    test_racing_culls_and_keeps_ranking()
+    test_es_noise_table_and_update()
+    test_compact_genome_is_lazy_and_converts()
+    test_checkpoint_resume_is_exact()
+    print("¡Pruebas de evolución exitosas!")
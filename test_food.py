@@ -0,0 +1,64 @@
+# test_food.py
+import random
+import numpy as np
+from food import FoodField
+from headless_simulator import HeadlessSimulator
+from raycast import ray_circle_distances
+
+def test_grid_rays_match_brute_force():
+    random.seed(1)
+    food = FoodField(count=2000)
+
+    rng = np.random.default_rng(0)
+    ox = rng.uniform(0, 800, 3000)
+    oy = rng.uniform(0, 600, 3000)
+    angles = rng.uniform(0, 2 * np.pi, 3000)
+    dx, dy = np.cos(angles), np.sin(angles)
+
+    grid = food.ray_distances(ox, oy, dx, dy)
+    centers = food.positions
+    brute = ray_circle_distances(ox[:, None], oy[:, None], dx[:, None], dy[:, None],
+                                 centers[:, 0], centers[:, 1]).min(axis=1)
+    assert np.allclose(grid, brute)
+
+def test_eat_and_respawn_policies():
+    random.seed(2)
+    food = FoodField(count=50, respawn='delayed', respawn_delay=3)
+    target = food.position(10)
+    assert food.eat(target, 10) >= 1
+    assert not food.active[10]
+    assert 10 not in food.within(target, 1)
+
+    for _ in range(3):
+        food.tick()
+    assert food.active.all()
+
+    food = FoodField(count=20, respawn='none')
+    food.eat(food.position(0), 10)
+    assert not food.active[0]
+
+def test_delayed_respawn_step():
+    simulator = HeadlessSimulator(initial_conditions={'food': {'count': 1, 'respawn': 'delayed',
+                                                               'respawn_delay': 3}}, random_seed=4)
+    food = simulator.food
+    food.set_position(0, simulator.nymbot.position)
+    simulator.advance()
+    eaten_at = simulator.current_step
+    assert simulator.total_food_collected == 1 and not food.active[0]
+
+    while not food.active[0]:
+        simulator.advance()
+    assert simulator.current_step == eaten_at + 3
+
+def test_headless_with_many_food_items():
+    simulator = HeadlessSimulator(initial_conditions={'food': {'count': 500}}, random_seed=3)
+    results = simulator.run_episode(max_steps=100)
+    assert results['total_steps'] == 100
+    assert len(simulator.food) == 500
+
+if __name__ == "__main__":
+    test_grid_rays_match_brute_force()
+    test_eat_and_respawn_policies()
+    test_delayed_respawn_step()
+    test_headless_with_many_food_items()
+    print("¡Pruebas de comida exitosas!")
@@ -0,0 +1,51 @@
+# test_profiling.py
+import json
+from time import perf_counter
+import numpy as np
+from profiling import Profiler, PROFILER
+from headless_simulator import HeadlessSimulator
+
+def test_enable_laps_and_counters():
+    profiler = Profiler()
+    assert not profiler.enabled
+    profiler.enable()
+    assert profiler.enabled
+    assert not profiler.toggle() and profiler.toggle()
+
+    t = perf_counter()
+    t = profiler.lap('vision', t)
+    profiler.lap('vision', t)
+    profiler.count('rays', np.int64(40))
+    profiler.count('rays')
+
+    snapshot = json.loads(json.dumps(profiler.snapshot()))
+    assert snapshot['enabled']
+    assert snapshot['phases']['vision']['calls'] == 2
+    assert snapshot['phases']['vision']['total_s'] >= 0.0
+    assert snapshot['counters'] == {'rays': 41}
+
+    profiler.disable()
+    profiler.reset()
+    assert profiler.snapshot() == {'enabled': False, 'phases': {}, 'counters': {}}
+
+def test_simulator_snapshot_is_json():
+    PROFILER.reset()
+    PROFILER.enable()
+    try:
+        for mode in ('analytic', 'sdf'):
+            simulator = HeadlessSimulator(random_seed=5)
+            simulator.nymbot.vision_mode = mode
+            for _ in range(10):
+                simulator.advance()
+        snapshot = json.loads(json.dumps(simulator.profile_snapshot()))
+    finally:
+        PROFILER.disable()
+        PROFILER.reset()
+    assert snapshot['counters']['steps'] == 20
+    assert {'vision', 'brain', 'move', 'energy', 'food'} <= set(snapshot['phases'])
+    assert snapshot['counters']['rays'] > 0
+
+if __name__ == "__main__":
+    test_enable_laps_and_counters()
+    test_simulator_snapshot_is_json()
+    print("¡Pruebas del perfilador exitosas!")
@@ -0,0 +1,45 @@
+# test_recorder.py
+from headless_simulator import HeadlessSimulator
+from recorder import EpisodeRecorder
+
+def test_history_view_matches_run_step():
+    simulator = HeadlessSimulator(random_seed=11)
+    results = simulator.run_episode(max_steps=50)
+    history = results['history']
+
+    assert len(history) == 50
+    assert history[-1]['step'] == 50
+    assert set(history[0]) == {'step', 'position', 'body_angle', 'eye_angle', 'energy', 'food_pos', 'done'}
+    assert abs(history[-1]['energy'] - results['final_energy']) < 1e-6
+    # Mismo valor que el estado del simulador, sin pérdida de precisión
+    assert history[-1]['position'] == tuple(simulator.nymbot.position)
+    assert history[-1]['body_angle'] == simulator.nymbot.body_angle
+
+def test_every_mode_keeps_last_step_of_short_episode():
+    simulator = HeadlessSimulator(random_seed=11)
+    results = simulator.run_episode(max_steps=50, record='every', record_every=7)
+    history = results['history']
+    assert history[-1]['step'] == 50 and history[-1]['done']
+    assert [h['step'] for h in history] == [7, 14, 21, 28, 35, 42, 49, 50]
+
+def test_record_modes():
+    recorder = EpisodeRecorder('ring', capacity=4)
+    for step in range(1, 11):
+        recorder.record(step, (step, step), 0.0, 0.0, 100.0, (1, 1), step == 10)
+    assert recorder.trajectory()['step'].tolist() == [7, 8, 9, 10]
+
+    recorder = EpisodeRecorder('every', capacity=10, every=3)
+    for step in range(1, 11):
+        recorder.record(step, (step, step), 0.0, 0.0, 100.0, (1, 1), step == 10)
+    assert recorder.trajectory()['step'].tolist() == [3, 6, 9, 10]
+
+    recorder = EpisodeRecorder('summary')
+    for step in range(1, 11):
+        recorder.record(step, (step, step), 0.0, 0.0, 100.0, (1, 1), step == 10)
+    assert recorder.history()[0]['done']
+
+if __name__ == "__main__":
+    test_history_view_matches_run_step()
+    test_every_mode_keeps_last_step_of_short_episode()
+    test_record_modes()
+    print("¡Pruebas del grabador exitosas!")
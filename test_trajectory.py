@@ -0,0 +1,68 @@
+# test_trajectory.py
+import os
+import tempfile
+import numpy as np
+from headless_simulator import HeadlessSimulator
+from recorder import STEP_DTYPE
+from trajectory import TrajectoryWriter, TrajectoryReader, HEADER, MAGIC, VERSION
+
+def test_round_trip_through_run_episode():
+    path = os.path.join(tempfile.mkdtemp(), 'run.traj')
+    simulator = HeadlessSimulator(random_seed=21)
+    with TrajectoryWriter(path, buffer_size=16) as writer:
+        results = [simulator.run_episode(max_steps=steps, writer=writer) for steps in (30, 45)]
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 75 and reader.n_episodes == 2
+    assert reader.index.tolist() == [(0, 30), (30, 45)]
+    for e, result in enumerate(results):
+        assert np.array_equal(reader.episode(e), result['trajectory'])
+    assert reader.episode(1)[-1]['done']
+    assert [reader.episode_of(i) for i in (0, 29, 30, 74)] == [0, 0, 1, 1]
+    assert reader[30]['step'] == 1
+
+def test_reader_follows_open_writer():
+    path = os.path.join(tempfile.mkdtemp(), 'live.traj')
+    writer = TrajectoryWriter(path, buffer_size=4)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 0 and reader.n_episodes == 0  # archivo vacío
+
+    for step in range(1, 11):
+        writer.record(step, (step, step), 0.0, 0.0, 100.0, (1, 1), False)
+    reader.refresh()
+    assert len(reader) == 8  # sólo lo ya volcado (dos buffers llenos)
+
+    writer.flush()
+    writer.begin_episode()
+    writer.record(1, (0, 0), 0.0, 0.0, 100.0, (1, 1), True)
+    writer.flush()
+    reader.refresh()
+    assert len(reader) == 11 and reader.n_episodes == 2
+    assert reader.episode(0)['step'].tolist() == list(range(1, 11))
+    assert reader.episode_of(10) == 1
+    writer.close()
+
+def test_rejects_unknown_files():
+    directory = tempfile.mkdtemp()
+    empty = os.path.join(directory, 'empty.traj')
+    open(empty, 'wb').close()
+
+    old = os.path.join(directory, 'old.traj')
+    with open(old, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION - 1, STEP_DTYPE.itemsize, 0, 0, 0).ljust(64, b'\0'))
+    resized = os.path.join(directory, 'resized.traj')
+    with open(resized, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, STEP_DTYPE.itemsize - 8, 0, 0, 0).ljust(64, b'\0'))
+
+    for path in (empty, old, resized):
+        try:
+            TrajectoryReader(path)
+            assert False, f"Aceptó {path}"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_round_trip_through_run_episode()
+    test_reader_follows_open_writer()
+    test_rejects_unknown_files()
+    print("¡Pruebas de trayectorias exitosas!")
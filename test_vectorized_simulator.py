@@ -0,0 +1,123 @@
+# test_vectorized_simulator.py
+import math
+import numpy as np
+from headless_simulator import HeadlessSimulator
+from genome import NymbotGenome
+from vectorized_simulator import VectorizedSimulator
+from arena import random_maze
+from kernels import HAVE_NUMBA
+from vec_env import VecEnv
+
+def test_step_matches_headless():
+    headless = HeadlessSimulator(random_seed=42)
+    start_position = list(headless.nymbot.position)
+
+    vectorized = VectorizedSimulator(genomes=[headless.nymbot.genome], random_seed=42)
+    vectorized.position[0] = start_position
+    vectorized.food_pos[0] = headless.food_pos
+
+    for _ in range(5):
+        state, _ = headless.run_step()
+        vectorized.step()
+
+        assert math.isclose(vectorized.position[0, 0], state['position'][0], abs_tol=0.001)
+        assert math.isclose(vectorized.position[0, 1], state['position'][1], abs_tol=0.001)
+        assert math.isclose(vectorized.body_angle[0], state['body_angle'], abs_tol=0.001)
+        assert math.isclose(vectorized.eye_angle[0], state['eye_angle'], abs_tol=0.001)
+        assert math.isclose(vectorized.energy[0], state['energy'], abs_tol=0.001)
+
+def test_dead_agents_are_frozen():
+    simulator = VectorizedSimulator(n_agents=4, random_seed=0)
+    simulator.energy[1] = simulator.energy_cost[1] / 2
+    simulator.step()
+
+    assert not simulator.alive[1]
+    assert simulator.alive[[0, 2, 3]].all()
+
+    position = simulator.position[1].copy()
+    energy = simulator.energy[1]
+    simulator.step()
+    assert np.array_equal(simulator.position[1], position)
+    assert simulator.energy[1] == energy
+    assert simulator.steps[1] == 1
+
+def test_run_finishes_all_agents():
+    simulator = VectorizedSimulator(n_agents=3, random_seed=1, max_steps=20)
+    results = simulator.run()
+
+    assert not simulator.alive.any()
+    assert np.array_equal(results['total_steps'], [20, 20, 20])
+
+def test_agent_streams_do_not_depend_on_batch():
+    genomes = [NymbotGenome() for _ in range(3)]
+    alone = VectorizedSimulator(genomes=genomes[1:2], random_seed=7, max_steps=50)
+    batch = VectorizedSimulator(genomes=genomes, random_seed=7, max_steps=50)
+    assert np.array_equal(alone.position[0], batch.position[1])
+
+    # Que coman otros agentes (y reaparezca su comida) no cambia el flujo del resto
+    alone.food_pos[0] = alone.position[0] + [5, 0]
+    batch.food_pos[:2] = batch.position[:2] + [5, 0]
+    first, second = alone.run(), batch.run()
+    assert alone.food_collected[0] >= 1 and batch.food_collected[0] >= 1
+    for key in first:
+        assert first[key][0] == second[key][1]
+    assert np.array_equal(alone.food_pos[0], batch.food_pos[1])
+
+def test_kernel_backends_match():
+    backends = ['numpy', 'numba'] if HAVE_NUMBA else ['numpy']
+    for arena in (None, random_maze(4, 3, seed=1)):
+        final = []
+        for backend in backends:
+            simulator = VectorizedSimulator(n_agents=16, random_seed=3, max_steps=150, arena=arena,
+                                            kernel_backend=backend)
+            simulator.food_pos[:8] = simulator.position[:8] + [5, 0]  # comen en el primer paso
+            simulator.energy[-2:] = simulator.energy_cost[-2:] * 3    # mueren pronto
+            rng = np.random.default_rng(0)
+            seen = 0
+            while simulator.alive.any() and simulator.current_step < 150:
+                simulator.step(rng.uniform(-1, 1, (16, 3)))
+                seen += simulator.update_vision().sum()
+            final.append((simulator.position, simulator.energy, simulator.steps,
+                          simulator.food_collected, simulator.food_pos, seen))
+        for values in final[1:]:
+            assert all(np.array_equal(a, b) for a, b in zip(final[0], values))
+
+def test_stagnant_agents_terminate_early():
+    simulator = VectorizedSimulator(n_agents=3, random_seed=2, max_steps=100, stagnation_steps=30)
+    actions = np.zeros((3, 3))
+    actions[0, 0] = 1.0  # sólo el primero avanza (0.5 por paso)
+    while simulator.alive.any():
+        simulator.step(actions)
+
+    assert np.array_equal(simulator.steps, [100, 30, 30])
+    assert np.array_equal(simulator.stagnant, [False, True, True])
+
+def test_vec_env_auto_resets_in_place():
+    env = VecEnv(n_envs=4, random_seed=5, max_steps=10)
+    observation = env.reset()
+    assert observation.shape == (4, env.observation_size)
+    position = env.simulator.position
+
+    env.simulator.energy[2] = env.simulator.energy_cost[2] / 2  # muere en el primer paso
+    rng = np.random.default_rng(0)
+    finished = 0
+    for step in range(25):
+        observation, reward, done, info = env.step(rng.uniform(-1, 1, (4, 3)))
+        assert reward.shape == done.shape == (4,)
+        if done.any():
+            finished += len(info['indices'])
+            assert info['final_observation'].shape == (len(info['indices']), env.observation_size)
+            assert (env.simulator.steps[done] == 0).all() and env.simulator.alive.all()
+
+    assert env.simulator.position is position  # mismos arrays, sin reconstruir
+    assert finished == 1 + 4 * 2  # la muerte temprana y dos límites de 10 pasos por entorno
+
+if __name__ == "__main__":
+    test_step_matches_headless()
+    test_agent_streams_do_not_depend_on_batch()
+    test_dead_agents_are_frozen()
+    test_run_finishes_all_agents()
+    test_kernel_backends_match()
+    test_stagnant_agents_terminate_early()
+    test_vec_env_auto_resets_in_place()
+    print("¡Pruebas del simulador vectorizado exitosas!")
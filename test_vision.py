@@ -0,0 +1,89 @@
+# test_vision.py
+import math
+import random
+import numpy as np
+from nymbot import Nymbot
+from arena import Arena, random_maze
+from sdf import get_distance_field
+
+WALLS = [
+    [(50, 50), (750, 50)],
+    [(750, 50), (750, 550)],
+    [(750, 550), (50, 550)],
+    [(50, 550), (50, 50)]
+]
+
+def test_analytic_matches_march():
+    random.seed(7)
+    mismatches = 0
+    total = 0
+    offsets = []
+
+    for _ in range(50):
+        food_pos = [random.randint(100, 700), random.randint(100, 500)]
+        nymbot = Nymbot(WALLS, food_pos)
+        nymbot.eye_angle = random.uniform(0, 2 * math.pi)
+
+        nymbot.vision_mode = "march"
+        march_vision = nymbot.update_vision().copy()
+        march_endpoints = np.array(nymbot.ray_endpoints, dtype=float)
+
+        nymbot.vision_mode = "analytic"
+        analytic_vision = nymbot.update_vision().copy()
+        analytic_endpoints = np.asarray(nymbot.ray_endpoints)
+
+        assert analytic_vision.shape == march_vision.shape
+        assert analytic_endpoints.shape == march_endpoints.shape
+        mismatches += np.count_nonzero(march_vision != analytic_vision)
+        total += march_vision.size
+
+        # El marcher se detiene a 5 px de la pared; el analítico en la pared exacta
+        both_walls = (march_vision == 0) & (analytic_vision == 0)
+        offsets.append(np.linalg.norm(march_endpoints - analytic_endpoints, axis=1)[both_walls])
+
+    # Sólo los rayos rasantes a la comida pueden diferir
+    assert mismatches / total < 0.01
+    assert np.median(np.concatenate(offsets)) < 10
+
+def test_food_straight_ahead():
+    nymbot = Nymbot(WALLS, [400, 300])
+    nymbot.position = [300, 300]
+    nymbot.eye_angle = 0.0
+    vision = nymbot.update_vision()
+
+    center = nymbot.fov // 2
+    assert vision[center] == 1.0
+    assert math.isclose(nymbot.ray_endpoints[center][0], 392, abs_tol=1e-6)
+    assert vision[0] == 0.0
+
+def test_sdf_matches_analytic():
+    arena = Arena(random_maze(7, 5, seed=3))
+    field = get_distance_field(arena)
+    # Un solo campo por geometría; la tabla que se muestrea es la del mmap (sin copia)
+    assert get_distance_field(Arena(arena.walls)) is field
+    assert not field.bound.flags.writeable
+    assert isinstance(field.bound.base, np.memmap)
+
+    random.seed(9)
+    for _ in range(20):
+        nymbot = Nymbot(arena, [random.randint(100, 700), random.randint(100, 500)])
+        nymbot.position = [random.choice([100, 200, 300, 400, 500, 600, 700]) + random.uniform(-30, 30),
+                           random.choice([100, 200, 300, 400, 500]) + random.uniform(-30, 30)]
+        nymbot.eye_angle = random.uniform(0, 2 * math.pi)
+
+        nymbot.vision_mode = "analytic"
+        analytic_vision = nymbot.update_vision().copy()
+        analytic_distances = nymbot.ray_distances.copy()
+
+        nymbot.vision_mode = "sdf"
+        sdf_vision = nymbot.update_vision()
+        assert nymbot.ray_distances.shape == (nymbot.fov,)
+        # El impacto final se calcula exacto contra las paredes de la celda
+        assert np.array_equal(sdf_vision, analytic_vision)
+        assert np.allclose(nymbot.ray_distances, analytic_distances)
+
+if __name__ == "__main__":
+    test_analytic_matches_march()
+    test_food_straight_ahead()
+    test_sdf_matches_analytic()
+    print("¡Pruebas de visión exitosas!")
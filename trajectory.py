@@ -0,0 +1,151 @@
+# trajectory.py
+import struct
+import numpy as np
+from recorder import STEP_DTYPE
+
+# Formato en disco:
+#   cabecera (64 bytes) | índice de episodios (capacidad x 16 bytes) | registros STEP_DTYPE
+# Cada registro tiene tamaño fijo, así que el paso i está en data_offset + i * record_size.
+MAGIC = b'NYMTRAJ1'
+VERSION = 2  # 2: registros en float64
+HEADER = struct.Struct('<8sIIQQQ')  # magic, versión, tamaño registro, n_registros, n_episodios, capacidad índice
+HEADER_SIZE = 64
+INDEX_DTYPE = np.dtype([('start', '<u8'), ('length', '<u8')])
+
+
+class TrajectoryWriter:
+    """Escribe trayectorias en streaming mientras corre la simulación
+
+    Tiene la misma firma record(...) que EpisodeRecorder, así que puede usarse
+    como destino directo de HeadlessSimulator.run_episode.
+    """
+
+    def __init__(self, path, index_capacity=4096, buffer_size=1024):
+        self.path = path
+        self.index_capacity = index_capacity
+        self.data_offset = HEADER_SIZE + index_capacity * INDEX_DTYPE.itemsize
+        self.n_records = 0
+        self.n_episodes = 0
+        self._episode_start = 0
+        self._buffer = np.zeros(buffer_size, dtype=STEP_DTYPE)
+        self._buffered = 0
+
+        self._file = open(path, 'wb+')
+        self._write_header()
+        self._file.write(bytes(index_capacity * INDEX_DTYPE.itemsize))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_header(self):
+        self._file.seek(0)
+        header = HEADER.pack(MAGIC, VERSION, STEP_DTYPE.itemsize, self.n_records,
+                             self.n_episodes, self.index_capacity)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    def begin_episode(self):
+        """Abre un nuevo episodio en el índice"""
+        self.flush()
+        if self.n_episodes == self.index_capacity:
+            raise ValueError(f"Índice lleno ({self.index_capacity} episodios)")
+        self._episode_start = self.n_records + self._buffered
+        self.n_episodes += 1
+
+    def record(self, step, position, body_angle, eye_angle, energy, food_pos, done):
+        """Añade un paso al episodio actual"""
+        if self.n_episodes == 0:
+            self.begin_episode()
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+        record = self._buffer[self._buffered]
+        record['step'] = step
+        record['position'] = position
+        record['body_angle'] = body_angle
+        record['eye_angle'] = eye_angle
+        record['energy'] = energy
+        record['food_pos'] = food_pos
+        record['done'] = done
+        self._buffered += 1
+
+    def write_records(self, records):
+        """Añade de una vez un array STEP_DTYPE al episodio actual"""
+        if self.n_episodes == 0:
+            self.begin_episode()
+        self.flush()
+        self._file.seek(self.data_offset + self.n_records * STEP_DTYPE.itemsize)
+        self._file.write(np.ascontiguousarray(records, dtype=STEP_DTYPE).tobytes())
+        self.n_records += len(records)
+        self._update_index()
+
+    def flush(self):
+        """Vuelca el buffer y actualiza cabecera e índice (visible para los lectores)"""
+        if self._buffered:
+            self._file.seek(self.data_offset + self.n_records * STEP_DTYPE.itemsize)
+            self._file.write(self._buffer[:self._buffered].tobytes())
+            self.n_records += self._buffered
+            self._buffered = 0
+        self._update_index()
+
+    def _update_index(self):
+        if self.n_episodes:
+            entry = np.array([(self._episode_start, self.n_records - self._episode_start)], dtype=INDEX_DTYPE)
+            self._file.seek(HEADER_SIZE + (self.n_episodes - 1) * INDEX_DTYPE.itemsize)
+            self._file.write(entry.tobytes())
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class TrajectoryReader:
+    """Acceso aleatorio O(1) a una trayectoria mediante memoria mapeada"""
+
+    def __init__(self, path):
+        self.path = path
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a leer la cabecera (p. ej. si el archivo sigue creciendo)"""
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{self.path} no es un archivo de trayectoria")
+        magic, version, record_size, n_records, n_episodes, index_capacity = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} no es un archivo de trayectoria")
+        if version != VERSION or record_size != STEP_DTYPE.itemsize:
+            raise ValueError(f"Versión de trayectoria no soportada: {version}")
+
+        self.n_records = n_records
+        self.n_episodes = n_episodes
+        data_offset = HEADER_SIZE + index_capacity * INDEX_DTYPE.itemsize
+
+        self.index = np.memmap(self.path, dtype=INDEX_DTYPE, mode='r', offset=HEADER_SIZE,
+                               shape=(index_capacity,))[:n_episodes]
+        if n_records:
+            self.records = np.memmap(self.path, dtype=STEP_DTYPE, mode='r', offset=data_offset,
+                                     shape=(n_records,))
+        else:
+            self.records = np.zeros(0, dtype=STEP_DTYPE)
+
+    def __len__(self):
+        return self.n_records
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    def episode(self, e):
+        """Vista (sin copia) de los registros del episodio e"""
+        start, length = self.index[e]
+        return self.records[start:start + length]
+
+    def episode_of(self, i):
+        """Episodio al que pertenece el registro i"""
+        return int(np.searchsorted(self.index['start'], i, side='right')) - 1
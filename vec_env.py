@@ -0,0 +1,72 @@
+# vec_env.py
+import numpy as np
+from vectorized_simulator import VectorizedSimulator
+from config import MAX_STEPS, KERNEL_BACKEND
+
+
+class VecEnv:
+    """N entornos nymbot con interfaz estilo Gym sobre un VectorizedSimulator
+
+    reset() y step(actions) trabajan con arrays: acciones (N, 3) en [-1, 1],
+    observaciones (N, R) con la visión (R = FOV máximo; los rayos fuera del
+    FOV de cada agente valen 0), recompensas (N,) = comida recogida en el paso
+    y done (N,). Los entornos que terminan se reinician en su sitio dentro del
+    mismo step: la observación devuelta ya es la del episodio nuevo y la final
+    va en info['final_observation'] (filas de info['indices']). No se
+    construyen genomas, cerebros ni arrays por episodio.
+
+    La observación devuelta es un buffer interno que se reescribe en cada
+    paso; hay que copiarla si se quiere guardar.
+    """
+
+    action_size = 3
+
+    def __init__(self, n_envs=None, genomes=None, random_seed=None, max_steps=MAX_STEPS, arena=None,
+                 kernel_backend=KERNEL_BACKEND):
+        self.simulator = VectorizedSimulator(genomes=genomes, n_agents=n_envs, random_seed=None,
+                                             max_steps=max_steps, arena=arena, kernel_backend=kernel_backend)
+        self.n_envs = self.simulator.n_agents
+        if random_seed is not None:
+            self.simulator.seed(self.env_seeds(random_seed))
+            self.simulator.reset()
+        self.observation_size = self.simulator.max_fov
+        self.episode_returns = np.zeros(self.n_envs)
+        self._food = np.zeros(self.n_envs, dtype=np.int64)
+        self._actions = np.zeros((self.n_envs, self.action_size))
+
+    def env_seeds(self, seed):
+        """Una semilla distinta por entorno derivada de `seed` (cada uno su propio episodio)"""
+        return np.random.SeedSequence(seed).generate_state(self.n_envs, np.uint64)
+
+    def reset(self, seed=None):
+        """Reinicia todos los entornos; devuelve las observaciones (N, R)"""
+        simulator = self.simulator
+        if seed is not None:
+            simulator.seed(self.env_seeds(seed))
+        simulator.reset()
+        self.episode_returns[:] = 0.0
+        return simulator.update_vision()
+
+    def step(self, actions):
+        """Avanza todos los entornos; devuelve (obs, reward, done, info)"""
+        simulator = self.simulator
+        np.clip(np.reshape(actions, (self.n_envs, self.action_size)), -1.0, 1.0, out=self._actions)
+
+        self._food[:] = simulator.food_collected
+        done = simulator.step(self._actions)
+        reward = (simulator.food_collected - self._food).astype(np.float64)
+        self.episode_returns += reward
+        observation = simulator.update_vision()
+
+        info = {}
+        if done.any():
+            # Truncado = llegó al límite de pasos con energía; si no, murió (o se estancó)
+            info['indices'] = np.flatnonzero(done)
+            info['final_observation'] = observation[done].copy()
+            info['episode_return'] = self.episode_returns[done].copy()
+            info['episode_length'] = simulator.steps[done].copy()
+            info['truncated'] = (simulator.energy[done] > 0) & ~simulator.stagnant[done]
+            simulator.reset_agents(done)
+            self.episode_returns[done] = 0.0
+            observation = simulator.update_vision()
+        return observation, reward, done, info
@@ -0,0 +1,208 @@
+# vectorized_simulator.py
+import numpy as np
+from genome import NymbotGenome
+from brain import BatchedBrains
+from numpy_brain import NumpyBatchedBrains
+from bucketed import BucketedBrains
+from arena import make_arena
+from kernels import make_kernels
+from config import BRAIN_BACKEND, KERNEL_BACKEND, MAX_STEPS, STAGNATION_STEPS, STAGNATION_RADIUS
+
+# Constantes de splitmix64 para los flujos aleatorios por agente
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix64(x):
+    """Finalizador de splitmix64 sobre un array uint64 (aritmética módulo 2^64)"""
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def agent_keys(random_seed, n):
+    """Clave del flujo aleatorio de cada agente
+
+    Con una semilla entera todos los agentes comparten flujo (el mismo episodio,
+    como HeadlessSimulator con esa semilla); con una secuencia, una semilla por
+    agente; con None, flujos independientes al azar.
+    """
+    if random_seed is None:
+        seeds = np.random.SeedSequence().generate_state(n, np.uint64)
+    else:
+        seeds = np.broadcast_to(np.asarray(random_seed, dtype=np.uint64), (n,))
+    return _mix64(seeds + _GOLDEN)
+
+
+def _numpy_brain_source(genome):
+    """Lo que recibe numpy_brain: un CompactGenome se exporta sin construir su nn.Module"""
+    return genome if hasattr(genome, 'numpy_layers') else genome.brain
+
+
+class VectorizedSimulator:
+    """Simula una población completa de nymbots con arrays contiguos (struct-of-arrays)
+
+    Cada agente saca sus posiciones (inicio y reapariciones de comida) de su
+    propio flujo aleatorio, un contador por agente sobre splitmix64, así que el
+    episodio de un agente sólo depende de su genoma y su semilla, no de con
+    quién comparte el lote ni de su índice.
+    """
+
+    def __init__(self, genomes=None, n_agents=None, random_seed=None, max_steps=MAX_STEPS, arena=None,
+                 brain_backend=BRAIN_BACKEND, kernel_backend=KERNEL_BACKEND,
+                 stagnation_steps=STAGNATION_STEPS, stagnation_radius=STAGNATION_RADIUS):
+        if genomes is None:
+            genomes = [NymbotGenome() for _ in range(n_agents or 1)]
+        self.genomes = list(genomes)
+        self.n_agents = len(self.genomes)
+        self.max_steps = max_steps
+        # Terminación temprana: sin comer ni alejarse stagnation_radius en stagnation_steps pasos
+        self.stagnation_steps = stagnation_steps
+        self.stagnation_radius = stagnation_radius
+        self.brain_backend = brain_backend
+        self.seed(random_seed)
+        # Física y visión por lotes: Numba si está instalado, si no NumPy (mismos resultados)
+        self.kernels = make_kernels(kernel_backend)
+
+        # Arena compilado (por defecto la caja)
+        self.arena = make_arena(arena)
+        self.walls = self.arena.walls
+
+        # Parámetros del genoma de cada agente
+        self.fov = np.array([int(g.fov) for g in self.genomes], dtype=np.int64)
+        self.max_step_size = np.array([g.max_step_size for g in self.genomes], dtype=np.float64)
+        self.max_body_rotation = np.array([g.max_body_rotation for g in self.genomes], dtype=np.float64)
+        self.max_eye_rotation = np.array([g.max_eye_rotation for g in self.genomes], dtype=np.float64)
+        self.energy_cost = np.array([g.complexity_cost() for g in self.genomes], dtype=np.float64)
+        self.params = (self.max_step_size, self.max_body_rotation, self.max_eye_rotation, self.energy_cost)
+
+        # Rayos: un rayo por grado, enmascarando los que exceden el FOV de cada agente
+        self.max_fov = int(self.fov.max())
+        self._ray_offsets = np.radians(np.arange(self.max_fov, dtype=np.float64))
+        self.ray_mask = np.arange(self.max_fov) < self.fov[:, None]
+        self.vision_data = np.zeros((self.n_agents, self.max_fov))
+
+        # Inferencia en lote: una sola pila si toda la población comparte forma y,
+        # si no (FOV o arquitecturas mezcladas), un lote por grupo de formas
+        if brain_backend == 'numpy':
+            sources = [_numpy_brain_source(g) for g in self.genomes]
+        else:
+            sources = [g.brain for g in self.genomes]
+        self.batched_brains = None
+        if np.all(self.fov == self.max_fov):
+            try:
+                batched = NumpyBatchedBrains if brain_backend == 'numpy' else BatchedBrains
+                self.batched_brains = batched(sources)
+            except ValueError:
+                pass
+        if self.batched_brains is None:
+            self.batched_brains = BucketedBrains(sources, brain_backend)
+        self.policy = self.batched_brains.get_actions
+        self.reset()
+
+    def seed(self, random_seed=None):
+        """Reinicia los flujos aleatorios de los agentes (ver agent_keys)"""
+        self.keys = agent_keys(random_seed, self.n_agents)
+        self.draws = np.zeros(self.n_agents, dtype=np.uint64)
+
+    def reset(self):
+        """Inicializa el estado de todos los agentes"""
+        n = self.n_agents
+        self.position = np.zeros((n, 2))
+        self.body_angle = np.zeros(n)
+        self.eye_angle = np.zeros(n)
+        self.energy = np.zeros(n)
+        self.food_pos = np.zeros((n, 2))
+        self.alive = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.food_collected = np.zeros(n, dtype=np.int64)
+        self.anchor = np.zeros((n, 2))
+        self.anchor_step = np.zeros(n, dtype=np.int64)
+        self.stagnant = np.zeros(n, dtype=bool)
+        self.current_step = 0
+        self.reset_agents(np.arange(n))
+
+    def reset_agents(self, agents):
+        """Reinicia en su sitio los agentes indicados (índices o máscara), sin reservar arrays"""
+        agents = np.asarray(agents)
+        if agents.dtype == bool:
+            agents = np.flatnonzero(agents)
+        self.position[agents] = self._random_positions(agents)
+        self.body_angle[agents] = 0.0
+        self.eye_angle[agents] = 0.0
+        self.energy[agents] = 1000.0
+        self.food_pos[agents] = self._random_positions(agents)
+        self.alive[agents] = True
+        self.steps[agents] = 0
+        self.food_collected[agents] = 0
+        self.anchor[agents] = self.position[agents]
+        self.anchor_step[agents] = 0
+        self.stagnant[agents] = False
+
+    def _random_positions(self, agents):
+        """Siguiente posición aleatoria del flujo de cada agente, dentro del área válida"""
+        counter = self.draws[agents] * np.uint64(2)
+        self.draws[agents] += np.uint64(1)
+        key = self.keys[agents]
+        x = _mix64(key + counter * _GOLDEN) >> np.uint64(32)
+        y = _mix64(key + (counter + np.uint64(1)) * _GOLDEN) >> np.uint64(32)
+        # Multiplicar y desplazar: entero uniforme en [0, n) a partir de 32 bits
+        positions = np.empty((len(x), 2))
+        positions[:, 0] = 100 + ((x * np.uint64(601)) >> np.uint64(32))
+        positions[:, 1] = 100 + ((y * np.uint64(401)) >> np.uint64(32))
+        return positions
+
+    def update_vision(self):
+        """Lanza los rayos de todos los agentes en una sola llamada"""
+        start_angle = self.eye_angle - np.radians(self.fov / 2)
+        angles = start_angle[:, None] + self._ray_offsets
+        return self.kernels.food_vision(self.position, angles, self.ray_mask, self.arena, self.food_pos,
+                                        self.vision_data)
+
+    def step(self, actions=None):
+        """Avanza un paso a todos los agentes vivos; devuelve los que terminaron en este paso
+
+        Sin acciones se lanzan los rayos y decide la política; con acciones
+        externas la visión no hace falta y no se calcula.
+        """
+        if actions is None:
+            actions = self.policy(self.update_vision())
+
+        # Mover, gastar energía y comer (los agentes muertos no cambian)
+        state = (self.position, self.body_angle, self.eye_angle, self.energy, self.alive,
+                 self.steps, self.food_collected, self.food_pos)
+        done, eaten = self.kernels.physics(state, self.params, actions, self.max_steps)
+
+        # La comida reaparece con el flujo de cada agente (igual con cualquier backend)
+        if eaten.any():
+            agents = np.flatnonzero(eaten)
+            self.food_pos[agents] = self._random_positions(agents)
+        if self.stagnation_steps:
+            done |= self.check_stagnation(eaten)
+        self.current_step += 1
+        return done
+
+    def check_stagnation(self, eaten):
+        """Termina los agentes que llevan stagnation_steps pasos sin comer ni desplazarse"""
+        delta = self.position - self.anchor
+        moved = eaten | (np.hypot(delta[:, 0], delta[:, 1]) > self.stagnation_radius)
+        self.anchor[moved] = self.position[moved]
+        self.anchor_step[moved] = self.steps[moved]
+
+        stagnant = self.alive & (self.steps - self.anchor_step >= self.stagnation_steps)
+        self.alive &= ~stagnant
+        self.stagnant |= stagnant
+        return stagnant
+
+    def run(self, max_steps=None):
+        """Ejecuta hasta que todos los agentes terminen; devuelve un resumen por agente"""
+        max_steps = self.max_steps if max_steps is None else max_steps
+        while self.alive.any() and self.current_step < max_steps:
+            self.step()
+
+        return {
+            'total_steps': self.steps.copy(),
+            'final_energy': self.energy.copy(),
+            'food_collected': self.food_collected.copy()
+        }
@@ -0,0 +1,108 @@
+# vision_renderer.py
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+from arcade.shape_list import ShapeElementList, create_rectangle_outline
+
+# Un rayo por grado: como mucho 360 rayos en el cono
+MAX_RAYS = 360
+CONE_FILL_COLOR = (173, 216, 230, 50)  # Azul claro con transparencia
+CONE_EDGE_COLOR = arcade.color.DARK_BLUE
+
+
+def vision_cell_color(value):
+    """Color de una celda de la barra según lo detectado (simplificado)"""
+    intensity = int(value * 255)
+    if value == 1.0:  # Comida
+        return (0, intensity, 0)
+    elif value == 0.0:  # Pared
+        return (intensity, 0, 0)
+    return (intensity, intensity, intensity)
+
+
+class VisionCone:
+    """Cono de visión en un único buffer de vértices reservado una vez
+
+    Cada frame se reescriben las posiciones (abanico de triángulos desde el
+    nymbot más los dos bordes) y se dibuja con dos llamadas, sea cual sea el FOV.
+    """
+
+    def __init__(self, ctx, max_rays=MAX_RAYS):
+        self.ctx = ctx
+        self.program = ctx.shape_element_list_program
+        # Filas: origen + extremos del abanico, y 4 vértices para los bordes; columnas x, y, r, g, b, a
+        self.vertices = np.zeros((max_rays + 5, 6), dtype=np.float32)
+        self.buffer = ctx.buffer(reserve=self.vertices.nbytes, usage="dynamic")
+        self.geometry = ctx.geometry([BufferDescription(self.buffer, "2f 4f", ("in_vert", "in_color"))])
+        self.n_rays = 0
+
+    def update(self, origin, endpoints):
+        endpoints = np.asarray(endpoints, dtype=np.float32).reshape(-1, 2)
+        n = min(len(endpoints), len(self.vertices) - 5)
+        self.n_rays = n
+        if n < 2:
+            return
+
+        v = self.vertices
+        v[0, :2] = origin
+        v[1:n + 1, :2] = endpoints[:n]
+        v[:n + 1, 2:] = CONE_FILL_COLOR
+        v[n + 1:n + 5, :2] = (origin, endpoints[0], origin, endpoints[n - 1])
+        v[n + 1:n + 5, 2:] = CONE_EDGE_COLOR
+        self.buffer.write(v[:n + 5])
+
+    def draw(self):
+        if self.n_rays < 2:
+            return
+        self.program["Position"] = 0.0, 0.0
+        self.program["Angle"] = 0.0
+        self.ctx.enable_only(self.ctx.BLEND)
+        self.geometry.render(self.program, mode=self.ctx.TRIANGLE_FAN, first=0, vertices=self.n_rays + 1)
+        self.geometry.render(self.program, mode=self.ctx.LINES, first=self.n_rays + 1, vertices=4)
+        self.ctx.disable(self.ctx.BLEND)
+
+
+class VisionBar:
+    """Barra de visión con una celda (sprite) por rayo y los contornos precalculados
+
+    Las celdas sólo se reconstruyen si cambia el número de rayos; en cada
+    frame se recolorean las celdas cuyo valor cambió y se dibuja todo con
+    dos llamadas (sprites + contornos).
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.ray_count = 0
+        self.cells = arcade.SpriteList()
+        self.outlines = ShapeElementList()
+        self._values = None
+
+    def _build(self, ray_count):
+        self.ray_count = ray_count
+        self.cells = arcade.SpriteList(capacity=ray_count)
+        self.outlines = ShapeElementList()
+        cell_width = self.width / max(ray_count, 1)
+        for i in range(ray_count):
+            center_x = self.x + (i + 0.5) * cell_width
+            center_y = self.y + self.height / 2
+            cell = arcade.SpriteSolidColor(1, 1, center_x, center_y, color=(0, 0, 0))
+            cell.width = cell_width
+            cell.height = self.height
+            self.cells.append(cell)
+            self.outlines.append(create_rectangle_outline(center_x, center_y, cell_width, self.height, (255, 255, 255)))
+        self._values = np.full(ray_count, np.nan)
+
+    def update(self, vision_data):
+        values = np.asarray(vision_data, dtype=np.float64)
+        if len(values) != self.ray_count:
+            self._build(len(values))
+        for i in np.flatnonzero(values != self._values):
+            self.cells[i].color = vision_cell_color(values[i])
+        self._values[:] = values
+
+    def draw(self):
+        self.cells.draw()
+        self.outlines.draw()
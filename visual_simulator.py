@@ -2,18 +2,42 @@
 import arcade
 import math
 import random
+from time import perf_counter
 # import numpy as np
-from nymbot import Nymbot
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND_COLOR, FOOD_ENERGY, MAX_STEPS
+from headless_simulator import HeadlessSimulator
+from trajectory import TrajectoryReader
+from profiling import PROFILER
+from vision_renderer import VisionBar, VisionCone
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND_COLOR, FOOD_RADIUS, FAST_FORWARD_SPEEDS, FAST_FORWARD_BUDGET
+)
 
 class Simulation(arcade.Window):
-    def __init__(self, initial_conditions=None, playback_mode=False, playback_snapshot=None, random_seed=None):
+    def __init__(self, initial_conditions=None, playback_mode=False, playback_snapshot=None, random_seed=None,
+                 playback_file=None):
         super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, "Nymbot Simulator")
         arcade.set_background_color(BACKGROUND_COLOR)
         
-        # Modo de reproducción (carga un estado guardado)
-        self.playback_mode = playback_mode
+        # Modo de reproducción (carga un estado guardado o una trayectoria en disco)
+        self.playback_mode = playback_mode or playback_file is not None
         self.playback_snapshot = playback_snapshot
+        self.trajectory = TrajectoryReader(playback_file) if playback_file is not None else None
+        self.playback_index = 0
+        self.playback_paused = False
+        self.profiler = PROFILER
+        self.random_seed = random_seed
+        
+        # Avance rápido: pasos de simulación por frame (fijo o por presupuesto de tiempo)
+        self.speed_index = 0
+        self.adaptive_speed = False
+        self.sim_paused = False
+        self.pending_steps = 0
+        self.steps_last_frame = 0
+        
+        # Geometría retenida del cono y la barra de visión (se reescribe en cada frame)
+        pad_x = 10
+        self.vision_cone = VisionCone(self.ctx)
+        self.vision_bar = VisionBar(pad_x, 10, SCREEN_WIDTH - 2 * pad_x, 28)
         
         # Inicializar con condiciones iniciales dadas o por defecto
         self.initial_conditions = initial_conditions
@@ -30,58 +54,51 @@ class Simulation(arcade.Window):
     
     def reset_simulation(self):
         """Inicializa o reinicia la simulación con condiciones iniciales."""
-        # Paredes (si no se proporcionan, usar las por defecto)
-        # if self.initial_conditions and 'walls' in self.initial_conditions:
-        #     self.walls = self.initial_conditions['walls']
-        # else:
-        self.walls = [
-            [(50, 50), (750, 50)],   # Inferior
-            [(750, 50), (750, 550)], # Derecha
-            [(750, 550), (50, 550)], # Superior
-            [(50, 550), (50, 50)]    # Izquierda
-        ]
-        
-        # Comida
-        # if self.initial_conditions and 'food_pos' in self.initial_conditions:
-        #     self.food_pos = self.initial_conditions['food_pos']
-        # else:
-        self.food_pos = self._random_position()
+        # Motor de simulación compartido con HeadlessSimulator (paredes, comida y nymbot)
+        self.engine = HeadlessSimulator(initial_conditions=self.initial_conditions, random_seed=self.random_seed)
+        self.arena = self.engine.arena
+        self.walls = self.arena.walls
+        self.food = self.engine.food
+        self.nymbot = self.engine.nymbot
         
-        # Nymbot
+        # Posición inicial personalizada del nymbot
         if self.initial_conditions and 'nymbot' in self.initial_conditions:
-            pass
-            # nymbot_initial = self.initial_conditions['nymbot']
-            # self.nymbot = Nymbot(
-            #     # nymbot_initial['x'],
-            #     # nymbot_initial['y'],
-            #     self.walls,
-            #     self.food_pos
-            # )
-            # # Configurar estado inicial del nymbot
-            # self.nymbot.body_angle = nymbot_initial.get('body_angle', 0.0)
-            # self.nymbot.eye_angle = nymbot_initial.get('eye_angle', 0.0)
-            # self.nymbot.energy = nymbot_initial.get('energy', 100.0)
-            
-            # Configurar parámetros del genoma si se proporcionan
-            if 'genome_params' in self.initial_conditions:
-                genome_params = self.initial_conditions['genome_params']
-                self.nymbot.genome.vision_resolution = genome_params['vision_resolution']
-                self.nymbot.genome.fov = genome_params['fov']
-                self.nymbot.genome.max_step_size = genome_params['max_step_size']
-                self.nymbot.genome.max_body_rotation = genome_params['max_body_rotation']
-                self.nymbot.genome.max_eye_rotation = genome_params['max_eye_rotation']
-        else:
-            # self.nymbot = Nymbot(
-            # SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, self.walls, self.food_pos)
-            self.nymbot = Nymbot(self.walls, self.food_pos)
+            self.place_nymbot(self.initial_conditions['nymbot'])
+        
+        self.current_episode = 0
         
         # Si estamos en modo reproducción, cargamos el snapshot
         if self.playback_mode and self.playback_snapshot:
             self.load_playback_snapshot(self.playback_snapshot)
-        
-        self.total_steps = 0
-        self.current_episode = 0
-        self.total_food_collected = 0
+        if self.trajectory is not None and len(self.trajectory):
+            self.seek(0)
+    
+    def place_nymbot(self, nymbot_initial):
+        self.nymbot.position = [nymbot_initial['x'], nymbot_initial['y']]
+        self.nymbot.body_angle = nymbot_initial.get('body_angle', 0.0)
+        self.nymbot.eye_angle = nymbot_initial.get('eye_angle', 0.0)
+        self.nymbot.energy = nymbot_initial.get('energy', 100.0)
+    
+    # Los contadores del episodio viven en el motor
+    @property
+    def total_steps(self):
+        return self.engine.current_step
+    
+    @total_steps.setter
+    def total_steps(self, value):
+        self.engine.current_step = value
+    
+    @property
+    def total_food_collected(self):
+        return self.engine.total_food_collected
+    
+    @total_food_collected.setter
+    def total_food_collected(self, value):
+        self.engine.total_food_collected = value
+    
+    @property
+    def speed(self):
+        return FAST_FORWARD_SPEEDS[self.speed_index]
     
     def _random_position(self):
         return (
@@ -89,15 +106,26 @@ class Simulation(arcade.Window):
             random.randint(100, SCREEN_HEIGHT - 100)
         )
     
+    @property
+    def food_pos(self):
+        """Posición de la primera comida (compatibilidad con la comida única)"""
+        return self.food.position(0)
+    
+    @food_pos.setter
+    def food_pos(self, position):
+        self.food.set_position(0, position)
+    
     def reset_food(self):
-        self.food_pos = self._random_position()
+        self.food.reset()
     
     def check_food_collision(self, pos, radius):
-        return math.sqrt((pos[0] - self.food_pos[0])**2 + 
-                         (pos[1] - self.food_pos[1])**2) < radius + 8
+        return self.food.any_within(pos, radius + FOOD_RADIUS)
     
     def on_draw(self):
         """Método de dibujo principal."""
+        on = self.profiler.enabled
+        if on:
+            t = perf_counter()
         self.clear()
         
         # Dibujar paredes
@@ -105,7 +133,8 @@ class Simulation(arcade.Window):
             arcade.draw_line(start[0], start[1], end[0], end[1], arcade.color.WHITE, 2)
         
         # Dibujar comida
-        arcade.draw_circle_filled(*self.food_pos, 8, arcade.color.APPLE_GREEN)
+        for x, y in self.food.active_positions():
+            arcade.draw_circle_filled(x, y, FOOD_RADIUS, arcade.color.APPLE_GREEN)
         
         # Dibujar nymbot
         arcade.draw_circle_filled(*self.nymbot.position, 10, arcade.color.BLUE)
@@ -127,63 +156,25 @@ class Simulation(arcade.Window):
         self.draw_vision_bar()
         
         # Actualizar y dibujar texto
-        self.info_text.text = f"Episodio: {self.current_episode} | Pasos: {self.total_steps} | Energía: {self.nymbot.energy:.1f} | FOV: {self.nymbot.genome.fov:.1f}°"
+        if not self.playback_mode:
+            self.info_text.text = f"Episodio: {self.current_episode} | Pasos: {self.total_steps} | Energía: {self.nymbot.energy:.1f} | FOV: {self.nymbot.genome.fov:.1f}°"
         self.info_text.draw()
+        if on:
+            self.profiler.lap('draw', t)
     
     def draw_vision_cone(self):
         """Dibuja el cono de visión completo"""
         if not hasattr(self.nymbot, 'ray_endpoints') or len(self.nymbot.ray_endpoints) < 2:
             return
         
-        # Crear puntos para el cono: posición del nymbot + puntos finales de los rayos
-        points = [(self.nymbot.position[0], self.nymbot.position[1])]
-        points.extend(self.nymbot.ray_endpoints)
-        
-        # Dibujar cono semitransparente
-        arcade.draw_polygon_filled(points, (173, 216, 230, 50))  # Azul claro con transparencia
-        
-        # Dibujar bordes del cono
-        arcade.draw_line(
-            self.nymbot.position[0], self.nymbot.position[1],
-            self.nymbot.ray_endpoints[0][0], self.nymbot.ray_endpoints[0][1],
-            arcade.color.DARK_BLUE, 1
-        )
-        arcade.draw_line(
-            self.nymbot.position[0], self.nymbot.position[1],
-            self.nymbot.ray_endpoints[-1][0], self.nymbot.ray_endpoints[-1][1],
-            arcade.color.DARK_BLUE, 1
-        )
+        # Posición del nymbot + puntos finales de los rayos, en un buffer reutilizado
+        self.vision_cone.update(self.nymbot.position, self.nymbot.ray_endpoints)
+        self.vision_cone.draw()
     
     def draw_vision_bar(self):
         """Dibuja la barra de visión en la parte inferior"""
-        bar_height = 28 # (50 - 20)/2
-        bar_y = 10
-        pad_x = 10
-        ray_count = self.nymbot.fov
-        ray_width = (SCREEN_WIDTH - 2*pad_x) / ray_count    
-        
-        for i in range(ray_count):
-            intensity = int(self.nymbot.vision_data[i] * 255)
-            
-            # Determinar color basado en lo detectado (simplificado)
-            if self.nymbot.vision_data[i] ==  1.0:  # Comida
-                color = (0, intensity, 0)
-            elif self.nymbot.vision_data[i] == 0.0:  # Pared
-                color = (intensity, 0, 0)
-            else:
-                color = (intensity, intensity, intensity)
-            
-            rect_cell= arcade.rect.LBWH(pad_x + i * ray_width, bar_y, ray_width, bar_height)
-            
-            arcade.draw_rect_filled(
-                rect=rect_cell,
-                color=color
-            )
-            
-            arcade.draw_rect_outline(
-                rect=rect_cell,
-                color=(255, 255, 255)
-            )
+        self.vision_bar.update(self.nymbot.vision_data[:self.nymbot.fov])
+        self.vision_bar.draw()
     
     def load_playback_snapshot(self, snapshot):
         """Carga un snapshot para reproducción."""
@@ -204,41 +195,83 @@ class Simulation(arcade.Window):
         if 'brain' in snapshot:
             self.nymbot.genome.brain.load_state_dict(snapshot['brain'])
     
+    def seek(self, index):
+        """Salta al registro `index` de la trayectoria (acceso O(1) sobre el mmap)"""
+        index = max(0, min(index, len(self.trajectory) - 1))
+        record = self.trajectory[index]
+        self.playback_index = index
+        
+        self.nymbot.position = record['position'].tolist()
+        self.nymbot.body_angle = float(record['body_angle'])
+        self.nymbot.eye_angle = float(record['eye_angle'])
+        self.nymbot.energy = float(record['energy'])
+        self.food_pos = record['food_pos'].tolist()
+        self.total_steps = int(record['step'])
+        self.current_episode = self.trajectory.episode_of(index)
+    
+    def profile_snapshot(self):
+        """Tiempos por fase y contadores acumulados"""
+        return self.profiler.snapshot()
+    
+    def on_key_press(self, key, modifiers):
+        """P activa/desactiva el perfilado; controles de avance rápido o de reproducción"""
+        if key == arcade.key.P:
+            if not self.profiler.toggle():
+                print(self.profile_snapshot())
+            return
+        if not self.playback_mode:
+            self.on_speed_key(key)
+            return
+        if self.trajectory is None:
+            return
+        jumps = {
+            arcade.key.RIGHT: 1,
+            arcade.key.LEFT: -1,
+            arcade.key.UP: 100,
+            arcade.key.DOWN: -100,
+        }
+        if key == arcade.key.SPACE:
+            self.playback_paused = not self.playback_paused
+        elif key in jumps:
+            self.seek(self.playback_index + jumps[key])
+        elif key == arcade.key.HOME:
+            self.seek(0)
+        elif key == arcade.key.END:
+            self.seek(len(self.trajectory) - 1)
+    
+    def on_speed_key(self, key):
+        """+/- cambian la velocidad, A alterna el modo adaptativo, SPACE pausa y N avanza un paso"""
+        if key in (arcade.key.PLUS, arcade.key.EQUAL, arcade.key.NUM_ADD):
+            self.speed_index = min(self.speed_index + 1, len(FAST_FORWARD_SPEEDS) - 1)
+            self.adaptive_speed = False
+        elif key in (arcade.key.MINUS, arcade.key.NUM_SUBTRACT):
+            self.speed_index = max(self.speed_index - 1, 0)
+            self.adaptive_speed = False
+        elif key == arcade.key.A:
+            self.adaptive_speed = not self.adaptive_speed
+        elif key == arcade.key.SPACE:
+            self.sim_paused = not self.sim_paused
+        elif key == arcade.key.N:
+            self.sim_paused = True
+            self.pending_steps += 1
+    
     def on_update(self, delta_time):
         """Lógica de actualización del juego"""
         if self.playback_mode:
+            # Avanzar por la trayectoria (un registro por frame)
+            if self.trajectory is not None and len(self.trajectory) and not self.playback_paused:
+                self.seek((self.playback_index + 1) % len(self.trajectory))
+            
             # En modo reproducción, solo actualizamos la visión para renderizar
-            self.nymbot.update_vision(self)
+            self.nymbot.update_vision()
             self.info_text.text = (
-                f"Modo Reproducción | Paso: {self.total_steps} | "
+                f"Modo Reproducción | Episodio: {self.current_episode} | Paso: {self.total_steps} | "
                 f"Energía: {self.nymbot.energy:.1f}"
             )
             return
         
-        # Actualizar visión
-        self.nymbot.update_vision()
-        
-        # Obtener acción del cerebro
-        action_array = self.nymbot.genome.brain.get_action(self.nymbot.vision_data)
-        
-        # Mover nymbot
-        self.nymbot.move(action_array)
-        
-        # Actualizar energía
-        is_alive = self.nymbot.update_energy()
-        
-        # Comprobar colisión con comida
-        if self.check_food_collision(self.nymbot.position, 10):
-            self.nymbot.energy += FOOD_ENERGY
-            self.total_food_collected += 1
-            self.reset_food()
-        
-        # Actualizar contador de pasos
-        self.total_steps += 1
-        
-        # Comprobar fin de episodio
-        if not is_alive or self.total_steps >= MAX_STEPS:
-            self.reset_episode()
+        # Avanzar con el paso de HeadlessSimulator; sólo se dibuja el último estado
+        self.steps_last_frame = self.advance_frame()
         
         # Actualizar texto informativo
         self.info_text.text = (
@@ -246,17 +279,49 @@ class Simulation(arcade.Window):
             f"Pasos: {self.total_steps} | "
             f"Energía: {self.nymbot.energy:.1f} | "
             f"FOV: {self.nymbot.genome.fov:.1f}° | "
-            f"Comida: {self.total_food_collected}"
+            f"Comida: {self.total_food_collected} | "
+            f"{self.speed_label()}"
         )
     
+    def advance_frame(self):
+        """Ejecuta los pasos de este frame y devuelve cuántos fueron"""
+        if self.sim_paused:
+            steps = self.pending_steps
+            self.pending_steps = 0
+            for _ in range(steps):
+                self.step_simulation()
+            return steps
+        
+        if not self.adaptive_speed:
+            for _ in range(self.speed):
+                self.step_simulation()
+            return self.speed
+        
+        # Adaptativo: tantos pasos como quepan en el presupuesto del frame (al menos uno)
+        start = perf_counter()
+        steps = 0
+        while True:
+            self.step_simulation()
+            steps += 1
+            if perf_counter() - start >= FAST_FORWARD_BUDGET:
+                return steps
+    
+    def step_simulation(self):
+        """Un paso del motor; reinicia el episodio al terminar"""
+        if self.engine.advance():
+            self.reset_episode()
+    
+    def speed_label(self):
+        if self.sim_paused:
+            return "PAUSA (N: paso)"
+        if self.adaptive_speed:
+            return f"Auto: {self.steps_last_frame} pasos/frame"
+        return f"x{self.speed}"
+    
     def reset_episode(self):
         """Reinicia el episodio manteniendo las condiciones iniciales"""
         if self.initial_conditions and 'nymbot' in self.initial_conditions:
-            nymbot_initial = self.initial_conditions['nymbot']
-            self.nymbot.position = [nymbot_initial['x'], nymbot_initial['y']]
-            self.nymbot.body_angle = nymbot_initial.get('body_angle', 0.0)
-            self.nymbot.eye_angle = nymbot_initial.get('eye_angle', 0.0)
-            self.nymbot.energy = nymbot_initial.get('energy', 100.0)
+            self.place_nymbot(self.initial_conditions['nymbot'])
         else:
             # Posición y orientación aleatorias
             self.nymbot.position = self.nymbot._random_position()
@@ -303,5 +368,9 @@ def main():
     # sim = Simulation(playback_mode=True, playback_snapshot=snapshot)
     # arcade.run()
 
+    # Ejemplo: reproducción de una trayectoria grabada con TrajectoryWriter
+    # sim = Simulation(playback_file='run.traj')
+    # arcade.run()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file